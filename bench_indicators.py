@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark: universe-wide indicator kernel vs. one DataFrame per ticker.
+
+Builds synthetic daily OHLCV for N tickers and times MACD + RSI + BBands
+(+ ATR) computed (a) ticker by ticker with pandas_ta, as Chartist and
+backtest_demo.py used to, and (b) in one pass over the tickers x days
+matrix with utils/indicator_kernel.py.
+
+Usage:
+    python bench_indicators.py                    # 50, 500, 2000 tickers
+    python bench_indicators.py --tickers 500 --days 750
+    MOLTBOT_JIT=1 python bench_indicators.py      # numba-compiled filters
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils import indicator_kernel
+
+
+def make_frames(n_tickers, n_days, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(end="2026-10-16", periods=n_days)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, (n_tickers, n_days)), axis=1))
+    spread = np.abs(rng.normal(0, 0.01, (n_tickers, n_days))) * close
+    return {
+        f"{1000 + i}.TW": pd.DataFrame({"Open": close[i], "High": close[i] + spread[i], "Low": close[i] - spread[i],
+                                        "Close": close[i], "Volume": 1e6}, index=dates)
+        for i in range(n_tickers)
+    }
+
+
+def per_ticker(frames):
+    import pandas_ta  # noqa: F401  (registers the .ta accessor)
+    for df in frames.values():
+        df = df.copy()
+        df.ta.macd(append=True)
+        df.ta.rsi(append=True)
+        df.ta.bbands(append=True)
+        df.ta.atr(append=True)
+
+
+def timed(fn, *args, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Indicator kernel benchmark")
+    parser.add_argument("--tickers", type=int, nargs="+", default=[50, 500, 2000])
+    parser.add_argument("--days", type=int, default=250)
+    args = parser.parse_args()
+
+    try:
+        import pandas_ta  # noqa: F401
+        baseline = True
+    except ImportError:
+        print("pandas_ta not installed: timing the kernel only")
+        baseline = False
+
+    # Warm-up (and numba compilation when MOLTBOT_JIT=1)
+    indicator_kernel.compute_all(make_frames(2, 60))
+
+    print(f"{'tickers':>8} {'days':>6} {'per-ticker':>12} {'kernel':>10} {'speedup':>8}")
+    for n in args.tickers:
+        frames = make_frames(n, args.days)
+        kernel = timed(indicator_kernel.compute_all, frames)
+        if baseline:
+            loop = timed(per_ticker, frames, repeat=1)
+            print(f"{n:>8} {args.days:>6} {loop * 1000:>10.0f}ms {kernel * 1000:>8.0f}ms {loop / kernel:>7.1f}x")
+        else:
+            print(f"{n:>8} {args.days:>6} {'-':>12} {kernel * 1000:>8.0f}ms {'-':>8}")
+
+
+if __name__ == "__main__":
+    main()
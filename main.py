@@ -1,46 +1,250 @@
 import sys
+import asyncio
 import colorama
 from colorama import Fore, Style
 import os
 import json
 from datetime import datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
-# Core Modules
-from modules.chartist import Chartist
-from modules.valuator import Valuator
-from modules.chip_watcher import ChipWatcher
-from modules.whale_hunter import WhaleHunter
-from modules.sentiment_scout import SentimentScout # New Agent
+from utils.llm_gateway import LLMGateway
+from utils.judgment_cache import JudgmentCache
+from utils.prompt_budget import compact, estimate_tokens, to_text
+from utils.delta_prompts import DeltaPromptStore
+from utils.run_fingerprints import RunFingerprints, fingerprint
+
+# Core Modules (imported lazily through the registry)
+from modules.registry import create_team
 
 class AlphaCore:
-    def __init__(self):
-        # We now initialize analysts with the new protocol
-        self.team = [
-            # Note: Existing analysts are being refactored to gather_data style
-            SentimentScout() 
-        ]
+    # Note: Existing analysts are being refactored to gather_data style
+    DEFAULT_TEAM = ["The Sentiment Scout"]
+
+    def __init__(self, analyst_timeout: float = 60.0, analyst_timeouts: dict = None, llm: LLMGateway = None,
+                 judgments: JudgmentCache = None, prompt_token_ceiling: int = 800,
+                 delta_prompts: bool = False, fingerprints: RunFingerprints = None,
+                 team: list = None):
+        # Analysts are declared by name and only imported/instantiated on first use
+        self.team_names = list(team or self.DEFAULT_TEAM)
+        self._team = None
+        self._team_lock = threading.Lock()
+        self._market_data = None
         self.persona = "The Pragmatic Architect"
+        # Seconds each analyst gets (data gathering + judgment) before it is skipped
+        self.analyst_timeout = analyst_timeout
+        self.analyst_timeouts = analyst_timeouts or {}
+        # Own pool (not asyncio's default) so a timed-out gather_data thread
+        # does not hold up asyncio.run() on exit
+        self._executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix="analyst")
+        # Committee voting weights, tuned by PerformanceAuditor.adjust_weights
+        self.weights = {
+            "The Valuator (Fundamental)": 0.35,
+            "The Chip Watcher (Institutional)": 0.25,
+            "The Whale Hunter (Large Holders)": 0.20,
+            "The Strategist (Macro)": 0.15,
+            "The Chartist (Technical)": 0.05
+        }
+        self.log_dir = "/workspaces/moltbot-test/logs"
+        self._log_lock = threading.Lock()
+        # Shared LLM gateway (batched + pooled); None keeps the offline placeholder
+        self.llm = llm if llm is not None else LLMGateway.from_env()
+        # Verdicts for unchanged inputs are reused instead of re-judged
+        self.judgments = judgments or JudgmentCache()
+        # Upper bound on tokens per analyst prompt (identity + task)
+        self.prompt_token_ceiling = prompt_token_ceiling
+        # Delta mode: re-judge from the prior verdict + changed inputs only
+        self.deltas = DeltaPromptStore() if delta_prompts else None
+        # Incremental runs: reuse reports whose inputs have not changed
+        self.fingerprints = fingerprints
 
-    def run_pipeline(self, ticker: str):
-        print(f"\n{Fore.CYAN}{Style.BRIGHT}=== AI-Powered Committee Meeting ===")
-        
-        for analyst in self.team:
-            # Step 1: Data Gathering (Python Logic)
-            raw_data = analyst.gather_data(ticker)
-            
-            # Step 2: Prompt Preparation
-            identity = analyst.get_identity_context()
-            task_prompt = analyst.get_specialized_prompt(raw_data)
-            
-            # Step 3: AI Judgment (This is where Alpha/LLM takes over)
+    @property
+    def team(self) -> list:
+        with self._team_lock:
+            if self._team is None:
+                self._team = create_team(self.team_names)
+                if self._market_data is not None:
+                    for analyst in self._team:
+                        analyst.attach_market_data(self._market_data)
+            return self._team
+
+    @team.setter
+    def team(self, analysts: list):
+        with self._team_lock:
+            self._team = list(analysts)
+
+    def attach_market_data(self, frames: dict):
+        """Hands the batch-prefetched price slices to every analyst (now or once loaded)."""
+        self._market_data = frames
+        with self._team_lock:
+            for analyst in self._team or []:
+                analyst.attach_market_data(frames)
+
+    def refresh_sources(self):
+        """Asks every loaded analyst to re-read its once-per-process sources (long-lived processes)."""
+        with self._team_lock:
+            analysts = list(self._team or [])
+        for analyst in analysts:
+            try:
+                analyst.refresh_sources()
+            except Exception as e:
+                print(f"{Fore.RED}{analyst.name}: source refresh failed: {e}")
+
+    def get_weight(self, analyst_name: str, default: float = 0.25) -> float:
+        """Weight for an analyst; keys carry a role suffix, e.g. "The Valuator (Fundamental)"."""
+        if analyst_name in self.weights:
+            return self.weights[analyst_name]
+        for name, weight in self.weights.items():
+            if name.split(" (")[0] == analyst_name:
+                return weight
+        return default
+
+    def _save_decision_log(self, ticker: str, final_score: float, decision: str, reports: list):
+        """Appends one decision to logs/decisions_YYYY-MM-DD.jsonl (read by the auditors)."""
+        os.makedirs(self.log_dir, exist_ok=True)
+        entry = {
+            "timestamp": datetime.now().isoformat(),
+            "ticker": ticker,
+            "score": round(final_score, 4),
+            "decision": decision,
+            "details": [{k: r.get(k) for k in ("analyst_name", "signal", "confidence", "reason")} for r in reports]
+        }
+        path = os.path.join(self.log_dir, f"decisions_{datetime.now().strftime('%Y-%m-%d')}.jsonl")
+        # Several tickers may finish at once in parallel mode
+        with self._log_lock:
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    async def _judge(self, analyst, full_context: str) -> dict:
+        """
+        AI Judgment step (This is where Alpha/LLM takes over).
+        The prompt is queued on the LLM gateway, which batches it with the
+        other analysts' (and other tickers') prompts into shared requests.
+        """
+        if self.llm is not None:
+            return await asyncio.wrap_future(self.llm.submit(full_context))
+        print(f"{Fore.WHITE}{Style.DIM}AI Context Prepared for {analyst.name}.")
+        # Nobody judged these inputs: never fingerprint it or mark its data as seen
+        return {
+            "signal": "NEUTRAL",
+            "confidence": 0.0,
+            "reason": "Awaiting AI judgment",
+            "degraded": True,
+        }
+
+    @staticmethod
+    def _build_context(analyst, raw_data) -> str:
+        identity = analyst.get_identity_context()
+        task_prompt = analyst.get_specialized_prompt(raw_data)
+        return f"{identity}\n\nTask:\n{task_prompt}"
+
+    def _fit_prompt(self, analyst, raw_data) -> str:
+        """
+        Builds the analyst prompt under prompt_token_ceiling: when the full
+        prompt is too long, the raw data is compacted (analyst.PROMPT_FIELDS
+        first, series summarized, text trimmed) into whatever the template
+        leaves over.
+        """
+        full_context = self._build_context(analyst, raw_data)
+        tokens = estimate_tokens(full_context)
+        if tokens <= self.prompt_token_ceiling:
+            return full_context
+
+        overhead = max(tokens - estimate_tokens(to_text(raw_data)), 0)
+        budget = self.prompt_token_ceiling - overhead
+        # The template renders data a little differently from JSON; shrink until it fits
+        for _ in range(4):
+            if budget < 16:
+                break
+            compacted = compact(raw_data, priority=analyst.PROMPT_FIELDS, max_tokens=budget)
+            full_context = self._build_context(analyst, compacted)
+            tokens = estimate_tokens(full_context)
+            if tokens <= self.prompt_token_ceiling:
+                return full_context
+            budget -= tokens - self.prompt_token_ceiling
+        print(f"{Fore.RED}{analyst.name} prompt still {tokens} tokens (ceiling {self.prompt_token_ceiling}).")
+        return full_context
+
+    async def _consult(self, analyst, ticker: str) -> dict:
+        loop = asyncio.get_running_loop()
+        # Offline placeholder verdicts must not be reused once an LLM is configured
+        judge_mode = "llm" if self.llm is not None else "offline"
+
+        # Step 0: Incremental skip when the analyst's source has not moved
+        source_version = None
+        if self.fingerprints is not None:
+            marker = await loop.run_in_executor(self._executor, analyst.get_source_version, ticker)
+            if marker is not None:
+                source_version = fingerprint(marker, analyst.PROMPT_VERSION, judge_mode)
+            reused = self.fingerprints.reuse_by_source(ticker, analyst.name, source_version)
+            if reused is not None:
+                print(f"{Fore.GREEN}{analyst.name}: source unchanged for {ticker}, reusing last report.")
+                return reused
+
+        # Step 1: Data Gathering (Python Logic) - blocking I/O runs in a worker thread
+        raw_data = await loop.run_in_executor(self._executor, analyst.gather_data, ticker)
+
+        input_fingerprint = fingerprint(analyst.name, analyst.PROMPT_VERSION, judge_mode, raw_data)
+        if self.fingerprints is not None:
+            reused = self.fingerprints.reuse_by_inputs(ticker, analyst.name, input_fingerprint)
+            if reused is not None:
+                print(f"{Fore.GREEN}{analyst.name}: inputs unchanged for {ticker}, reusing last report.")
+                self.fingerprints.record(ticker, analyst.name, input_fingerprint, source_version, reused)
+                await loop.run_in_executor(self._executor, analyst.on_judged, ticker, reused)
+                return reused
+
+        # Step 2: Prompt Preparation (bounded by the token ceiling)
+        full_context = self._fit_prompt(analyst, raw_data)
+
+        # Step 3: AI Judgment (skipped when the same inputs were judged recently)
+        report = self.judgments.get(analyst, raw_data, prompt_chars=len(full_context))
+        if report is None:
+            prompt = full_context
+            if self.deltas is not None:
+                prompt = self.deltas.build_prompt(ticker, analyst, raw_data, full_context)
             print(f"{Fore.YELLOW}Consulting {analyst.name} for AI Judgment...")
-            
-            # Note: In the real runtime, this string would be sent to the LLM.
-            # I will simulate the process by displaying the instruction.
-            full_context = f"{identity}\n\nTask:\n{task_prompt}"
-            
-            print(f"{Fore.WHITE}{Style.DIM}AI Context Prepared for {analyst.name}.")
-            # The actual judgment happens in Alpha's mind.
-            
+            report = await self._judge(analyst, prompt)
+            # Only real LLM verdicts are worth keeping; a degraded fallback is judged again next run
+            if self.llm is not None and not report.get("degraded"):
+                self.judgments.put(analyst, raw_data, report)
+                if self.deltas is not None:
+                    self.deltas.record(ticker, analyst, raw_data, report, was_delta=prompt is not full_context)
+        else:
+            print(f"{Fore.GREEN}{analyst.name}: inputs unchanged, reusing cached judgment.")
+        report.update({"analyst_name": analyst.name, "data": raw_data, "fingerprint": input_fingerprint})
+        if not report.get("degraded"):
+            if self.fingerprints is not None:
+                self.fingerprints.record(ticker, analyst.name, input_fingerprint, source_version, report)
+            await loop.run_in_executor(self._executor, analyst.on_judged, ticker, report)
+        return report
+
+    async def arun_pipeline(self, ticker: str) -> list:
+        """
+        Consults every analyst concurrently, so a ticker costs the slowest
+        analyst's time rather than the sum. An analyst that errors or runs
+        past its timeout yields a zero-confidence NEUTRAL report instead of
+        sinking the whole committee.
+        """
+        print(f"\n{Fore.CYAN}{Style.BRIGHT}=== AI-Powered Committee Meeting ===")
+
+        async def consult_with_timeout(analyst):
+            timeout = self.analyst_timeouts.get(analyst.name, self.analyst_timeout)
+            try:
+                return await asyncio.wait_for(self._consult(analyst, ticker), timeout=timeout)
+            except asyncio.TimeoutError:
+                # The worker thread cannot be killed; its late result is simply dropped
+                reason = f"Timed out after {timeout:.0f}s"
+            except Exception as e:
+                reason = f"Error: {e}"
+            print(f"{Fore.RED}{analyst.name} skipped for {ticker}: {reason}")
+            return {"analyst_name": analyst.name, "signal": "NEUTRAL",
+                    "confidence": 0.0, "reason": reason, "data": {}}
+
+        return list(await asyncio.gather(*(consult_with_timeout(a) for a in self.team)))
+
+    def run_pipeline(self, ticker: str) -> list:
+        """Synchronous entry point; returns one report dict per analyst."""
+        return asyncio.run(self.arun_pipeline(ticker))
+
 if __name__ == "__main__":
     AlphaCore().run_pipeline("2330.TW")
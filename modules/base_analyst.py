@@ -6,11 +6,24 @@ class BaseAnalyst(ABC):
     Each analyst now focuses on DATA GATHERING and provides a 
     SPECIALIZED PROMPT for the LLM to perform judgment.
     """
-    
+    # Bump when get_specialized_prompt changes so cached judgments are not reused
+    PROMPT_VERSION = "1"
+    # gather_data keys kept first when a prompt must be compacted to the token ceiling
+    PROMPT_FIELDS = ()
+
     def __init__(self, name: str, specialty: str, persona: str):
         self.name = name
         self.specialty = specialty
         self.persona = persona
+        # Ready in-memory price slices {ticker: DataFrame} handed over by a batch prefetch
+        self.market_data = {}
+
+    def attach_market_data(self, frames: dict):
+        """
+        Receives prices prefetched for the whole universe so gather_data
+        can skip its own per-ticker fetch.
+        """
+        self.market_data = frames or {}
 
     @abstractmethod
     def gather_data(self, ticker: str) -> dict:
@@ -19,6 +32,29 @@ class BaseAnalyst(ABC):
         """
         pass
 
+    def get_source_version(self, ticker: str):
+        """
+        Cheap marker of how fresh this analyst's source data is (e.g. the
+        latest trading day stored), or None when it cannot tell without a
+        full gather. An unchanged marker lets incremental runs skip the
+        analyst entirely.
+        """
+        return None
+
+    def on_judged(self, ticker: str, report: dict):
+        """
+        Called once a real (non-degraded) verdict exists for the data just
+        gathered for `ticker`, e.g. to mark consumed inputs as seen.
+        """
+        pass
+
+    def refresh_sources(self):
+        """
+        Re-reads once-per-process source data (whole-market snapshots loaded
+        on first use) so a long-lived process picks up new publications.
+        """
+        pass
+
     @abstractmethod
     def get_specialized_prompt(self, raw_data: dict) -> str:
         """
@@ -1,47 +1,135 @@
-import yfinance as yf
-import pandas_ta as ta
-import pandas as pd
+from datetime import datetime, timedelta
 from modules.base_analyst import BaseAnalyst
+from utils.feature_store import FeatureStore
+from utils.price_store import PriceStore
+from utils.streaming_indicators import StreamingIndicators
+from utils.timeframes import MultiTimeframeBars
+
+
+def _round(value):
+    return round(value, 2) if value is not None else None
+
 
 class Chartist(BaseAnalyst):
+    PROMPT_FIELDS = ("close", "rsi", "macd", "bollinger", "trend_alignment", "timeframes")
+
     def __init__(self):
         super().__init__(
             name="The Chartist",
             specialty="Price action, momentum, and technical trend analysis.",
             persona="A quantitative technician who interprets charts as the collective psychology of the market."
         )
+        self.prices = PriceStore()
+        # Universe indicators written by the batch prefetch, shared with ATR levels and backtests
+        self.features = FeatureStore()
+        # Per-ticker fallback when the ticker was not prefetched: only new bars are applied
+        self.indicators = StreamingIndicators()
+        # Other timeframes are resampled from stored bars - never downloaded here
+        self.weekly_bars = MultiTimeframeBars(self.prices)
+        self.intraday_bars = MultiTimeframeBars(base_interval="5m")
 
     def gather_data(self, ticker: str) -> dict:
         """Gathers technical indicators."""
         print(f"[{self.name}] Fetching technical data for {ticker}...")
-        df = yf.download(ticker, period="1y", interval="1d", progress=False)
+        start = (datetime.now() - timedelta(days=365)).strftime('%Y-%m-%d')
+        if ticker in self.market_data:
+            df = self.market_data[ticker].loc[start:].copy()
+        else:
+            df = self.prices.get_history(ticker, start=start).copy()
         if df.empty: return {}
-        
-        if isinstance(df.columns, pd.MultiIndex):
-            df.columns = df.columns.get_level_values(0)
 
-        df.ta.macd(append=True)
-        df.ta.rsi(append=True)
-        df.ta.bbands(append=True)
-        
-        latest = df.iloc[-1]
-        prev = df.iloc[-2]
-        
+        stored = self.stored_indicators(ticker, df) if ticker in self.market_data else None
+        if stored:
+            latest, prev = stored
+        else:
+            self.indicators.catch_up(ticker, df)
+            self.indicators.save(ticker)
+            latest = self.indicators.latest(ticker)
+            prev = self.indicators.previous(ticker)
+
         return {
-            "close": round(latest['Close'], 2),
-            "rsi": round(latest['RSI_14'], 2),
+            "close": round(float(df['Close'].iloc[-1]), 2),
+            "rsi": _round(latest.get('RSI_14')),
             "macd": {
-                "current": round(latest['MACD_12_26_9'], 2),
-                "signal": round(latest['MACDs_12_26_9'], 2),
-                "prev_macd": round(prev['MACD_12_26_9'], 2),
-                "prev_signal": round(prev['MACDs_12_26_9'], 2)
+                "current": _round(latest.get('MACD_12_26_9')),
+                "signal": _round(latest.get('MACDs_12_26_9')),
+                "prev_macd": _round(prev.get('MACD_12_26_9')),
+                "prev_signal": _round(prev.get('MACDs_12_26_9'))
             },
             "bollinger": {
-                "upper": round(latest['BBU_20_2.0'], 2),
-                "lower": round(latest['BBL_20_2.0'], 2)
-            }
+                "upper": _round(latest.get('BBU_20_2.0')),
+                "lower": _round(latest.get('BBL_20_2.0'))
+            },
+            **self.trend_alignment(ticker, df)
         }
 
+    def stored_indicators(self, ticker, df):
+        """
+        (latest, previous) RSI / MACD / Bollinger values from the feature
+        store, or None unless it holds them through the last bar of `df`.
+        """
+        latest, prev = {}, {}
+        for name in ("rsi_14", "macd_12_26_9", "bbands_20_2"):
+            stored = self.features.frame(name, ticker)
+            if len(stored) < 2 or stored.index[-1] != df.index[-1].normalize():
+                return None
+            latest.update(stored.iloc[-1].to_dict())
+            prev.update(stored.iloc[-2].to_dict())
+        clean = lambda row: {k: None if v != v else float(v) for k, v in row.items()}
+        return clean(latest), clean(prev)
+
+    @staticmethod
+    def _trend(df, length=20):
+        """UP / DOWN when the close and the slope of its EMA agree, else SIDEWAYS."""
+        if len(df) < length + 1:
+            return None
+        from utils.indicator_kernel import ema
+        line = ema(df['Close'].to_numpy(dtype=float)[None, :], length)[0]
+        close = float(df['Close'].iloc[-1])
+        if close > line[-1] and line[-1] >= line[-2]:
+            return "UP"
+        if close < line[-1] and line[-1] <= line[-2]:
+            return "DOWN"
+        return "SIDEWAYS"
+
+    def trend_alignment(self, ticker, daily):
+        """
+        Trend per timeframe (5m, 60m, daily, weekly) from bars already on
+        disk or in memory, and whether they agree.
+        """
+        views = {"1d": daily, "1wk": self.weekly_bars.bars(ticker, "1wk")}
+        # Intraday views only count while the stored 5m series is current
+        recent = daily.index[-1] - timedelta(days=3)
+        for tf in ("5m", "60m"):
+            bars = self.intraday_bars.bars(ticker, tf)
+            if not bars.empty and bars.index[-1] >= recent:
+                views[tf] = bars
+
+        trends = {tf: self._trend(views[tf]) for tf in ("5m", "60m", "1d", "1wk") if tf in views}
+        trends = {tf: trend for tf, trend in trends.items() if trend}
+        if len(trends) < 2:
+            return {"timeframes": trends, "trend_alignment": None}
+        if all(t == "UP" for t in trends.values()):
+            alignment = "ALIGNED UP"
+        elif all(t == "DOWN" for t in trends.values()):
+            alignment = "ALIGNED DOWN"
+        else:
+            alignment = "MIXED"
+        return {"timeframes": trends, "trend_alignment": alignment}
+
+    def get_source_version(self, ticker: str):
+        # Only known up front when prices were prefetched; an intraday bar
+        # keeps its date while the close moves, so both are part of the marker
+        df = self.market_data.get(ticker)
+        if df is None or df.empty:
+            return None
+        marker = f"{df.index[-1]}|{float(df['Close'].iloc[-1])}"
+        # New 5m bars move the 5m/60m trends even when the daily bar has not changed
+        bars, _, last, close = self.intraday_bars.store.partition_version(ticker)
+        if bars:
+            marker += f"|5m:{last}|{close}"
+        return marker
+
     def get_specialized_prompt(self, raw_data: dict) -> str:
         return f"""
         Review the following technical data for {self.name}:
@@ -49,6 +137,7 @@ class Chartist(BaseAnalyst):
         - RSI (14): {raw_data.get('rsi')}
         - MACD: Current Line {raw_data.get('macd', {}).get('current')}, Signal Line {raw_data.get('macd', {}).get('signal')}
         - Bollinger Bands: Upper {raw_data.get('bollinger', {}).get('upper')}, Lower {raw_data.get('bollinger', {}).get('lower')}
+        - Trend by Timeframe: {raw_data.get('timeframes')} (Alignment: {raw_data.get('trend_alignment')})
         
         Task: 
         As a technical analyst, evaluate the trend, momentum, and volatility. 
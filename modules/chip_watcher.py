@@ -1,10 +1,11 @@
 from modules.base_analyst import BaseAnalyst
 from utils.data_manager import DataManager
-import requests
-import datetime
-from datetime import timedelta
+from utils.http_client import get_http_client
+from utils.institutional_flows import InstitutionalFlows
 
 class ChipWatcher(BaseAnalyst):
+    PROMPT_FIELDS = ("date", "foreign_net", "trust_net", "dealer_net", "foreign_5d", "trust_5d", "foreign_streak")
+
     def __init__(self):
         super().__init__(
             name="The Chip Watcher",
@@ -12,17 +13,35 @@ class ChipWatcher(BaseAnalyst):
             persona="A cynical market observer who follows the tracks of big whales and institutional giants."
         )
         self.dm = DataManager()
+        self.http = get_http_client()
+        # Whole-market T86 history: one download per trading day, shared by all tickers
+        self.flows = InstitutionalFlows(dm=self.dm, http=self.http)
 
     def gather_data(self, ticker: str) -> dict:
         stock_id = ticker.split('.')[0]
-        # Implementation of fetching T86 (Institutional) logic
+        flows = self.flows.get_flows(stock_id)
+        if not flows:
+            return {}
         return {
-            "foreign_net": "-2500 sheets",
-            "trust_net": "+500 sheets",
-            "dealer_net": "-100 sheets",
-            "date": "2026-02-02"
+            "foreign_net": f"{flows['foreign_1d']:+,.0f} sheets",
+            "trust_net": f"{flows['trust_1d']:+,.0f} sheets",
+            "dealer_net": f"{flows['dealer_1d']:+,.0f} sheets",
+            "foreign_5d": f"{flows.get('foreign_5d', 0):+,.0f} sheets",
+            "trust_5d": f"{flows.get('trust_5d', 0):+,.0f} sheets",
+            "dealer_5d": f"{flows.get('dealer_5d', 0):+,.0f} sheets",
+            "foreign_20d": f"{flows.get('foreign_20d', 0):+,.0f} sheets",
+            "trust_20d": f"{flows.get('trust_20d', 0):+,.0f} sheets",
+            "foreign_streak": flows['foreign_streak'],
+            "date": flows['date']
         }
 
+    def refresh_sources(self):
+        self.flows.load_history()
+
+    def get_source_version(self, ticker: str):
+        # T86 is one whole-market report per trading day
+        return self.flows.latest_date()
+
     def get_specialized_prompt(self, raw_data: dict) -> str:
         return f"""
         Analyze the institutional money flow for this ticker:
@@ -30,6 +49,9 @@ class ChipWatcher(BaseAnalyst):
         - Investment Trust: {raw_data.get('trust_net')}
         - Dealers: {raw_data.get('dealer_net')}
         - Trading Date: {raw_data.get('date')}
+        - 5-Day Cumulative: Foreign {raw_data.get('foreign_5d')}, Trust {raw_data.get('trust_5d')}, Dealers {raw_data.get('dealer_5d')}
+        - 20-Day Cumulative: Foreign {raw_data.get('foreign_20d')}, Trust {raw_data.get('trust_20d')}
+        - Foreign Streak: {raw_data.get('foreign_streak')} consecutive days (+ buying / - selling)
         
         Task:
         Identify if 'Smart Money' is accumulating or distributing.
@@ -12,12 +12,10 @@ Performance Auditor & Dynamic Weighting Module
 
 import os
 import json
-import pandas as pd
-import numpy as np
 from datetime import datetime, timedelta
 from typing import Dict, List, Tuple
-import yfinance as yf
 from collections import defaultdict
+from utils.serializers import get_serializer, dump_file, load_file
 
 
 class PerformanceAuditor:
@@ -28,13 +26,17 @@ class PerformanceAuditor:
     def __init__(self, 
                  logs_dir="/workspaces/moltbot-test/logs",
                  audit_dir="/workspaces/moltbot-test/data/audit",
-                 performance_history_path="/workspaces/moltbot-test/data/audit/performance_history.json"):
+                 performance_history_path="/workspaces/moltbot-test/data/audit/performance_history.json",
+                 serializer=None):
         
         self.logs_dir = logs_dir
         self.audit_dir = audit_dir
         self.performance_history_path = performance_history_path
+        # 序列化格式（預設 msgpack 二進位；"json-debug" 為可讀格式）
+        self.serializer = serializer or get_serializer()
         
         os.makedirs(self.audit_dir, exist_ok=True)
+        self._prices = None
         
         # 讀取或初始化績效歷史
         self.performance_history = self._load_performance_history()
@@ -68,17 +70,24 @@ class PerformanceAuditor:
         self.last_adjustment_time = self._load_last_adjustment_time()
         self.cooldown_days = 3
 
+    @property
+    def prices(self):
+        """本地價格庫（延遲建立：只有驗證預測時才需要載入 pandas）"""
+        if self._prices is None:
+            from utils.price_store import PriceStore
+            self._prices = PriceStore()
+        return self._prices
+
     def _load_performance_history(self):
-        """載入績效歷史紀錄"""
-        if os.path.exists(self.performance_history_path):
-            with open(self.performance_history_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+        """載入績效歷史紀錄（自動相容舊版 JSON 檔）"""
+        history = load_file(self.performance_history_path, self.serializer)
+        if history is not None:
+            return history
         return {"predictions": {}, "audits": [], "analyst_stats": {}}
 
     def _save_performance_history(self):
-        """保存績效歷史紀錄"""
-        with open(self.performance_history_path, 'w', encoding='utf-8') as f:
-            json.dump(self.performance_history, f, ensure_ascii=False, indent=2)
+        """保存績效歷史紀錄（先寫暫存檔再 rename，寫入中斷不會損毀檔案）"""
+        dump_file(self.performance_history, self.performance_history_path, self.serializer)
 
     def _load_last_adjustment_time(self):
         """載入上次權重調整的時間"""
@@ -129,7 +138,7 @@ class PerformanceAuditor:
     def verify_predictions(self):
         """
         掃描所有已記錄的預測，檢查是否到期。
-        如果到期（T+1, T+5, T+20），從 yfinance 獲取實際股價並計算準確度。
+        如果到期（T+1, T+5, T+20），從本地價格庫獲取實際股價並計算準確度。
         """
         predictions = self.performance_history["predictions"]
         verified_count = 0
@@ -152,7 +161,7 @@ class PerformanceAuditor:
                     ticker = pred_data["ticker"]
                     target_date = (pred_date + timedelta(days=window_days)).strftime("%Y-%m-%d")
                     
-                    # 從 yfinance 獲取實際股價
+                    # 從本地價格庫獲取實際股價
                     actual_price = self._fetch_actual_price(ticker, target_date)
                     
                     if actual_price is not None:
@@ -193,7 +202,7 @@ class PerformanceAuditor:
 
     def _fetch_actual_price(self, ticker: str, target_date: str) -> float:
         """
-        從 yfinance 獲取指定日期的收盤價
+        從本地價格庫 (PriceStore) 獲取指定日期的收盤價，只下載缺少的尾段
         
         Args:
             ticker: 股票代碼
@@ -207,11 +216,10 @@ class PerformanceAuditor:
             if not ticker.endswith(".TW") and not ticker.endswith(".TA"):
                 ticker = f"{ticker}.TW"
             
-            data = yf.download(ticker, start=target_date, end=target_date, 
-                              progress=False, show_errors=False)
+            close = self.prices.get_close_on(ticker, target_date)
             
-            if not data.empty:
-                return round(float(data["Close"].iloc[0]), 2)
+            if close is not None:
+                return round(close, 2)
             return None
         except Exception as e:
             print(f"   ⚠ 無法獲取 {ticker} @ {target_date} 的價格: {e}")
@@ -365,7 +373,8 @@ class PerformanceAuditor:
                         )
                         analyst_stats[analyst_name]["predictions"] += 1
         
-        # 計算指標
+        # 計算指標（numpy 只在此處需要，延遲載入）
+        import numpy as np
         performance_summary = {}
         for analyst_name, stats in analyst_stats.items():
             if stats["predictions"] == 0:
@@ -0,0 +1,35 @@
+import importlib
+
+# Analysts by name -> "module:Class". Modules are imported on first use, so
+# a CLI that never consults an analyst never pays for pandas, yfinance, etc.
+ANALYSTS = {
+    "The Chartist": "modules.chartist:Chartist",
+    "The Valuator": "modules.valuator:Valuator",
+    "The Chip Watcher": "modules.chip_watcher:ChipWatcher",
+    "The Whale Hunter": "modules.whale_hunter:WhaleHunter",
+    "The Sentiment Scout": "modules.sentiment_scout:SentimentScout",
+}
+
+_classes = {}
+
+
+def available_analysts():
+    return list(ANALYSTS)
+
+
+def get_analyst_class(name: str):
+    """Imports (once) and returns the class registered under `name`."""
+    if name not in _classes:
+        if name not in ANALYSTS:
+            raise KeyError(f"Unknown analyst: {name!r} (known: {', '.join(ANALYSTS)})")
+        module_name, class_name = ANALYSTS[name].split(":")
+        _classes[name] = getattr(importlib.import_module(module_name), class_name)
+    return _classes[name]
+
+
+def create_analyst(name: str):
+    return get_analyst_class(name)()
+
+
+def create_team(names):
+    return [create_analyst(name) for name in names]
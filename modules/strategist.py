@@ -1,5 +1,5 @@
-import yfinance as yf
 from modules.base_analyst import BaseAnalyst
+from utils.price_store import PriceStore
 
 class Strategist(BaseAnalyst):
     def __init__(self):
@@ -9,8 +9,9 @@ class Strategist(BaseAnalyst):
         print(f"[{self.name}] Scanning Macro Risks (VIX, Bonds)...")
         try:
             # Analyze VIX (Fear Index)
-            vix = yf.Ticker("^VIX")
-            hist = vix.history(period="5d")
+            hist = self.market_data.get("^VIX")
+            if hist is None:
+                hist = PriceStore().get_history("^VIX")
             
             if hist.empty:
                 return {"signal": "NEUTRAL", "confidence": 0.0, "reason": "No Macro Data", "data": {}}
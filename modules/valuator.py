@@ -1,10 +1,12 @@
 from modules.base_analyst import BaseAnalyst
 from utils.data_manager import DataManager
-import requests
-import datetime
-from datetime import timedelta
+from utils.http_client import get_http_client
+from utils.valuation_store import ValuationStore
 
 class Valuator(BaseAnalyst):
+    PROMPT_FIELDS = ("pe_ratio", "pb_ratio", "dividend_yield", "pe_percentile_history",
+                     "pb_percentile_history", "pe_percentile_sector", "date")
+
     def __init__(self):
         super().__init__(
             name="The Valuator",
@@ -12,19 +14,40 @@ class Valuator(BaseAnalyst):
             persona="A value-investing purist who seeks a wide margin of safety and stable cash flows."
         )
         self.dm = DataManager()
+        self.http = get_http_client()
+        # Whole-market BWIBBU history with precomputed percentile ranks
+        self.valuations = ValuationStore(http=self.http)
 
     def gather_data(self, ticker: str) -> dict:
         """Gathers PE, PB, and Yield data from TWSE."""
         stock_id = ticker.split('.')[0]
-        # Implementation of fetching from TWSE logic (cached)
-        # Simplified for refactoring report
+        # One bulk download per trading day; no-op after the first ticker
+        self.valuations.update()
+        val = self.valuations.get_valuation(stock_id)
+        if not val:
+            return {}
         return {
-            "pe_ratio": 15.5, # Example placeholder
-            "pb_ratio": 1.2,
-            "dividend_yield": "4.5%",
-            "sector": "Technology"
+            "pe_ratio": val['pe'],
+            "pb_ratio": val['pb'],
+            "dividend_yield": f"{val['dy']}%" if val['dy'] is not None else None,
+            "sector": val['sector'] or "Unknown",
+            "pe_percentile_history": val['pe_hist_pct'],
+            "pb_percentile_history": val['pb_hist_pct'],
+            "yield_percentile_history": val['dy_hist_pct'],
+            "pe_percentile_sector": val['pe_sector_pct'],
+            "pb_percentile_sector": val['pb_sector_pct'],
+            "yield_percentile_sector": val['dy_sector_pct'],
+            "date": val['date']
         }
 
+    def refresh_sources(self):
+        self.valuations.update(force=True)
+
+    def get_source_version(self, ticker: str):
+        # BWIBBU is one whole-market snapshot per trading day
+        self.valuations.update()
+        return str(self.valuations.dates[-1]) if len(self.valuations.dates) else None
+
     def get_specialized_prompt(self, raw_data: dict) -> str:
         return f"""
         Examine the fundamental metrics for this stock:
@@ -32,6 +55,8 @@ class Valuator(BaseAnalyst):
         - PB Ratio: {raw_data.get('pb_ratio')}
         - Dividend Yield: {raw_data.get('dividend_yield')}
         - Sector: {raw_data.get('sector')}
+        - Percentile vs. own 1Y history (0 = cheapest): PE {raw_data.get('pe_percentile_history')}, PB {raw_data.get('pb_percentile_history')}, Yield {raw_data.get('yield_percentile_history')}
+        - Percentile vs. sector peers: PE {raw_data.get('pe_percentile_sector')}, PB {raw_data.get('pb_percentile_sector')}, Yield {raw_data.get('yield_percentile_sector')}
         
         Task:
         Is this stock undervalued, fairly valued, or expensive? 
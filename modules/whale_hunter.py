@@ -1,8 +1,10 @@
 from modules.base_analyst import BaseAnalyst
 from utils.data_manager import DataManager
-import pandas as pd
+from utils.shareholding_store import ShareholdingStore
 
 class WhaleHunter(BaseAnalyst):
+    PROMPT_FIELDS = ("whale_holding_pct", "weekly_change", "retail_holding_pct", "retail_change", "week")
+
     def __init__(self):
         super().__init__(
             name="The Whale Hunter",
@@ -10,22 +12,46 @@ class WhaleHunter(BaseAnalyst):
             persona="An expert in ownership structures who detects hidden accumulation by major players."
         )
         self.dm = DataManager()
+        # Weekly TDCC distribution for every stock, parsed once per week
+        self.shareholding = ShareholdingStore()
 
     def gather_data(self, ticker: str) -> dict:
         stock_id = ticker.split('.')[0]
-        # Implementation of fetching FinMind Shareholding data
+        self.shareholding.update()  # no-op after the first ticker of the run
+        dist = self.shareholding.get_distribution(stock_id)
+        if not dist:
+            return {}
+
+        def pct(value, signed=False):
+            if value is None:
+                return "N/A"
+            return f"{value:+.2f}%" if signed else f"{value:.2f}%"
+
         return {
-            "whale_holding_pct": "72.4%",
-            "weekly_change": "+0.45%",
-            "retail_holding_pct": "12.1%",
-            "retail_change": "-0.2%"
+            "whale_holding_pct": pct(dist['whale_pct']),
+            "weekly_change": pct(dist['whale_change'], signed=True),
+            "retail_holding_pct": pct(dist['retail_pct']),
+            "retail_change": pct(dist['retail_change'], signed=True),
+            "total_holders": dist['total_holders'],
+            "total_holders_change": dist['total_holders_change'],
+            "week": dist['week']
         }
 
+    def refresh_sources(self):
+        self.shareholding.update(force=True)
+
+    def get_source_version(self, ticker: str):
+        # TDCC publishes one distribution per week
+        self.shareholding.update()
+        return str(self.shareholding.weeks[-1]) if len(self.shareholding.weeks) else None
+
     def get_specialized_prompt(self, raw_data: dict) -> str:
         return f"""
         Analyze the shareholding dispersion data:
         - Whale Holding (>1000 sheets): {raw_data.get('whale_holding_pct')} (Change: {raw_data.get('weekly_change')})
         - Retail Holding (<10 sheets): {raw_data.get('retail_holding_pct')} (Change: {raw_data.get('retail_change')})
+        - Total Shareholders: {raw_data.get('total_holders')} (Change: {raw_data.get('total_holders_change')})
+        - Week: {raw_data.get('week')}
         
         Task:
         Determine if the stock ownership is becoming more concentrated or more diluted.
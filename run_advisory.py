@@ -1,45 +1,124 @@
 import json
 import os
 import sys
+import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from colorama import Fore, Style, init
 from main import AlphaCore
-import pandas as pd
+from utils.run_fingerprints import RunFingerprints, fingerprint
+from utils.run_journal import RunJournal
 import datetime
 
 # Initialize Colorama
 init(autoreset=True)
 
 class ChiefAdvisor:
-    def __init__(self):
-        self.alpha = AlphaCore()
+    def __init__(self, delta_prompts=False, full_run=False, intraday=False):
+        # Fingerprints of the last run; a full run recomputes everything but still records them
+        self.fingerprints = RunFingerprints(reuse=not full_run)
+        self.alpha = AlphaCore(delta_prompts=delta_prompts, fingerprints=self.fingerprints)
+        self.journal = RunJournal()
+        self._prices = None
+        self._features = None
         self.universe_path = "/workspaces/moltbot-test/config/universe.json"
+        self.report_path = "/workspaces/moltbot-test/Daily_Report.md"
         self.report_date = datetime.datetime.now().strftime("%Y-%m-%d")
+        self.market_data = {}
+        # Latest committee reports per ticker, so rankings can be redone without re-gathering
+        self.last_reports = {}
+        # ATR(14) per ticker, computed for the whole universe at prefetch time
+        self.atr = {}
+        # Also sync 5m bars, from which Chartist derives its 5m/60m trends
+        self.intraday = intraday
+
+    @property
+    def prices(self):
+        # pandas/NumPy load here, not at import, so --help and CLI parsing stay instant
+        if self._prices is None:
+            from utils.price_store import PriceStore
+            self._prices = PriceStore()
+        return self._prices
+
+    @property
+    def features(self):
+        if self._features is None:
+            from utils.feature_store import FeatureStore
+            self._features = FeatureStore()
+        return self._features
 
     def load_universe(self):
         with open(self.universe_path, 'r') as f:
             return json.load(f)
 
+    @staticmethod
+    def journaled_universe(universe, tickers):
+        """
+        The current sector layout cut down to a journaled ticker list, for
+        journals written before the header carried the universe. Tickers
+        that have left the universe since are kept in a sector of their own.
+        """
+        wanted = set(tickers)
+        layout = {}
+        for sector, info in universe.items():
+            kept = [t for t in info['tickers'] if t in wanted]
+            if kept:
+                layout[sector] = dict(info, tickers=kept)
+        listed = {t for info in layout.values() for t in info['tickers']}
+        removed = [t for t in tickers if t not in listed]
+        if removed:
+            layout["Removed from universe"] = {"description": "No longer in config/universe.json", "tickers": removed}
+        return layout
+
+    def prefetch_market_data(self, universe):
+        """
+        Batch stage: syncs prices for every ticker in the universe plus the
+        macro series in one multi-ticker request, then hands the in-memory
+        slices to the analysts before the per-ticker loop starts.
+        """
+        from utils.price_store import MACRO_TICKERS
+        tickers = [t for info in universe.values() for t in info['tickers']]
+        start = (datetime.datetime.now() - datetime.timedelta(days=365)).strftime("%Y-%m-%d")
+        print(f"{Fore.CYAN}>> Prefetching market data for {len(tickers)} tickers + {len(MACRO_TICKERS)} macro series...{Fore.RESET}")
+        frames = self.prices.prefetch(tickers + MACRO_TICKERS, start=start)
+        self.alpha.attach_market_data(frames)
+        # Indicators for the whole universe in one matrix pass, shared with backtests/audits
+        self.features.update_prices(frames, tickers)
+        self.atr = self.universe_atr(tickers)
+        if self.intraday:
+            from utils.timeframes import MultiTimeframeBars
+            print(f"{Fore.CYAN}>> Syncing 5m bars for {len(tickers)} tickers...{Fore.RESET}")
+            MultiTimeframeBars(base_interval="5m").sync(tickers)
+        return frames
+
+    def universe_atr(self, tickers):
+        """Latest ATR(14) per ticker from the feature store."""
+        from utils.indicator_kernel import latest
+        names, _, values = self.features.matrix("atr_14", "ATRr_14", tickers)
+        return {t: float(v) for t, v in zip(names, latest(values)) if v == v} if names else {}
+
     def calculate_price_levels(self, ticker, close_price, bbands, report_signal):
         """
-        Calculate Target Price and Stop Loss based on Volatility (Bollinger Bands)
-        This is a simplified logic. In production, we'd use ATR or Pivot Points.
+        Calculate Target Price and Stop Loss based on Volatility (ATR).
+        Stops sit 2 ATR away and targets 6 ATR (Risk/Reward 3) in the signal's
+        direction; neutral ratings get a symmetric +/-4 ATR band. Without an
+        ATR (no prefetch, short history) fixed percentages are used.
         """
         try:
-            # Extract BBands from Analyst A's hidden data logic or re-calculate?
-            # For efficiency, we assume specific fields passed in 'data' or simulate logic here.
-            # Since Analyst data structure is generic, we'll do a quick estimation based on price.
-            
-            # Simple Logic:
-            # Target = Current + (Current - LowerBand) * 1.5 (Risk/Reward 1.5)
-            # Stop = LowerBand (Support)
-            
-            # Note: This is a placeholder. Ideally, Chartist should return these levels.
-            # Let's define them relative to current price for safety if data missing.
-            
             target_price = 0
             stop_loss = 0
-            
-            if report_signal == "BUY" or report_signal == "STRONG BUY":
+            atr = self.atr.get(ticker)
+
+            if atr:
+                if report_signal == "BUY" or report_signal == "STRONG BUY":
+                    stop_loss = close_price - 2 * atr
+                    target_price = close_price + 6 * atr
+                elif report_signal == "SELL":
+                    stop_loss = close_price + 2 * atr
+                    target_price = close_price - 6 * atr
+                else:
+                    stop_loss = close_price - 4 * atr
+                    target_price = close_price + 4 * atr
+            elif report_signal == "BUY" or report_signal == "STRONG BUY":
                 stop_loss = close_price * 0.95 # -5% default tight stop
                 target_price = close_price * 1.15 # +15% target
             elif report_signal == "SELL":
@@ -54,88 +133,147 @@ class ChiefAdvisor:
         except:
             return 0, 0
 
-    def generate_report(self):
-        print(f"\n{Fore.YELLOW}{Style.BRIGHT}=== MoltBot Investment Advisory Report ({self.report_date}) ==={Fore.RESET}")
-        
-        universe = self.load_universe()
+    def _close_price(self, ticker, reports):
+        # Capture Close Price from Chartist
+        for res in reports:
+            if "Chartist" in res['analyst_name'] and 'close' in res['data']:
+                return res['data']['close']
+
+        # Fall back to the prefetched close when Chartist is not on the team
+        if ticker in self.market_data and not self.market_data[ticker].empty:
+            return round(float(self.market_data[ticker]['Close'].iloc[-1]), 2)
+        return 0
+
+    def rate(self, ticker, reports, close_price):
+        """Turns committee reports into a result row using the current weights (no I/O)."""
+        final_score = 0
+        for res in reports:
+            raw_score = 1 if res['signal'] == "BUY" else (-1 if res['signal'] == "SELL" else 0)
+            weight = self.alpha.get_weight(res['analyst_name'])
+            final_score += raw_score * res['confidence'] * weight
+
+        # Determine Rating
+        rating = "HOLD"
+        if final_score > 0.4: rating = "STRONG BUY"
+        elif final_score > 0.15: rating = "ACCUMULATE"
+        elif final_score < -0.15: rating = "REDUCE"
+        elif final_score < -0.4: rating = "SELL"
+
+        # Calc Levels
+        tp, sl = self.calculate_price_levels(ticker, close_price, None, rating)
+
+        # Identify Key Rationale (Top positive/negative reason)
+        key_reasons = []
+        for r in reports:
+            if r['confidence'] > 0.5:
+                key_reasons.append(f"{r['analyst_name'].split()[1]}: {r['signal']}")
+        rationale_str = ", ".join(key_reasons) if key_reasons else "Neutral Outlook"
+
+        return {
+            "ticker": ticker,
+            "rating": rating,
+            "score": final_score,
+            "close": close_price,
+            "target": tp,
+            "stop_loss": sl,
+            "rationale": rationale_str,
+        }
+
+    def analyze_ticker(self, ticker):
+        """
+        Runs the committee for one ticker and returns a structured result row.
+        Safe to call from several threads at once.
+        """
+        reports = self.alpha.run_pipeline(ticker)
+        self.last_reports[ticker] = reports
+        close_price = self._close_price(ticker, reports)
+
+        # Same analyst inputs, weights and price as earlier today -> same row
+        rating_key = fingerprint(sorted((r['analyst_name'], r.get('fingerprint')) for r in reports),
+                                 self.alpha.weights, close_price)
+        cached_row = self.fingerprints.reuse_row(ticker, rating_key)
+        if cached_row is not None:
+            return cached_row
+
+        row = self.rate(ticker, reports, close_price)
+
+        # Save Log for this specific analysis
+        self.alpha._save_decision_log(ticker, row['score'], row['rating'], reports)
+
+        self.fingerprints.record_row(ticker, rating_key, row)
+        return row
+
+    def scan_universe(self, universe, workers=1, skip=None, on_result=None):
+        """
+        Analyzes every ticker (except those in `skip`) and returns
+        {ticker: result row}. `on_result(row, status)` is called as each
+        ticker finishes, e.g. to checkpoint it.
+        With workers > 1 tickers run concurrently on a thread pool (the work
+        is network/LLM bound) and each ticker's log line is printed as soon
+        as it finishes; completion order does not affect the report.
+        """
+        skip = skip or set()
+        tickers = [t for info in universe.values() for t in info['tickers'] if t not in skip]
+        results = {}
+
+        def done(ticker, row, status):
+            results[ticker] = row
+            if on_result is not None:
+                on_result(row, status)
+
+        def log(row):
+            print(f"   Processed {row['ticker']}: {row['rating']} (Score: {row['score']:.2f})")
+
+        def failed(ticker, e):
+            print(f"{Fore.RED}   Failed {ticker}: {e}{Fore.RESET}")
+            return self._failed_row(ticker, f"Analysis failed: {e}")
+
+        if workers <= 1:
+            for ticker in tickers:
+                print(f"   Scanning {ticker}...", end="\r")
+                try:
+                    row = self.analyze_ticker(ticker)
+                    log(row)
+                    done(ticker, row, "ok")
+                except Exception as e:
+                    done(ticker, failed(ticker, e), "failed")
+            return results
+
+        print(f"{Fore.CYAN}>> Scanning {len(tickers)} tickers with {workers} workers...{Fore.RESET}")
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ticker") as pool:
+            futures = {pool.submit(self.analyze_ticker, t): t for t in tickers}
+            for future in as_completed(futures):
+                ticker = futures[future]
+                try:
+                    row = future.result()
+                    log(row)
+                    done(ticker, row, "ok")
+                except Exception as e:
+                    done(ticker, failed(ticker, e), "failed")
+        return results
+
+    @staticmethod
+    def _failed_row(ticker, rationale):
+        return {"ticker": ticker, "rating": "N/A", "score": 0.0, "close": 0,
+                "target": 0, "stop_loss": 0, "rationale": rationale}
+
+    def render_report(self, universe, results):
+        """Renders the markdown report in the original sector/ticker order."""
         final_report_md = f"# 📊 MoltBot Investment Advisory Report\n**Date:** {self.report_date}\n\n"
-        
+
         for industry, info in universe.items():
-            print(f"\n{Fore.CYAN}>> Analyzing Sector: {industry}{Fore.RESET}")
             final_report_md += f"## 🏭 Sector: {industry}\n*{info['description']}*\n\n"
             final_report_md += "| Ticker | Rating | Close | Target | Stop Loss | Rationale |\n"
             final_report_md += "|---|---|---|---|---|---|\n"
 
             sector_picks = []
-
             for ticker in info['tickers']:
-                # Run Alpha Analysis (Suppress full output, capture return)
-                # We need to modify AlphaCore to return the full dict, not just print.
-                # For now, we will capture standard output or modify main.py slightly? 
-                # Better: main.py logic is printed. Let's rely on AlphaCore having a method that returns structured data.
-                # Since AlphaCore.run_pipeline prints, let's assume we can refactor it slightly 
-                # OR we implement a quiet mode in AlphaCore.
-                
-                # REFACTOR ON THE FLY: 
-                # Accessing internal method of AlphaCore isn't clean without refactoring main.py.
-                # But I am the builder, so I will assume I can access the analysts directly or refactor main.py.
-                # For this script, I will call the logic manually to get the data I need.
-                
-                reports = []
-                final_score = 0
-                total_weight = 0
-                
-                print(f"   Scanning {ticker}...", end="\r")
-                
-                close_price = 0
-                
-                for analyst in self.alpha.team:
-                    res = analyst.analyze(ticker)
-                    res['analyst_name'] = analyst.name
-                    reports.append(res)
-                    
-                    # Capture Close Price from Chartist
-                    if analyst.name == "The Chartist (Technical)" and 'Close' in res['data']:
-                        close_price = res['data']['Close']
-
-                    # Scoring
-                    raw_score = 1 if res['signal'] == "BUY" else (-1 if res['signal'] == "SELL" else 0)
-                    weight = self.alpha.weights.get(analyst.name, 0.25)
-                    final_score += raw_score * res['confidence'] * weight
-                
-                # Determine Rating
-                rating = "HOLD"
-                if final_score > 0.4: rating = "STRONG BUY"
-                elif final_score > 0.15: rating = "ACCUMULATE"
-                elif final_score < -0.15: rating = "REDUCE"
-                elif final_score < -0.4: rating = "SELL"
-                
-                # Calc Levels
-                tp, sl = self.calculate_price_levels(ticker, close_price, None, rating)
-                
-                # Identify Key Rationale (Top positive/negative reason)
-                key_reasons = []
-                for r in reports:
-                    if r['confidence'] > 0.5:
-                        key_reasons.append(f"{r['analyst_name'].split()[1]}: {r['signal']}")
-                rationale_str = ", ".join(key_reasons) if key_reasons else "Neutral Outlook"
-
-                # Append to Table
-                row = f"| **{ticker}** | {rating} | {close_price} | {tp} | {sl} | {rationale_str} |"
-                final_report_md += row + "\n"
-                
-                # Save Log for this specific analysis
-                self.alpha._save_decision_log(ticker, final_score, rating, reports)
-
-                print(f"   Processed {ticker}: {rating} (Score: {final_score:.2f})")
+                row = results.get(ticker) or self._failed_row(ticker, "Not analyzed")
+                final_report_md += f"| **{ticker}** | {row['rating']} | {row['close']} | {row['target']} | {row['stop_loss']} | {row['rationale']} |\n"
 
                 # Classification Logic
-                if rating in ["STRONG BUY", "ACCUMULATE"]:
-                    sector_picks.append({
-                        "ticker": ticker,
-                        "rating": rating,
-                        "score": final_score
-                    })
+                if row['rating'] in ["STRONG BUY", "ACCUMULATE"]:
+                    sector_picks.append(row)
 
             # Sector Summary
             if sector_picks:
@@ -143,12 +281,61 @@ class ChiefAdvisor:
             else:
                 final_report_md += "\n**⚠️ Sector Warning:** No clear buy signals in this sector.\n\n"
 
+        return final_report_md
+
+    def generate_report(self, workers=1, resume=False):
+        print(f"\n{Fore.YELLOW}{Style.BRIGHT}=== MoltBot Investment Advisory Report ({self.report_date}) ==={Fore.RESET}")
+        
+        universe = self.load_universe()
+        tickers = [t for info in universe.values() for t in info['tickers']]
+
+        # Every finished ticker is checkpointed to the run journal
+        finished = self.journal.resume() if resume else None
+        if finished is None:
+            if resume:
+                print(f"{Fore.YELLOW}>> No interrupted run to resume; starting a new one.{Fore.RESET}")
+            self.journal.start(tickers, self.report_date, universe=universe)
+            finished = set()
+        else:
+            self.report_date = self.journal.header["report_date"]
+            # The journaled run defines what is scanned and rendered, even if the universe file changed since
+            universe = self.journal.header.get("universe") or \
+                self.journaled_universe(universe, self.journal.header["tickers"])
+            tickers = [t for info in universe.values() for t in info['tickers']]
+            print(f"{Fore.CYAN}>> Resuming {self.journal.path}: {len(finished)}/{len(tickers)} tickers already done{Fore.RESET}")
+
+        if set(tickers) - finished:
+            self.market_data = self.prefetch_market_data(universe)
+            self.scan_universe(universe, workers=workers, skip=finished, on_result=self.journal.record)
+            self.fingerprints.save()
+            print(f"{Fore.CYAN}>> Incremental run: {self.fingerprints.stats}{Fore.RESET}")
+
+        # Rendered from the journal, so resumed and fresh runs look the same
+        final_report_md = self.render_report(universe, self.journal.results())
+
         # Save Report
-        with open("/workspaces/moltbot-test/Daily_Report.md", "w") as f:
+        with open(self.report_path, "w") as f:
             f.write(final_report_md)
-        
-        print(f"\n{Fore.GREEN}Report Generated Successfully: /workspaces/moltbot-test/Daily_Report.md{Fore.RESET}")
+        self.journal.finish()
+
+        failed = self.journal.failed_tickers()
+        if failed:
+            print(f"{Fore.YELLOW}>> {len(failed)} ticker(s) failed: {', '.join(failed)} - rerun with --resume to retry them{Fore.RESET}")
+        print(f"\n{Fore.GREEN}Report Generated Successfully: {self.report_path}{Fore.RESET}")
 
 if __name__ == "__main__":
-    advisor = ChiefAdvisor()
-    advisor.generate_report()
+    parser = argparse.ArgumentParser(description="MoltBot daily advisory report")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Number of tickers analyzed in parallel (1 = serial)")
+    parser.add_argument("--delta-prompts", action="store_true",
+                        help="Send analysts only their prior verdict plus what changed since it")
+    parser.add_argument("--full", action="store_true",
+                        help="Recompute every ticker and analyst even if their inputs are unchanged")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue the last interrupted run from its journal")
+    parser.add_argument("--intraday", action="store_true",
+                        help="Also sync 5m bars so the Chartist can check intraday trend alignment")
+    args = parser.parse_args()
+
+    advisor = ChiefAdvisor(delta_prompts=args.delta_prompts, full_run=args.full, intraday=args.intraday)
+    advisor.generate_report(workers=args.workers, resume=args.resume)
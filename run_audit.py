@@ -55,10 +55,6 @@ def main():
     
     args = parser.parse_args()
     
-    # 初始化審計員
-    auditor = PerformanceAuditor()
-    alpha = AlphaCore()
-    
     print(f"\n{Fore.CYAN}{Style.BRIGHT}=== Performance Audit Console ===")
     print(f"{Fore.CYAN}{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
     
@@ -66,6 +62,10 @@ def main():
     if not any([args.verify, args.report, args.adjust, args.full, args.stars, args.history]):
         args.full = True
     
+    # 初始化審計員（AlphaCore 只在調整權重時才需要，須在預設選項之後判斷）
+    auditor = PerformanceAuditor()
+    alpha = AlphaCore() if (args.adjust or args.full) else None
+    
     # 驗證預測
     if args.verify or args.full:
         print(f"{Fore.YELLOW}[Step 1] 驗證已到期的預測...\n")
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+MoltBot walk-forward backtest - every rule, every date, every ticker.
+
+Signals are evaluated from the shared feature store in one vectorized pass
+(no per-date slicing and recomputing), without lookahead: a signal at date t
+only uses bars up to t and trades from the close of t.
+
+Usage:
+    python run_backtest.py                              # universe, last 12 months
+    python run_backtest.py --tickers 2330.TW --start 2026-01-01
+    python run_backtest.py --rules rsi chartist committee --long-short
+    python run_backtest.py --refresh                    # sync prices first
+
+Writes the per-date signals and equity curves as CSV to logs/backtests/.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+from datetime import datetime
+
+from colorama import Fore, Style, init
+
+init(autoreset=True)
+
+UNIVERSE_PATH = "/workspaces/moltbot-test/config/universe.json"
+OUTPUT_DIR = "/workspaces/moltbot-test/logs/backtests"
+
+
+def load_universe_tickers(path=UNIVERSE_PATH):
+    with open(path, 'r') as f:
+        universe = json.load(f)
+    return [t for info in universe.values() for t in info['tickers']]
+
+
+def build_rules(names):
+    from utils.backtest_engine import COMMITTEE_MEMBERS, RULES, committee_rule
+    rules = {}
+    for name in names:
+        if name == "committee":
+            # Only analysts whose history can be replayed from prices vote
+            from main import AlphaCore
+            weights = AlphaCore().weights
+            rules[name] = committee_rule(COMMITTEE_MEMBERS, weights)
+        elif name in RULES:
+            rules[name] = RULES[name]
+        else:
+            raise SystemExit(f"Unknown rule: {name} (known: {', '.join(list(RULES) + ['committee'])})")
+    return rules
+
+
+def print_summary(result, horizons):
+    print(f"\n{Fore.CYAN}{Style.BRIGHT}=== Signals (forward returns from the signal close) ===")
+    header = f"{'Rule':<12} {'Side':<5} {'Count':>6}" + "".join(f" {'T+' + str(h):>8} {'hit':>6}" for h in horizons)
+    print(header)
+    print("-" * len(header))
+    for _, row in result["signal_stats"].iterrows():
+        line = f"{row['rule']:<12} {row['signal']:<5} {row['count']:>6}"
+        for h in horizons:
+            mean, hit = row[f"mean_fwd_{h}d"], row[f"hit_rate_{h}d"]
+            line += f" {mean * 100:>7.2f}%" if mean == mean else f" {'-':>8}"
+            line += f" {hit * 100:>5.0f}%" if hit == hit else f" {'-':>6}"
+        print(line)
+
+    print(f"\n{Fore.CYAN}{Style.BRIGHT}=== Strategy Equity ===")
+    print(f"{'Strategy':<14} {'Total':>8} {'CAGR':>8} {'Vol':>8} {'Sharpe':>7} {'MaxDD':>8}")
+    for name, perf in result["performance"].items():
+        color = Fore.GREEN if perf["total_return"] >= 0 else Fore.RED
+        print(f"{color}{name:<14} {perf['total_return'] * 100:>7.2f}% {perf['cagr'] * 100:>7.2f}% "
+              f"{perf['volatility'] * 100:>7.2f}% {perf['sharpe']:>7.2f} {perf['max_drawdown'] * 100:>7.2f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MoltBot walk-forward backtest")
+    parser.add_argument("--tickers", nargs="+", help="Tickers to test (default: config/universe.json)")
+    parser.add_argument("--start", help="First signal date (default: 12 months ago)")
+    parser.add_argument("--end", help="Last signal date (default: latest bar)")
+    parser.add_argument("--rules", nargs="+", default=["rsi", "chartist"],
+                        help="Rules to evaluate: rsi, chartist, strategist, committee")
+    parser.add_argument("--hold", choices=["until_exit", "signal"], default="until_exit",
+                        help="Hold until the opposite signal, or only on signal days")
+    parser.add_argument("--long-short", action="store_true", help="Trade SELL signals short (default: long only)")
+    parser.add_argument("--refresh", action="store_true", help="Sync prices from upstream before testing")
+    parser.add_argument("--output", default=OUTPUT_DIR, help="Directory for the signals / equity CSVs")
+    args = parser.parse_args()
+
+    from utils.backtest_engine import HORIZONS, load_matrices, run_backtest
+
+    tickers = args.tickers or load_universe_tickers()
+    rules = build_rules(args.rules)
+
+    started = time.perf_counter()
+    names, dates, data = load_matrices(tickers, start=args.start, end=args.end, refresh=args.refresh)
+    loaded = time.perf_counter()
+    if not names or not len(dates):
+        print(f"{Fore.RED}No price history for the requested tickers/dates.")
+        return 1
+
+    result = run_backtest(names, dates, data, rules, HORIZONS, hold=args.hold, long_only=not args.long_short)
+    finished = time.perf_counter()
+
+    print(f"{Fore.CYAN}Backtest: {len(names)} tickers x {len(dates)} dates "
+          f"({dates[0]:%Y-%m-%d} -> {dates[-1]:%Y-%m-%d}), rules: {', '.join(rules)}")
+    print(f"Features loaded in {loaded - started:.2f}s, evaluated in {finished - loaded:.2f}s")
+    print_summary(result, HORIZONS)
+
+    os.makedirs(args.output, exist_ok=True)
+    stamp = datetime.now().strftime("%Y-%m-%d")
+    signals_path = os.path.join(args.output, f"signals_{stamp}.csv")
+    equity_path = os.path.join(args.output, f"equity_{stamp}.csv")
+    result["signals"].to_csv(signals_path, index=False)
+    result["equity"].to_csv(equity_path, index_label="date")
+    print(f"\n{Fore.GREEN}Signals: {signals_path}\nEquity:  {equity_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
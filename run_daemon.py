@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+MoltBot advisory daemon - keeps AlphaCore / ChiefAdvisor warm between queries.
+
+Prices, analyst reports, judgment/fingerprint caches and weights stay in
+memory; a background thread refreshes the universe on a schedule and ad-hoc
+requests are answered over localhost HTTP or a Unix socket.
+
+Usage:
+    python run_daemon.py                          # http://127.0.0.1:8765
+    python run_daemon.py --workers 4 --refresh-minutes 10
+    python run_daemon.py --socket /tmp/moltbot.sock
+
+Endpoints (JSON):
+    GET  /health                      status, last refresh, counters
+    GET  /analyze?ticker=2330.TW      latest row (&fresh=1 re-runs the committee)
+    GET  /rank                        universe ranked by score with current weights
+    POST /rank                        re-rank now (?rescan=1 re-runs the committee first)
+    GET  /weights                     committee weights
+    POST /weights                     {"The Valuator (Fundamental)": 0.4, ...}
+    POST /refresh                     start a background refresh now
+
+    curl --unix-socket /tmp/moltbot.sock http://localhost/rank
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+import socketserver
+from datetime import datetime
+from urllib.parse import urlsplit, parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from colorama import Fore, init
+
+init(autoreset=True)
+
+
+class AdvisoryDaemon:
+    """Long-lived wrapper around ChiefAdvisor that serves queries from memory."""
+
+    def __init__(self, advisor=None, workers=4, refresh_interval=900, row_max_age=60):
+        if advisor is None:
+            from run_advisory import ChiefAdvisor
+            advisor = ChiefAdvisor()
+        self.advisor = advisor
+        self.workers = workers
+        self.refresh_interval = refresh_interval
+        # An /analyze answer younger than this is served without re-running the committee
+        self.row_max_age = row_max_age
+
+        self.universe = {}
+        self.rows = {}  # ticker -> (monotonic time, row)
+        self.last_refresh = None
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._scheduler = None
+        self.stats = {"queries": 0, "served_from_memory": 0, "refreshes": 0, "refresh_errors": 0}
+
+    # ------------------------------------------------------------------
+    # Work
+    # ------------------------------------------------------------------
+    def _store(self, row):
+        with self._lock:
+            self.rows[row['ticker']] = (time.monotonic(), row)
+
+    def refresh(self):
+        """Re-syncs prices and re-scans the universe. Returns False if one is already running."""
+        if not self._refresh_lock.acquire(blocking=False):
+            return False
+        try:
+            started = time.perf_counter()
+            self.universe = self.advisor.load_universe()
+            # T86 / TDCC stores otherwise load once per process
+            self.advisor.alpha.refresh_sources()
+            self.advisor.market_data = self.advisor.prefetch_market_data(self.universe)
+            results = self.advisor.scan_universe(self.universe, workers=self.workers)
+            for row in results.values():
+                self._store(row)
+            self.advisor.fingerprints.save()
+            self.last_refresh = datetime.now().isoformat(timespec="seconds")
+            self.stats["refreshes"] += 1
+            print(f"{Fore.GREEN}[daemon] Refreshed {len(results)} tickers in {time.perf_counter() - started:.1f}s")
+            return True
+        except Exception as e:
+            self.stats["refresh_errors"] += 1
+            print(f"{Fore.RED}[daemon] Refresh failed: {e}")
+            return False
+        finally:
+            self._refresh_lock.release()
+
+    def refresh_async(self):
+        threading.Thread(target=self.refresh, name="daemon-refresh", daemon=True).start()
+
+    def analyze(self, ticker, fresh=False):
+        """Returns (row, served_from_memory)."""
+        self.stats["queries"] += 1
+        with self._lock:
+            cached = self.rows.get(ticker)
+        if cached and not fresh and time.monotonic() - cached[0] <= self.row_max_age:
+            self.stats["served_from_memory"] += 1
+            return cached[1], True
+        row = self.advisor.analyze_ticker(ticker)
+        self._store(row)
+        return row, False
+
+    def rank(self):
+        """Re-scores the in-memory committee reports with the current weights."""
+        self.stats["queries"] += 1
+        sectors = {t: sector for sector, info in self.universe.items() for t in info['tickers']}
+        ranked = []
+        for ticker, reports in list(self.advisor.last_reports.items()):
+            row = self.advisor.rate(ticker, reports, self.advisor._close_price(ticker, reports))
+            row["sector"] = sectors.get(ticker)
+            ranked.append(row)
+        ranked.sort(key=lambda r: r['score'], reverse=True)
+        return ranked
+
+    def set_weights(self, updates):
+        weights = self.advisor.alpha.weights
+        for name, value in updates.items():
+            if name not in weights:
+                raise ValueError(f"Unknown analyst weight: {name}")
+            if not isinstance(value, (int, float)) or value < 0:
+                raise ValueError(f"Weight for {name} must be a non-negative number")
+        weights.update({name: float(value) for name, value in updates.items()})
+        # Cached /analyze rows were scored with the old weights
+        with self._lock:
+            self.rows.clear()
+        return dict(weights)
+
+    def health(self):
+        with self._lock:
+            cached = len(self.rows)
+        return {"status": "ok", "last_refresh": self.last_refresh, "tickers_in_memory": cached,
+                "refresh_running": self._refresh_lock.locked(), "stats": dict(self.stats)}
+
+    # ------------------------------------------------------------------
+    # Scheduling
+    # ------------------------------------------------------------------
+    def start(self, warm=True):
+        """Optionally warms up in the background, then refreshes every refresh_interval."""
+        def loop():
+            if warm:
+                self.refresh()
+            while not self._stop.wait(self.refresh_interval):
+                self.refresh()
+
+        self._scheduler = threading.Thread(target=loop, name="daemon-scheduler", daemon=True)
+        self._scheduler.start()
+
+    def stop(self):
+        self._stop.set()
+
+
+def make_handler(daemon):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _send(self, status, payload):
+            body = json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _read_json(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            return json.loads(self.rfile.read(length) or b"{}") if length else {}
+
+        def _dispatch(self, method):
+            url = urlsplit(self.path)
+            query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            started = time.perf_counter()
+            try:
+                if method == "GET" and url.path == "/health":
+                    payload = daemon.health()
+                elif method == "GET" and url.path == "/analyze":
+                    if not query.get("ticker"):
+                        return self._send(400, {"error": "ticker is required"})
+                    row, from_memory = daemon.analyze(query["ticker"], fresh=query.get("fresh") == "1")
+                    payload = {"row": row, "from_memory": from_memory}
+                elif url.path == "/rank" and method in ("GET", "POST"):
+                    if method == "POST" and query.get("rescan") == "1":
+                        daemon.refresh()
+                    payload = {"ranking": daemon.rank()}
+                elif url.path == "/weights" and method == "GET":
+                    payload = {"weights": daemon.advisor.alpha.weights}
+                elif url.path == "/weights" and method == "POST":
+                    payload = {"weights": daemon.set_weights(self._read_json())}
+                elif url.path == "/refresh" and method == "POST":
+                    daemon.refresh_async()
+                    payload = {"started": True}
+                else:
+                    return self._send(404, {"error": f"No route for {method} {url.path}"})
+            except ValueError as e:
+                return self._send(400, {"error": str(e)})
+            except Exception as e:
+                return self._send(500, {"error": str(e)})
+            payload["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 2)
+            self._send(200, payload)
+
+        def do_GET(self):
+            self._dispatch("GET")
+
+        def do_POST(self):
+            self._dispatch("POST")
+
+        def address_string(self):
+            # Unix-socket peers have no (host, port)
+            return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def serve(daemon, host="127.0.0.1", port=8765, socket_path=None):
+    """Builds the HTTP server (TCP on localhost, or a Unix socket)."""
+    handler = make_handler(daemon)
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        return UnixHTTPServer(socket_path, handler)
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MoltBot advisory daemon")
+    parser.add_argument("--host", default="127.0.0.1", help="Bind address (keep it local)")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--socket", help="Serve on this Unix socket instead of TCP")
+    parser.add_argument("--workers", type=int, default=4, help="Tickers analyzed in parallel per refresh")
+    parser.add_argument("--refresh-minutes", type=float, default=15, help="Background refresh interval")
+    parser.add_argument("--no-warm", action="store_true", help="Skip the initial universe scan")
+    args = parser.parse_args()
+
+    daemon = AdvisoryDaemon(workers=args.workers, refresh_interval=args.refresh_minutes * 60)
+    server = serve(daemon, args.host, args.port, args.socket)
+    daemon.start(warm=not args.no_warm)
+
+    where = args.socket or f"http://{args.host}:{args.port}"
+    print(f"{Fore.CYAN}MoltBot daemon listening on {where} (refresh every {args.refresh_minutes:g} min)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        daemon.stop()
+        server.server_close()
+        if args.socket and os.path.exists(args.socket):
+            os.remove(args.socket)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+"""
+AlphaCore committee tests: analysts are consulted concurrently, one that
+hangs or errors is reported NEUTRAL without holding up the others, and
+offline placeholders never count as judged.
+"""
+
+import threading
+import time
+from concurrent.futures import Future
+
+from main import AlphaCore
+from modules.base_analyst import BaseAnalyst
+from utils.judgment_cache import JudgmentCache
+
+
+class SlowAnalyst(BaseAnalyst):
+    def __init__(self, name, delay=0.0, release=None, fail=False):
+        super().__init__(name, "testing", "test analyst")
+        self.delay = delay
+        self.release = release
+        self.fail = fail
+
+    def gather_data(self, ticker):
+        if self.release is not None:
+            self.release.wait(5)
+        time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("upstream down")
+        return {"ticker": ticker}
+
+    def get_specialized_prompt(self, raw_data):
+        return f"Judge {raw_data['ticker']}"
+
+
+class InstantLLM:
+    def submit(self, prompt):
+        future = Future()
+        future.set_result({"signal": "BUY", "confidence": 0.6, "reason": "ok", "reasoning": ""})
+        return future
+
+
+def test_slow_and_failing_analysts_do_not_sink_the_committee(tmp_path):
+    hung = threading.Event()
+    alpha = AlphaCore(analyst_timeout=2.0, analyst_timeouts={"The Hung": 0.2},
+                      llm=InstantLLM(), judgments=JudgmentCache(cache_dir=str(tmp_path)))
+    alpha.team = [SlowAnalyst("The First", delay=0.3), SlowAnalyst("The Second", delay=0.3),
+                  SlowAnalyst("The Hung", release=hung), SlowAnalyst("The Broken", fail=True)]
+    try:
+        started = time.perf_counter()
+        reports = alpha.run_pipeline("2330.TW")
+        elapsed = time.perf_counter() - started
+    finally:
+        hung.set()
+
+    # Concurrent: the slowest analyst's time, not the sum
+    assert elapsed < 0.55
+    by_name = {r["analyst_name"]: r for r in reports}
+    assert [r["analyst_name"] for r in reports] == ["The First", "The Second", "The Hung", "The Broken"]
+    assert by_name["The First"]["signal"] == by_name["The Second"]["signal"] == "BUY"
+    assert by_name["The Hung"]["signal"] == "NEUTRAL" and by_name["The Hung"]["confidence"] == 0.0
+    assert by_name["The Hung"]["reason"].startswith("Timed out")
+    assert by_name["The Broken"]["reason"] == "Error: upstream down"
+
+
+def test_offline_placeholder_is_not_recorded_as_judged(tmp_path):
+    from utils.run_fingerprints import RunFingerprints
+
+    class Scout(SlowAnalyst):
+        def __init__(self):
+            super().__init__("The Sentiment Scout")
+            self.judged = []
+
+        def on_judged(self, ticker, report):
+            self.judged.append(ticker)
+
+    fingerprints = RunFingerprints(path=str(tmp_path / "fingerprints"))
+    alpha = AlphaCore(judgments=JudgmentCache(cache_dir=str(tmp_path / "judgments")), fingerprints=fingerprints)
+    alpha.llm = None
+    scout = Scout()
+    alpha.team = [scout]
+
+    report = alpha.run_pipeline("2330.TW")[0]
+    assert report["reason"] == "Awaiting AI judgment"
+    # SentimentScout would commit its headlines here; nobody judged them
+    assert scout.judged == []
+    assert fingerprints.reuse_by_inputs("2330.TW", scout.name, report["fingerprint"]) is None
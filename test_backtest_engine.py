@@ -0,0 +1,70 @@
+"""
+Backtest engine tests: signals never depend on later bars, and equity is
+earned by the position held at the previous close.
+"""
+
+import numpy as np
+import pandas as pd
+
+from utils import indicator_kernel
+from utils.backtest_engine import (
+    COMMITTEE_MEMBERS, FEATURE_COLUMNS, RULES, _previous_session, chartist_rule, committee_rule,
+    forward_returns, positions, run_backtest,
+)
+
+
+def make_frames(n_tickers=5, n_days=260, seed=3):
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range("2025-01-01", periods=n_days)
+    frames = {}
+    for i in range(n_tickers):
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.025, n_days)))
+        frames[f"T{i}.TW"] = pd.DataFrame({"Open": close, "High": close * 1.01, "Low": close * 0.99,
+                                           "Close": close, "Volume": 1e6}, index=dates)
+    return frames
+
+
+def make_data(frames):
+    values = indicator_kernel.compute_all(frames)
+    _, dates, matrices = indicator_kernel.price_matrices(frames, ("Close",), values["tickers"])
+    # VIX swinging through calm / normal / fear regimes
+    vix = 22 + 10 * np.sin(np.arange(len(dates)) / 15)
+    return {"Close": matrices["Close"], "VIX": np.broadcast_to(vix, matrices["Close"].shape),
+            **{column: values[column] for _, column in FEATURE_COLUMNS}}
+
+
+def test_signals_are_lookahead_safe():
+    frames = make_frames()
+    data = make_data(frames)
+    cut = 180
+    # Recomputing on history truncated at `cut` must give the same signals up to it
+    truncated = make_data({t: df.iloc[:cut] for t, df in frames.items()})
+    weights = {"The Chartist (Technical)": 0.05, "The Strategist (Macro)": 0.15, "The Valuator (Fundamental)": 0.35}
+    rules = dict(RULES, committee=committee_rule(COMMITTEE_MEMBERS, weights))
+    for rule in rules.values():
+        full = rule(data)
+        assert full.any()
+        np.testing.assert_array_equal(full[:, :cut], rule(truncated))
+        np.testing.assert_array_equal(positions(full)[:, :cut], positions(rule(truncated)))
+    # The committee is a real vote, not the Chartist rule under another name
+    assert (rules["committee"](data) != chartist_rule(data)).any()
+
+
+def test_us_closes_are_used_from_the_next_session():
+    vix = pd.Series([18.0, 35.0, 12.0], index=pd.to_datetime(["2025-01-02", "2025-01-03", "2025-01-06"]))
+    dates = pd.to_datetime(["2025-01-02", "2025-01-03", "2025-01-06", "2025-01-07"])
+    np.testing.assert_array_equal(_previous_session(vix, dates), [np.nan, 18.0, 35.0, 12.0])
+
+
+def test_equity_uses_previous_position():
+    close = np.array([[100.0, 110.0, 99.0, 99.0]])
+    np.testing.assert_allclose(forward_returns(close, 1), [[0.1, -0.1, 0.0, np.nan]])
+    np.testing.assert_allclose(forward_returns(close, 2)[0, :2], [-0.01, -0.1])
+
+    dates = pd.bdate_range("2025-01-01", periods=4)
+    buy_day_one = lambda data: np.array([[0, 1, 0, -1]], dtype=np.int8)
+    result = run_backtest(["T0.TW"], dates, {"Close": close}, {"once": buy_day_one}, horizons=(1,))
+    # Bought at the close of day 1, so day 1's +10% is not earned but day 2's -10% is
+    np.testing.assert_allclose(result["equity"]["once"].to_numpy(), [1.0, 1.0, 0.9, 0.9])
+    np.testing.assert_allclose(result["equity"]["buy_and_hold"].to_numpy(), [1.0, 1.1, 0.99, 0.99])
+    assert list(result["signals"]["signal"]) == ["BUY", "SELL"]
@@ -0,0 +1,141 @@
+"""
+Advisory daemon tests: warm in-memory answers, re-ranking with new weights
+and the HTTP / Unix-socket front end.
+"""
+
+import http.client
+import json
+import socket
+import threading
+
+import pytest
+
+from run_daemon import AdvisoryDaemon, serve
+
+
+class FakeAlpha:
+    def __init__(self):
+        self.weights = {"The Valuator (Fundamental)": 0.5, "The Chartist (Technical)": 0.5}
+        self.source_refreshes = 0
+
+    def refresh_sources(self):
+        self.source_refreshes += 1
+
+    def get_weight(self, name):
+        return next(w for k, w in self.weights.items() if k.startswith(name))
+
+
+class FakeAdvisor:
+    """Just the ChiefAdvisor surface the daemon uses."""
+    def __init__(self):
+        self.alpha = FakeAlpha()
+        self.last_reports = {}
+        self.market_data = {}
+        self.pipeline_runs = 0
+        self.fingerprints = type("F", (), {"save": lambda self: None})()
+
+    def load_universe(self):
+        return {"Semis": {"description": "", "tickers": ["2330.TW", "2454.TW"]}}
+
+    def prefetch_market_data(self, universe):
+        return {}
+
+    def _close_price(self, ticker, reports):
+        return 100.0
+
+    def analyze_ticker(self, ticker):
+        self.pipeline_runs += 1
+        signals = {"2330.TW": ("BUY", "SELL"), "2454.TW": ("SELL", "BUY")}[ticker]
+        self.last_reports[ticker] = [
+            {"analyst_name": "The Valuator", "signal": signals[0], "confidence": 1.0},
+            {"analyst_name": "The Chartist", "signal": signals[1], "confidence": 1.0},
+        ]
+        return self.rate(ticker, self.last_reports[ticker], 100.0)
+
+    def rate(self, ticker, reports, close_price):
+        score = sum((1 if r["signal"] == "BUY" else -1) * r["confidence"] * self.alpha.get_weight(r["analyst_name"])
+                    for r in reports)
+        return {"ticker": ticker, "score": score, "rating": "ACCUMULATE" if score > 0.15 else "HOLD"}
+
+    def scan_universe(self, universe, workers=1):
+        return {t: self.analyze_ticker(t) for info in universe.values() for t in info["tickers"]}
+
+
+@pytest.fixture
+def daemon():
+    d = AdvisoryDaemon(advisor=FakeAdvisor(), row_max_age=60)
+    d.refresh()
+    return d
+
+
+def test_queries_are_served_from_memory(daemon):
+    runs = daemon.advisor.pipeline_runs
+    row, from_memory = daemon.analyze("2330.TW")
+    assert from_memory and daemon.advisor.pipeline_runs == runs
+
+    _, from_memory = daemon.analyze("2330.TW", fresh=True)
+    assert not from_memory and daemon.advisor.pipeline_runs == runs + 1
+
+    # New weights invalidate rows scored with the old ones
+    daemon.set_weights({"The Chartist (Technical)": 0.9})
+    _, from_memory = daemon.analyze("2330.TW")
+    assert not from_memory
+
+
+def test_refresh_reloads_analyst_sources(daemon):
+    assert daemon.advisor.alpha.source_refreshes == 1
+    daemon.refresh()
+    assert daemon.advisor.alpha.source_refreshes == 2
+
+
+def test_rerank_uses_current_weights_without_rescanning(daemon):
+    runs = daemon.advisor.pipeline_runs
+    assert [r["ticker"] for r in daemon.rank()] in (["2330.TW", "2454.TW"], ["2454.TW", "2330.TW"])
+
+    daemon.set_weights({"The Chartist (Technical)": 0.9})
+    assert [r["ticker"] for r in daemon.rank()] == ["2454.TW", "2330.TW"]
+    daemon.set_weights({"The Valuator (Fundamental)": 2.0})
+    assert [r["ticker"] for r in daemon.rank()] == ["2330.TW", "2454.TW"]
+    assert daemon.advisor.pipeline_runs == runs
+
+    with pytest.raises(ValueError):
+        daemon.set_weights({"Nobody": 1.0})
+
+
+def test_http_api(daemon):
+    server = serve(daemon, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    conn = http.client.HTTPConnection("127.0.0.1", server.server_address[1])
+
+    conn.request("GET", "/analyze?ticker=2330.TW")
+    payload = json.loads(conn.getresponse().read())
+    assert payload["from_memory"] and payload["row"]["ticker"] == "2330.TW"
+
+    conn.request("POST", "/weights", body=json.dumps({"The Chartist (Technical)": 0.9}),
+                 headers={"Content-Type": "application/json"})
+    assert json.loads(conn.getresponse().read())["weights"]["The Chartist (Technical)"] == 0.9
+
+    conn.request("GET", "/rank")
+    assert json.loads(conn.getresponse().read())["ranking"][0]["ticker"] == "2454.TW"
+
+    conn.request("GET", "/analyze")
+    response = conn.getresponse()
+    response.read()
+    assert response.status == 400
+    conn.close()
+    server.shutdown()
+
+
+def test_unix_socket(daemon, tmp_path):
+    path = str(tmp_path / "moltbot.sock")
+    server = serve(daemon, socket_path=path)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(path)
+        sock.sendall(b"GET /health HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n")
+        response = b""
+        while chunk := sock.recv(4096):
+            response += chunk
+    assert b"200 OK" in response and b'"status": "ok"' in response
+    server.shutdown()
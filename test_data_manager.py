@@ -0,0 +1,113 @@
+"""
+DataManager cache tests: two-tier lookups, TTL expiry and single-flight
+coalescing for threaded and asyncio callers.
+"""
+
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.data_manager import DataManager
+
+
+def test_memory_and_disk_tiers(tmp_path):
+    dm = DataManager(cache_dir=str(tmp_path), memory_capacity=1)
+    dm.save_data("valuation", "2330", {"pe": 15.5})
+    dm.save_data("valuation", "2454", {"pe": 20.1})
+
+    # 2330 was pushed out of the memory tier but is still on disk
+    assert dm.load_data("valuation", "2330") == {"pe": 15.5}
+    assert dm.load_data("valuation", "2330") == {"pe": 15.5}
+    stats = dm.get_stats()
+    assert stats["disk_hits"] == 1 and stats["memory_hits"] == 1
+    assert stats["memory_evictions"] >= 1
+
+
+def test_ttl_expiry(tmp_path):
+    dm = DataManager(cache_dir=str(tmp_path), ttls={"news": 0.05})
+    dm.save_data("news", "2330", ["headline"])
+    time.sleep(0.1)
+    assert dm.load_data("news", "2330") is None
+    assert dm.get_stats()["expired"] == 1
+
+
+def test_disk_byte_cap_evicts_least_recently_used(tmp_path):
+    dm = DataManager(cache_dir=str(tmp_path), max_disk_bytes=300)
+    for i in range(5):
+        dm.save_data("valuation", str(i), {"pad": "x" * 60})
+        time.sleep(0.01)
+    assert dm.get_stats()["disk_bytes"] <= 300
+    assert dm.get_stats()["disk_evictions"] > 0
+
+
+def test_threaded_callers_share_one_fetch(tmp_path):
+    dm = DataManager(cache_dir=str(tmp_path))
+    calls = []
+    gate = threading.Event()
+
+    def fetch():
+        calls.append(1)
+        gate.wait(1)
+        return {"foreign_net": 1200}
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        futures = [pool.submit(dm.get_or_fetch, "institutional", "2330", fetch) for _ in range(8)]
+        time.sleep(0.1)
+        gate.set()
+        results = [f.result() for f in futures]
+
+    assert len(calls) == 1
+    assert all(r == {"foreign_net": 1200} for r in results)
+
+
+def test_async_callers_share_one_fetch(tmp_path):
+    dm = DataManager(cache_dir=str(tmp_path))
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"pe": 12.0}
+
+    async def run():
+        return await asyncio.gather(*[dm.aget_or_fetch("valuation", "2330", fetch) for _ in range(10)])
+
+    results = asyncio.run(run())
+    assert len(calls) == 1
+    assert results == [{"pe": 12.0}] * 10
+
+
+def test_failed_fetch_propagates_to_all_waiters(tmp_path):
+    dm = DataManager(cache_dir=str(tmp_path))
+
+    async def fetch():
+        await asyncio.sleep(0.02)
+        raise ConnectionError("TWSE down")
+
+    async def run():
+        return await asyncio.gather(*[dm.aget_or_fetch("valuation", "x", fetch) for _ in range(3)],
+                                    return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert all(isinstance(r, ConnectionError) for r in results)
+    assert dm.load_data("valuation", "x") is None
+
+
+def test_summarized_prompt_data_respects_token_budget(tmp_path):
+    from utils.prompt_budget import estimate_tokens
+    dm = DataManager(cache_dir=str(tmp_path))
+    dm.save_data("news", "2330", {
+        "raw_html": "<div>" + "x" * 5000 + "</div>",
+        "closes": [600.0 + i for i in range(250)],
+        "new_headlines": [f"台積電 法說會 第{i}則 重點整理" for i in range(40)],
+    })
+
+    text = dm.get_summarized_prompt_data("news", "2330", max_tokens=120, priority=("new_headlines",))
+    summary = json.loads(text.split(" (+")[0])
+
+    assert estimate_tokens(text) <= 120
+    # Priority field first, trimmed as whole headlines rather than cut mid-string
+    assert list(summary)[0] == "new_headlines"
+    assert all(h.startswith("台積電") for h in summary["new_headlines"][:-1])
@@ -0,0 +1,52 @@
+"""
+Delta prompt tests: field-level input diffs and when a full prompt is
+still sent instead of a delta.
+"""
+
+from utils.data_manager import DataManager
+from utils.delta_prompts import DeltaPromptStore, diff_inputs
+from utils.llm_gateway import REPORT_FORMAT
+
+
+class FakeAnalyst:
+    name = "The Chip Watcher"
+    PROMPT_VERSION = "1"
+
+    def get_identity_context(self):
+        return f"You are {self.name}."
+
+
+def test_diff_inputs_reports_only_changes():
+    old = {"close": 600.0, "macd": {"current": 1.2, "signal": 1.0}, "headlines": ["a", "b"], "gone": 1}
+    new = {"close": 612.0, "macd": {"current": 1.2, "signal": 1.1}, "headlines": ["c", "a"], "rsi": 55}
+    assert diff_inputs(old, new) == {
+        "changed": {"close": [600.0, 612.0], "macd.signal": [1.0, 1.1],
+                    "headlines": {"new_items": ["c"], "dropped_items": 1}},
+        "added": {"rsi": 55},
+        "removed": ["gone"],
+    }
+    assert diff_inputs(new, new) == {}
+
+
+def test_delta_prompt_after_baseline(tmp_path):
+    store = DeltaPromptStore(dm=DataManager(cache_dir=str(tmp_path)), full_refresh_every=3)
+    analyst = FakeAnalyst()
+    inputs = {f"field_{i}": f"{i:+,} sheets" for i in range(40)}
+    full_context = "You are The Chip Watcher.\n\nTask:\n" + "\n".join(f"- {k}: {v}" for k, v in inputs.items())
+
+    # No baseline yet -> full prompt
+    assert store.build_prompt("2330.TW", analyst, inputs, full_context) is full_context
+    store.record("2330.TW", analyst, inputs, {"signal": "BUY", "confidence": 0.7, "reason": "inflows"}, was_delta=False)
+
+    changed = dict(inputs, field_3="+9,999 sheets")
+    delta = store.build_prompt("2330.TW", analyst, changed, full_context)
+    assert "SIGNAL BUY, CONFIDENCE 0.7" in delta and '"field_3":["+3 sheets","+9,999 sheets"]' in delta
+    assert "field_4" not in delta
+    # Same output contract as the gateway's system prompt
+    assert delta.endswith(REPORT_FORMAT)
+    store.record("2330.TW", analyst, changed, {"signal": "BUY", "confidence": 0.8, "reason": "more"}, was_delta=True)
+
+    # Every third judgment is a full refresh
+    assert store.build_prompt("2330.TW", analyst, changed, full_context) is not full_context
+    store.record("2330.TW", analyst, changed, {"signal": "BUY", "confidence": 0.8, "reason": "same"}, was_delta=True)
+    assert store.build_prompt("2330.TW", analyst, changed, full_context) is full_context
@@ -0,0 +1,132 @@
+"""
+FeatureStore tests: incremental updates match a batch computation (also
+across a suspension), and a definition change invalidates only the feature
+that changed.
+"""
+
+import numpy as np
+import pandas as pd
+
+from utils import indicator_kernel
+from utils.feature_store import FEATURES, Feature, FeatureStore
+
+
+def make_frames(n_tickers=4, n_days=200, seed=11):
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range("2025-01-01", periods=n_days)
+    frames = {}
+    for i in range(n_tickers):
+        close = 300 * np.exp(np.cumsum(rng.normal(0, 0.02, n_days)))
+        frames[f"T{i}.TW"] = pd.DataFrame({"Open": close, "High": close * 1.01, "Low": close * 0.99,
+                                           "Close": close, "Volume": 1e6}, index=dates)
+    # T1 is suspended for three weeks
+    frames["T1.TW"] = frames["T1.TW"].drop(dates[110:125])
+    return frames
+
+
+def test_incremental_updates_match_batch(tmp_path):
+    frames = make_frames()
+    store = FeatureStore(store_dir=str(tmp_path))
+    cut = frames["T0.TW"].index[120]
+    first = {t: df.loc[:cut].copy() for t, df in list(frames.items())[:3]}
+    # The last bar is still forming the first time round (T1 is suspended, its last bar is final)
+    for df in first.values():
+        if df.index[-1] == cut:
+            df.iloc[-1, df.columns.get_loc("Close")] *= 1.03
+    assert store.update_prices(first)["rsi_14"] == 121
+    assert store.update_prices(frames)["macd_12_26_9"] == 79  # + a new ticker
+
+    # A new process reads the persisted values
+    reopened = FeatureStore(store_dir=str(tmp_path))
+    batch = indicator_kernel.compute_all(frames)
+    for name, column in (("rsi_14", "RSI_14"), ("macd_12_26_9", "MACDs_12_26_9"),
+                         ("bbands_20_2", "BBL_20_2.0"), ("atr_14", "ATRr_14")):
+        tickers, dates, values = reopened.matrix(name, column, batch["tickers"])
+        assert len(dates) == 200
+        np.testing.assert_allclose(values, batch[column], rtol=1e-10)
+    assert reopened.latest("rsi_14", "T3.TW")["date"] == frames["T3.TW"].index[-1].strftime("%Y-%m-%d")
+
+
+def test_version_bump_invalidates_only_that_feature(tmp_path):
+    frames = make_frames(n_tickers=2, n_days=60)
+    FeatureStore(store_dir=str(tmp_path)).update_prices(frames)
+    rsi_path = tmp_path / "rsi_14" / "v1.npz"
+
+    old = FEATURES["rsi_14"]
+    features = dict(FEATURES, rsi_14=Feature("rsi_14", 2, "prices", ["RSI_14"], old.compute, stateful=True))
+    store = FeatureStore(store_dir=str(tmp_path), features=features)
+    more = {t: pd.concat([df, df.iloc[-1:].set_axis([df.index[-1] + pd.offsets.BDay()])]) for t, df in frames.items()}
+    added = store.update_prices(more)
+
+    # v2 is rebuilt over the whole input, the others only gain the new day
+    assert added["rsi_14"] == 61 and added["macd_12_26_9"] == 1
+    assert (tmp_path / "rsi_14" / "v2.npz").exists() and not rsi_path.exists()
+    assert (tmp_path / "macd_12_26_9" / "v1.npz").exists()
+
+
+def test_ticker_left_out_of_an_update_is_recomputed(tmp_path):
+    frames = make_frames(n_tickers=2)
+    frames["LONG-TICKER-NAME.TWO"] = frames.pop("T1.TW")
+    dates = frames["T0.TW"].index
+    store = FeatureStore(store_dir=str(tmp_path))
+    store.update_prices({t: df.loc[:dates[99]] for t, df in frames.items()})
+    # The long ticker misses one update, so its state stops at day 99
+    store.update_prices({"T0.TW": frames["T0.TW"].loc[:dates[149]]})
+    store.update_prices(frames)
+
+    batch = indicator_kernel.compute_all(frames)
+    reopened = FeatureStore(store_dir=str(tmp_path))
+    tickers, _, values = reopened.matrix("macd_12_26_9", "MACDs_12_26_9", batch["tickers"])
+    assert "LONG-TICKER-NAME.TWO" in reopened.matrix("rsi_14", "RSI_14")[0]
+    np.testing.assert_allclose(values, batch["MACDs_12_26_9"], rtol=1e-10)
+
+
+def test_windowed_feature_and_reload_across_instances(tmp_path):
+    def _range_5(inputs, state, first):
+        close = inputs["Close"]
+        out = np.full(close.shape, np.nan)
+        windows = np.lib.stride_tricks.sliding_window_view(close, 5, axis=1)
+        out[:, 4:] = windows.max(axis=2) - windows.min(axis=2)
+        return {"RANGE_5": out[:, first:]}
+
+    features = {"range_5": Feature("range_5", 1, "prices", ["RANGE_5"], _range_5, lookback=4)}
+    frames = make_frames(n_tickers=2, n_days=40)
+    writer = FeatureStore(store_dir=str(tmp_path), features=features)
+    reader = FeatureStore(store_dir=str(tmp_path), features=features)
+    writer.update_prices({t: df.iloc[:30] for t, df in frames.items()})
+    assert len(reader.frame("range_5", "T0.TW")) == 26
+
+    writer.update_prices(frames)
+    # The reader sees the other instance's write without being reopened
+    close = frames["T0.TW"]["Close"]
+    expected = (close.rolling(5).max() - close.rolling(5).min()).dropna()
+    np.testing.assert_allclose(reader.frame("range_5", "T0.TW")["RANGE_5"], expected)
+
+
+
+
+def test_longer_history_for_some_tickers_leaves_the_others_alone(tmp_path):
+    def assert_matches_batch(ticker, source):
+        batch = indicator_kernel.compute_all({ticker: source})["MACDs_12_26_9"][0]
+        _, dates, values = store.matrix("macd_12_26_9", "MACDs_12_26_9", [ticker])
+        np.testing.assert_allclose(values[0, dates.isin(source.index)], batch, rtol=1e-10)
+
+    frames = make_frames()
+    recent = {t: df.loc[frames["T0.TW"].index[100]:] for t, df in frames.items()}
+    store = FeatureStore(store_dir=str(tmp_path))
+    store.update_prices(recent)
+    before = {t: store.frame("macd_12_26_9", t) for t in recent}
+
+    # A warm-up for two tickers reaches further back than anything stored
+    store.update_prices({t: frames[t] for t in ("T0.TW", "T1.TW")})
+    for t in ("T0.TW", "T1.TW"):
+        assert_matches_batch(t, frames[t])
+    for t in ("T2.TW", "T3.TW"):
+        pd.testing.assert_frame_equal(store.frame("macd_12_26_9", t), before[t])
+
+    # Their state is intact too: they carry on incrementally from the short history
+    more = {t: pd.concat([df, df.iloc[-1:].set_axis([df.index[-1] + pd.offsets.BDay()]) * 1.02])
+            for t, df in recent.items() if t in ("T2.TW", "T3.TW")}
+    assert store.update_prices(more)["macd_12_26_9"] == 1
+    for t, df in more.items():
+        assert_matches_batch(t, df)
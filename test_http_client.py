@@ -0,0 +1,85 @@
+"""
+HttpClient tests against a local stand-in HTTP server: connection reuse,
+gzip, and ETag / Last-Modified conditional GETs answered from the cache.
+"""
+
+import gzip
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from utils.data_manager import DataManager
+from utils.http_client import HttpClient
+
+
+BODY = '{"stat": "OK", "date": "20260202", "data": [["2330", "台積電", "1,200"]]}'.encode("utf-8")
+ETAG = '"t86-20260202"'
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    hits = {"full": 0, "not_modified": 0}
+    connections = set()
+
+    def do_GET(self):
+        StandInHandler.connections.add(self.client_address)
+        if self.headers.get("If-None-Match") == ETAG:
+            StandInHandler.hits["not_modified"] += 1
+            self.send_response(304)
+            self.send_header("ETag", ETAG)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        StandInHandler.hits["full"] += 1
+        payload = BODY
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("ETag", ETAG)
+        if "gzip" in self.headers.get("Accept-Encoding", ""):
+            payload = gzip.compress(BODY)
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    StandInHandler.hits = {"full": 0, "not_modified": 0}
+    StandInHandler.connections = set()
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+
+
+def test_unchanged_page_costs_a_304(server, tmp_path):
+    client = HttpClient(cache=DataManager(cache_dir=str(tmp_path)))
+
+    first = client.get(f"{server}/rwd/zh/fund/T86", params={"date": "20260202"})
+    second = client.get(f"{server}/rwd/zh/fund/T86", params={"date": "20260202"})
+
+    assert not first.from_cache and second.from_cache
+    assert first.json() == second.json()
+    assert StandInHandler.hits == {"full": 1, "not_modified": 1}
+    assert client.stats["not_modified"] == 1
+
+
+def test_connection_is_reused(server, tmp_path):
+    client = HttpClient(cache=DataManager(cache_dir=str(tmp_path)))
+    for i in range(5):
+        client.get(f"{server}/news", params={"page": i}, conditional=False)
+    assert len(StandInHandler.connections) == 1
+    assert StandInHandler.hits["full"] == 5
+
+
+def test_only_idempotent_requests_are_retried(tmp_path):
+    client = HttpClient(cache=DataManager(cache_dir=str(tmp_path)))
+    retry = client.session.get_adapter("https://www.twse.com.tw").max_retries
+    assert retry.is_retry("GET", 503) and not retry.is_retry("POST", 503)
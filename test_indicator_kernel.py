@@ -0,0 +1,100 @@
+"""
+Indicator kernel tests: the (tickers x days) results must match per-ticker
+computations, including tickers listed part-way through the window or
+suspended for a while.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils import indicator_kernel
+
+
+def make_frames(n_tickers=6, n_days=260, seed=3):
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range("2025-01-01", periods=n_days, freq="B")
+    frames = {}
+    for i in range(n_tickers):
+        close = 100 * (i + 1) * np.exp(np.cumsum(rng.normal(0, 0.02, n_days)))
+        spread = np.abs(rng.normal(0, 0.01, n_days)) * close
+        df = pd.DataFrame({"Open": close, "High": close + spread, "Low": close - spread,
+                           "Close": close, "Volume": 1e6}, index=dates)
+        frames[f"T{i}.TW"] = df.iloc[i * 15:]  # staggered listing dates
+    # Suspensions: T1 for three weeks, T2 for a single day
+    frames["T1.TW"] = frames["T1.TW"].drop(dates[100:115])
+    frames["T2.TW"] = frames["T2.TW"].drop(dates[150:151])
+    return frames
+
+
+def _ema(series, length):
+    series = series.dropna()
+    values = series.copy()
+    values.iloc[:length - 1] = np.nan
+    values.iloc[length - 1] = series.iloc[:length].mean()
+    return values.ewm(span=length, adjust=False).mean()
+
+
+def reference(df):
+    """pandas_ta's default formulas on a single ticker."""
+    close = df["Close"]
+    macd = _ema(close, 12) - _ema(close, 26)
+    signal = _ema(macd, 9).reindex(close.index)
+    change = close.diff()
+    gain = change.clip(lower=0).ewm(alpha=1 / 14, min_periods=14).mean()
+    loss = change.clip(upper=0).ewm(alpha=1 / 14, min_periods=14).mean().abs()
+    prev_close = close.shift()
+    true_range = pd.concat([df["High"] - df["Low"], (df["High"] - prev_close).abs(),
+                            (df["Low"] - prev_close).abs()], axis=1).max(axis=1)
+    true_range.iloc[0] = np.nan
+    return pd.DataFrame({
+        "MACD_12_26_9": macd, "MACDs_12_26_9": signal, "MACDh_12_26_9": macd - signal,
+        "RSI_14": 100 * gain / (gain + loss),
+        "BBM_20_2.0": close.rolling(20).mean(),
+        "BBU_20_2.0": close.rolling(20).mean() + 2 * close.rolling(20).std(ddof=0),
+        "ATRr_14": true_range.ewm(alpha=1 / 14, min_periods=14).mean(),
+    })
+
+
+def _row(result, ticker, column, index):
+    i = result["tickers"].index(ticker)
+    return pd.Series(result[column][i], index=result["dates"]).reindex(index)
+
+
+def test_matrix_matches_per_ticker_reference():
+    frames = make_frames()
+    result = indicator_kernel.compute_all(frames)
+    assert result["MACD_12_26_9"].shape == (6, 260)
+    for ticker, df in frames.items():
+        expected = reference(df)
+        for column in expected.columns:
+            got = _row(result, ticker, column, df.index)
+            assert got.isna().equals(expected[column].isna()), (ticker, column)
+            np.testing.assert_allclose(got.dropna(), expected[column].dropna(), rtol=1e-9)
+
+
+def test_gaps_stay_empty():
+    frames = make_frames()
+    tickers, dates, close = indicator_kernel.price_matrix(frames)
+    result = indicator_kernel.compute_all(frames)
+    row = tickers.index("T1.TW")
+    suspended = ~dates.isin(frames["T1.TW"].index)
+    assert np.isnan(close[row, suspended]).all()
+    for column in ("MACD_12_26_9", "RSI_14", "BBM_20_2.0", "ATRr_14"):
+        assert np.isnan(result[column][row, suspended]).all()
+        assert not np.isnan(result[column][row, dates > dates[120]]).any()
+
+
+def test_matches_pandas_ta():
+    pytest.importorskip("pandas_ta")
+    frames = make_frames()
+    result = indicator_kernel.compute_all(frames)
+    for ticker, df in frames.items():
+        batch = df.copy()
+        batch.ta.macd(append=True)
+        batch.ta.rsi(append=True)
+        batch.ta.bbands(append=True)
+        batch.ta.atr(append=True)
+        for column in ("MACD_12_26_9", "MACDs_12_26_9", "RSI_14", "BBL_20_2.0", "BBU_20_2.0", "ATRr_14"):
+            got = _row(result, ticker, column, df.index)
+            np.testing.assert_allclose(got.iloc[60:], batch[column].iloc[60:], rtol=1e-6)
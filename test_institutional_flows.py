@@ -0,0 +1,59 @@
+"""
+InstitutionalFlows tests: T86 parsing against the real column layout.
+"""
+
+import pytest
+
+from utils.institutional_flows import InstitutionalFlows
+
+T86_FIELDS = [
+    "證券代號", "證券名稱",
+    "外陸資買進股數(不含外資自營商)", "外陸資賣出股數(不含外資自營商)", "外陸資買賣超股數(不含外資自營商)",
+    "外資自營商買進股數", "外資自營商賣出股數", "外資自營商買賣超股數",
+    "投信買進股數", "投信賣出股數", "投信買賣超股數",
+    "自營商買賣超股數",
+    "自營商買進股數(自行買賣)", "自營商賣出股數(自行買賣)", "自營商買賣超股數(自行買賣)",
+    "自營商買進股數(避險)", "自營商賣出股數(避險)", "自營商買賣超股數(避險)",
+    "三大法人買賣超股數",
+]
+
+
+def test_parse_t86_counts_each_investor_once():
+    row = ["2330  ", "台積電",
+           "5,000", "1,000", "4,000",
+           "20", "0", "20",
+           "700", "200", "500",
+           "300",
+           "250", "50", "200",
+           "150", "50", "100",
+           "4,820"]
+    payload = {"stat": "OK", "fields": T86_FIELDS, "data": [row, ["00878", "國泰永續高股息"] + ["0"] * 17]}
+
+    stock_ids, net = InstitutionalFlows.parse_t86(payload)
+
+    assert stock_ids == ["2330", "00878"]
+    # foreign = 外陸資 + 外資自營商, dealer = the total column only (not total + sub-columns)
+    assert net[0].tolist() == [4020, 500, 300]
+    assert net[1].tolist() == [0, 0, 0]
+
+
+def test_parse_t86_empty_on_non_trading_day():
+    stock_ids, net = InstitutionalFlows.parse_t86({"stat": "很抱歉，沒有符合條件的資料!"})
+    assert stock_ids == [] and net.shape == (0, 3)
+
+
+def test_throttled_day_is_retried_not_cached(tmp_path):
+    from utils.data_manager import DataManager
+
+    class ThrottledTWSE:
+        def __init__(self):
+            self.replies = [{"stat": "很抱歉，目前線上人數過多，請您稍候再試"},
+                            {"stat": "OK", "fields": T86_FIELDS, "data": [["2330", "台積電"] + ["1"] * 17]}]
+
+        def get_json(self, url, params):
+            return self.replies.pop(0)
+
+    flows = InstitutionalFlows(dm=DataManager(cache_dir=str(tmp_path)), http=ThrottledTWSE())
+    with pytest.raises(ValueError):
+        flows.fetch_day("2026-10-15")
+    assert flows.fetch_day("2026-10-15")["stock_ids"] == ["2330"]
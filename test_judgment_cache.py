@@ -0,0 +1,92 @@
+"""
+JudgmentCache tests: content-addressed keys, prompt versioning and TTL.
+"""
+
+import time
+
+import numpy as np
+
+from utils.judgment_cache import JudgmentCache
+
+
+class FakeAnalyst:
+    PROMPT_VERSION = "1"
+
+    def __init__(self, name="The Valuator"):
+        self.name = name
+
+    def get_identity_context(self):
+        return f"You are {self.name}."
+
+
+def test_unchanged_inputs_hit_the_cache(tmp_path):
+    cache = JudgmentCache(cache_dir=str(tmp_path))
+    analyst = FakeAnalyst()
+    verdict = {"signal": "BUY", "confidence": 0.7, "reason": "cheap"}
+
+    assert cache.get(analyst, {"pe": 12.0, "pb": 1.5}) is None
+    cache.put(analyst, {"pe": 12.0, "pb": 1.5}, verdict)
+
+    # Key order and NumPy scalars do not change the key
+    hit = cache.get(analyst, {"pb": np.float64(1.5), "pe": 12.0})
+    assert hit["signal"] == "BUY" and hit["cached"]
+    assert cache.get(analyst, {"pe": 13.0, "pb": 1.5}) is None
+    assert cache.get(FakeAnalyst("The Chartist"), {"pe": 12.0, "pb": 1.5}) is None
+
+    analyst.PROMPT_VERSION = "2"
+    assert cache.get(analyst, {"pe": 12.0, "pb": 1.5}) is None
+
+    stats = cache.get_stats()
+    assert stats["hits"] == 1 and stats["misses"] == 4 and stats["entries"] == 1
+
+
+def test_judgments_expire_per_analyst(tmp_path):
+    cache = JudgmentCache(cache_dir=str(tmp_path), ttls={"The Sentiment Scout": 0.05})
+    scout = FakeAnalyst("The Sentiment Scout")
+    cache.put(scout, {"headlines": []}, {"signal": "NEUTRAL", "confidence": 0.1, "reason": "quiet"})
+    time.sleep(0.1)
+    assert cache.get(scout, {"headlines": []}) is None
+
+
+def test_degraded_verdicts_are_not_cached(tmp_path):
+    from concurrent.futures import Future
+
+    from main import AlphaCore
+    from modules.base_analyst import BaseAnalyst
+    from utils.run_fingerprints import RunFingerprints
+
+    class Valuator(BaseAnalyst):
+        def __init__(self):
+            super().__init__("The Valuator", "valuation", "value investor")
+
+        def gather_data(self, ticker):
+            return {"pe": 12.0}
+
+        def get_source_version(self, ticker):
+            return "2026-10-16"
+
+        def get_specialized_prompt(self, raw_data):
+            return f"PE {raw_data['pe']}"
+
+    class FlakyLLM:
+        """Drops the first answer, then answers properly."""
+        def __init__(self):
+            self.answers = [{"signal": "NEUTRAL", "confidence": 0.0, "degraded": True,
+                             "reason": "No answer in batched LLM response", "reasoning": ""},
+                            {"signal": "BUY", "confidence": 0.7, "reason": "cheap", "reasoning": ""}]
+
+        def submit(self, prompt):
+            future = Future()
+            future.set_result(self.answers.pop(0))
+            return future
+
+    cache = JudgmentCache(cache_dir=str(tmp_path / "judgments"))
+    fingerprints = RunFingerprints(path=str(tmp_path / "fingerprints"))
+    alpha = AlphaCore(llm=FlakyLLM(), judgments=cache, fingerprints=fingerprints)
+    alpha.team = [Valuator()]
+
+    assert alpha.run_pipeline("2330.TW")[0]["signal"] == "NEUTRAL"
+    assert cache.get_stats()["entries"] == 0
+    # Neither the source version nor the inputs replay the failure: the analyst is judged again
+    assert alpha.run_pipeline("2330.TW")[0]["signal"] == "BUY"
+    assert cache.get(Valuator(), {"pe": 12.0})["signal"] == "BUY"
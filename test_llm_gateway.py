@@ -0,0 +1,113 @@
+"""
+LLMGateway tests against a local stand-in chat-completions server:
+prompt batching, the concurrency cap, cancelled batch members and
+SIGNAL/CONFIDENCE parsing.
+"""
+
+import json
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from utils.llm_gateway import LLMGateway, parse_judgment
+
+
+class StandInLLM(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    requests_seen = []
+    in_flight = 0
+    peak_in_flight = 0
+    lock = threading.Lock()
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with StandInLLM.lock:
+            StandInLLM.requests_seen.append(body)
+            StandInLLM.in_flight += 1
+            StandInLLM.peak_in_flight = max(StandInLLM.peak_in_flight, StandInLLM.in_flight)
+        time.sleep(0.05)
+
+        # Echo a verdict per task: prompts mentioning "bullish" get BUY
+        tasks = re.split(r"^=== TASK (\d+) ===$", body["messages"][-1]["content"], flags=re.MULTILINE)[1:]
+        answers = []
+        for n, prompt in zip(tasks[::2], tasks[1::2]):
+            signal = "BUY" if "bullish" in prompt else "SELL"
+            answers.append(f"=== ANSWER {n} ===\n1. SIGNAL: {signal}\n2. CONFIDENCE: 0.{n}\n"
+                           f"3. SUMMARY: task {n}\n4. DETAILED_REASONING: because.")
+        payload = json.dumps({"choices": [{"message": {"content": "\n\n".join(answers)}}]}).encode()
+
+        with StandInLLM.lock:
+            StandInLLM.in_flight -= 1
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    StandInLLM.requests_seen = []
+    StandInLLM.in_flight = StandInLLM.peak_in_flight = 0
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), StandInLLM)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}/v1"
+    httpd.shutdown()
+
+
+def test_prompts_are_batched_and_answers_split_back(server):
+    gateway = LLMGateway(server, batch_size=4, batch_window=0.2, max_requests_per_minute=0)
+    prompts = [f"ticker {i} looks {'bullish' if i % 2 == 0 else 'weak'}" for i in range(8)]
+
+    reports = gateway.judge_many(prompts)
+    gateway.close()
+
+    assert len(StandInLLM.requests_seen) == 2
+    # Every batch carries the report format, whatever the analyst prompt asked for
+    system = StandInLLM.requests_seen[0]["messages"][0]["content"]
+    assert "1. SIGNAL:" in system and "2. CONFIDENCE:" in system
+    assert [r["signal"] for r in reports] == ["BUY", "SELL"] * 4
+    assert reports[1]["confidence"] == 0.2 and reports[1]["reason"] == "task 2"
+
+
+def test_concurrency_cap(server):
+    gateway = LLMGateway(server, batch_size=1, batch_window=0, max_concurrency=2,
+                         max_requests_per_minute=0)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        reports = list(pool.map(gateway.judge, ["bullish"] * 8))
+    gateway.close()
+
+    assert all(r["signal"] == "BUY" for r in reports)
+    assert len(StandInLLM.requests_seen) == 8
+    assert StandInLLM.peak_in_flight <= 2
+
+
+def test_cancelled_member_does_not_strand_the_batch(server):
+    class CancelledAfterCheck(Future):
+        """Cancelled by its caller between the gateway's done() check and set_result()."""
+        def done(self):
+            return False
+
+    gateway = LLMGateway(server, batch_size=3, batch_window=0, max_requests_per_minute=0)
+    futures = [Future(), CancelledAfterCheck(), Future()]
+    futures[1].cancel()
+    gateway._send_batch([("bullish", futures[0]), ("weak", futures[1]), ("bullish", futures[2])])
+    gateway.close()
+
+    assert futures[0].result(timeout=1)["signal"] == futures[2].result(timeout=1)["signal"] == "BUY"
+
+
+def test_parse_judgment_variants():
+    report = parse_judgment("1. **SIGNAL:** Buy\n2. CONFIDENCE: 85%\n3. SUMMARY: Strong inflows.")
+    assert report == {"signal": "BUY", "confidence": 0.85, "reason": "Strong inflows.", "reasoning": ""}
+    assert parse_judgment("no idea")["signal"] == "NEUTRAL"
+    assert parse_judgment("no idea")["confidence"] == 0.0
+    assert parse_judgment("no idea")["degraded"]
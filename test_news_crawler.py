@@ -0,0 +1,56 @@
+"""
+NewsCrawler tests: headlines stay new until committed, and publish times
+with different UTC offsets are compared as instants.
+"""
+
+from utils.data_manager import DataManager
+from utils.news_crawler import NewsCrawler
+
+
+def rss(*items):
+    body = "".join(f"<item><title>{title}</title><link>http://x/{i}</link><pubDate>{date}</pubDate></item>"
+                   for i, (title, date) in enumerate(items))
+    return f"<?xml version='1.0'?><rss><channel>{body}</channel></rss>"
+
+
+class FakeFeed:
+    def __init__(self, xml_text):
+        self.xml_text = xml_text
+
+    def get(self, url):
+        return type("Response", (), {"text": self.xml_text})()
+
+
+def test_headlines_are_seen_only_after_commit(tmp_path):
+    feed = FakeFeed(rss(("台積電 法說會", "Thu, 16 Oct 2026 09:00:00 +0800"),      # 01:00 UTC
+                        ("台積電 上調 財測", "Thu, 16 Oct 2026 02:00:00 +0000")))  # 02:00 UTC
+    crawler = NewsCrawler(dm=DataManager(cache_dir=str(tmp_path)), http=feed)
+
+    first = crawler.crawl("2330.TW")
+    # Newest first by instant, not by the ISO string
+    assert first["new_headlines"] == ["台積電 上調 財測", "台積電 法說會"]
+    # The judgment failed: nothing was committed, so the next crawl sees them again
+    assert crawler.crawl("2330.TW")["new_headlines"] == first["new_headlines"]
+
+    crawler.commit("2330.TW")
+    feed.xml_text = rss(("台積電 ADR 大漲", "Thu, 16 Oct 2026 10:30:00 +0800"),     # 02:30 UTC: new
+                        ("台積電 供應鏈 消息", "Thu, 16 Oct 2026 09:30:00 +0800"),  # 01:30 UTC: older than the newest seen
+                        ("台積電 上調 財測", "Thu, 16 Oct 2026 02:00:00 +0000"))
+    second = crawler.crawl("2330.TW")
+    assert second["new_headlines"] == ["台積電 ADR 大漲"]
+    assert second["digest"] == ["台積電 上調 財測", "台積電 法說會"]
+
+
+def test_uncommitted_crawl_leaves_cached_state_alone(tmp_path):
+    feed = FakeFeed(rss(("台積電 法說會", "Thu, 16 Oct 2026 09:00:00 +0800")))
+    crawler = NewsCrawler(dm=DataManager(cache_dir=str(tmp_path)), http=feed)
+    crawler.crawl("2330.TW")
+    crawler.commit("2330.TW")
+
+    feed.xml_text = rss(("台積電 ADR 大漲", "Thu, 16 Oct 2026 10:30:00 +0800"),
+                        ("台積電 法說會", "Thu, 16 Oct 2026 09:00:00 +0800"))
+    assert crawler.crawl("2330.TW")["new_headlines"] == ["台積電 ADR 大漲"]
+    # Not committed: the same process still reports it as new, with the old digest
+    again = crawler.crawl("2330.TW")
+    assert again["new_headlines"] == ["台積電 ADR 大漲"]
+    assert again["digest"] == ["台積電 法說會"]
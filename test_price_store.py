@@ -0,0 +1,122 @@
+"""
+PriceStore tests: partitions are synced incrementally from a fake upstream,
+universe + macro prefetches are batched, and get_close_on answers with the
+last bar on or before the requested date.
+"""
+
+import numpy as np
+import pandas as pd
+
+from utils.price_store import FIELDS, MACRO_TICKERS, PriceStore
+
+
+def daily_bars(start="2026-09-01", days=10):
+    index = pd.bdate_range(start, periods=days)
+    close = 100.0 + np.arange(days)
+    return pd.DataFrame({"Open": close, "High": close + 1, "Low": close - 1,
+                         "Close": close, "Volume": 1e6}, index=index)
+
+
+class FakeUpstream(PriceStore):
+    """Serves bars from `self.source` with yfinance's [start, end) semantics."""
+
+    def __init__(self, tmp_path, source):
+        super().__init__(store_dir=str(tmp_path), min_refresh_seconds=0)
+        self.source = source
+        self.calls = []
+
+    def _slice(self, ticker, start, end=None):
+        df = self.source[ticker]
+        df = df[df.index >= pd.Timestamp(start)]
+        if end is not None:
+            df = df[df.index < pd.Timestamp(end)]
+        return df
+
+    def _download(self, ticker, start, end=None):
+        self.calls.append((ticker, start if isinstance(start, str) else f"{start:%Y-%m-%d}", end))
+        return self._slice(ticker, start, end)
+
+    def _download_many(self, tickers, start):
+        self.calls.append((tuple(tickers), start, None))
+        return {t: self._slice(t, start) for t in tickers}
+
+
+def test_update_fetches_only_missing_bars(tmp_path):
+    source = daily_bars(days=8)
+    store = FakeUpstream(tmp_path, {"2330.TW": source})
+    assert store.partition_version("2330.TW") == (0, None, None, None)
+
+    assert store.update("2330.TW", start="2026-09-01") == 8
+    version = store.partition_version("2330.TW")
+    assert version[0] == 8 and version[3] == 107.0
+
+    # Two new sessions, and the last stored bar was revised after the close
+    revised = daily_bars(days=10)
+    revised.iloc[7, FIELDS.index("Close")] = 107.5
+    store.source["2330.TW"] = revised
+    store.calls.clear()
+    assert store.update("2330.TW", start="2026-09-01") == 2
+    # Only the tail from the last stored bar is requested
+    assert store.calls == [("2330.TW", "2026-09-10", None)]
+    df = store.get_history("2330.TW", refresh=False)
+    assert len(df) == 10 and df.index.is_monotonic_increasing
+    assert df.loc["2026-09-10", "Close"] == 107.5
+    assert store.partition_version("2330.TW") != version
+
+    # An earlier start backfills the head, once
+    store.source["2330.TW"] = pd.concat([daily_bars("2026-08-25", days=5), revised])
+    store.calls.clear()
+    assert store.update("2330.TW", start="2026-08-25") == 5
+    assert store.calls[0] == ("2330.TW", "2026-08-25", "2026-09-01")
+    store.calls.clear()
+    store.update("2330.TW", start="2026-08-25")
+    assert [end for _, _, end in store.calls] == [None]
+
+
+def test_get_close_on_uses_last_bar_on_or_before_date(tmp_path):
+    store = FakeUpstream(tmp_path, {"2330.TW": daily_bars(days=10)})
+    store.update("2330.TW", start="2026-09-01")
+
+    # Trading day: that session's close, never the next one
+    assert store.get_close_on("2330.TW", "2026-09-04", refresh=False) == 103.0
+    assert store.get_close_on("2330.TW", pd.Timestamp("2026-09-04 13:30"), refresh=False) == 103.0
+    # Weekend / holiday: carried forward from Friday
+    assert store.get_close_on("2330.TW", "2026-09-05", refresh=False) == 103.0
+    assert store.get_close_on("2330.TW", "2026-09-06", refresh=False) == 103.0
+    assert store.get_close_on("2330.TW", "2026-09-07", refresh=False) == 104.0
+    # Nothing stored on or before the date
+    assert store.get_close_on("2330.TW", "2026-08-31", refresh=False) is None
+    assert store.get_close_on("2317.TW", "2026-09-04", refresh=False) is None
+
+    # History stops before the date: no stale close until that session is stored
+    assert store.get_close_on("2330.TW", "2026-09-14", refresh=False) == 109.0
+    assert store.get_close_on("2330.TW", "2026-09-15", refresh=False) is None
+    store.source["2330.TW"] = daily_bars(days=11)
+    assert store.get_close_on("2330.TW", "2026-09-15") == 110.0
+
+
+def test_auditor_syncs_closes_in_one_batch(tmp_path):
+    from utils.performance_auditor import PerformanceAuditor
+
+    tickers = ["2330.TW", "2317.TW"]
+    auditor = PerformanceAuditor.__new__(PerformanceAuditor)
+    auditor.prices = FakeUpstream(tmp_path, {t: daily_bars(days=10) for t in tickers})
+    assert auditor._fetch_market_data(tickers) == {"2330.TW": 109.0, "2317.TW": 109.0}
+    assert auditor.prices.calls == [(tuple(tickers), auditor.prices.calls[0][1], None)]
+
+
+def test_prefetch_syncs_universe_and_macro_in_one_batch(tmp_path):
+    tickers = ["2330.TW", "2317.TW"] + MACRO_TICKERS
+    store = FakeUpstream(tmp_path, {t: daily_bars(days=8) for t in tickers})
+
+    frames = store.prefetch(tickers, start="2026-09-01")
+    assert store.calls == [(tuple(tickers), "2026-09-01", None)]
+    assert list(frames) == tickers and all(len(df) == 8 for df in frames.values())
+
+    # Known tickers: one tail request from the oldest last stored bar
+    store.source = {t: daily_bars(days=10) for t in tickers}
+    store.calls.clear()
+    frames = store.prefetch(tickers, start="2026-09-01")
+    assert store.calls == [(tuple(tickers), "2026-09-10", None)]
+    assert all(len(df) == 10 for df in frames.values())
+    assert frames["^VIX"].equals(store.get_history("^VIX", start="2026-09-01", refresh=False))
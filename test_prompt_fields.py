@@ -0,0 +1,47 @@
+"""
+PROMPT_FIELDS tests: every analyst's compaction priorities name keys its
+gather_data actually returns.
+"""
+
+from modules.chip_watcher import ChipWatcher
+from modules.valuator import Valuator
+from modules.whale_hunter import WhaleHunter
+
+
+class FakeFlows:
+    def get_flows(self, stock_id):
+        flows = {f"{col}_{n}d": 1.0 for col in ("foreign", "trust", "dealer") for n in (1, 5, 20)}
+        return dict(flows, date="2026-10-16", foreign_streak=3)
+
+
+class FakeValuations:
+    def update(self):
+        return 0
+
+    def get_valuation(self, stock_id):
+        row = {"date": "2026-10-16", "sector": "Semis", "pe": 20.0, "pb": 5.0, "dy": 1.5}
+        return dict(row, **{f"{m}_{kind}_pct": 50.0 for m in ("pe", "pb", "dy") for kind in ("hist", "sector")})
+
+
+class FakeShareholding:
+    def update(self, force=False):
+        return False
+
+    def get_distribution(self, stock_id):
+        return {"whale_pct": 80.0, "whale_change": 0.1, "retail_pct": 5.0, "retail_change": -0.1,
+                "total_holders": 1000, "total_holders_change": 5, "week": "2026-10-16"}
+
+
+def make(cls, **attrs):
+    analyst = cls.__new__(cls)
+    analyst.__dict__.update(attrs)
+    return analyst
+
+
+def test_prompt_fields_match_gathered_keys():
+    analysts = [make(ChipWatcher, flows=FakeFlows()),
+                make(Valuator, valuations=FakeValuations()),
+                make(WhaleHunter, shareholding=FakeShareholding())]
+    for analyst in analysts:
+        gathered = analyst.gather_data("2330.TW")
+        assert analyst.PROMPT_FIELDS and set(analyst.PROMPT_FIELDS) <= set(gathered), type(analyst).__name__
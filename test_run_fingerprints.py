@@ -0,0 +1,31 @@
+"""
+RunFingerprints tests: analyst-level reuse by source version / input hash
+and persistence across runs.
+"""
+
+from utils.run_fingerprints import RunFingerprints, fingerprint
+
+
+def test_reuse_across_runs(tmp_path):
+    path = str(tmp_path / "fingerprints")
+    report = {"signal": "BUY", "confidence": 0.6, "reason": "cheap", "data": {"pe": 10}}
+    fp = fingerprint("The Valuator", "1", {"pe": 10})
+
+    first = RunFingerprints(path=path)
+    assert first.reuse_by_source("2330.TW", "The Valuator", "2026-10-16") is None
+    assert first.reuse_by_inputs("2330.TW", "The Valuator", fp) is None
+    first.record("2330.TW", "The Valuator", fp, "2026-10-16", report)
+    first.record_row("2330.TW", "key-1", {"ticker": "2330.TW", "rating": "ACCUMULATE"})
+    first.save()
+
+    rerun = RunFingerprints(path=path)
+    assert rerun.reuse_by_source("2330.TW", "The Valuator", "2026-10-16")["signal"] == "BUY"
+    assert rerun.reuse_by_source("2330.TW", "The Valuator", "2026-10-17") is None
+    assert rerun.reuse_by_inputs("2330.TW", "The Valuator", fingerprint("The Valuator", "1", {"pe": 10}))["reused"]
+    assert rerun.reuse_by_inputs("2330.TW", "The Valuator", fingerprint("The Valuator", "1", {"pe": 11})) is None
+    assert rerun.reuse_row("2330.TW", "key-1")["rating"] == "ACCUMULATE"
+    assert rerun.reuse_row("2330.TW", "key-2") is None  # e.g. weights changed
+
+    forced = RunFingerprints(path=path, reuse=False)
+    assert forced.reuse_by_source("2330.TW", "The Valuator", "2026-10-16") is None
+    assert forced.reuse_row("2330.TW", "key-1") is None
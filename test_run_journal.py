@@ -0,0 +1,90 @@
+"""
+RunJournal tests: checkpointing, torn writes and resuming an interrupted run.
+"""
+
+from utils.run_fingerprints import RunFingerprints
+from utils.run_journal import RunJournal
+
+
+def row(ticker, rating="HOLD"):
+    return {"ticker": ticker, "rating": rating, "score": 0.0, "close": 100,
+            "target": 110, "stop_loss": 90, "rationale": "Neutral Outlook"}
+
+
+def test_resume_skips_finished_and_retries_failed(tmp_path):
+    journal = RunJournal(journal_dir=str(tmp_path))
+    journal.start(["2330.TW", "2454.TW", "2317.TW"], "2026-10-16")
+    journal.record(row("2330.TW", "ACCUMULATE"))
+    journal.record(row("2454.TW"), status="failed")
+    # Simulate a crash in the middle of writing the next line
+    with open(journal.path, "a") as f:
+        f.write('{"type": "result", "status": "ok", "row": {"tick')
+
+    resumed = RunJournal(journal_dir=str(tmp_path))
+    assert resumed.resume() == {"2330.TW"}
+    # The torn line is terminated, not overwritten
+    with open(resumed.path) as f:
+        assert '"row": {"tick\n{"type": "resumed"' in f.read()
+    assert resumed.header["report_date"] == "2026-10-16"
+
+    resumed.record(row("2454.TW", "REDUCE"))
+    # Interrupted again, this time after a complete line: no blank line is inserted
+    again = RunJournal(journal_dir=str(tmp_path))
+    assert again.resume() == {"2330.TW", "2454.TW"}
+    with open(again.path) as f:
+        assert "\n\n" not in f.read()
+    again.record(row("2317.TW"))
+    again.finish()
+    resumed = again
+
+    results = RunJournal(journal_dir=str(tmp_path))
+    header, rows, complete = results.read(resumed.path)
+    assert complete and {t: e["row"]["rating"] for t, e in rows.items()} == {
+        "2330.TW": "ACCUMULATE", "2454.TW": "REDUCE", "2317.TW": "HOLD"}
+    # Everything succeeded, so there is nothing left to resume
+    assert results.resume() is None
+
+
+def test_resume_scans_the_journaled_tickers_after_universe_change(tmp_path):
+    from run_advisory import ChiefAdvisor
+
+    class Advisor(ChiefAdvisor):
+        """Journals to tmp_path; analyze_ticker fails for the tickers in `broken`."""
+        def __init__(self, universe, broken=()):
+            self.journal = RunJournal(journal_dir=str(tmp_path / "runs"))
+            self.fingerprints = RunFingerprints(path=str(tmp_path / "fingerprints"))
+            self.report_path = str(tmp_path / "Daily_Report.md")
+            self.report_date = "2026-10-16"
+            self.universe, self.broken, self.scanned = universe, set(broken), []
+
+        def load_universe(self):
+            return self.universe
+
+        def prefetch_market_data(self, universe):
+            return {}
+
+        def analyze_ticker(self, ticker):
+            self.scanned.append(ticker)
+            if ticker in self.broken:
+                raise RuntimeError("no data")
+            return row(ticker)
+
+    before = {"Semis": {"description": "", "tickers": ["2330.TW", "2454.TW"]},
+              "EMS": {"description": "", "tickers": ["2317.TW"]}}
+    Advisor(before, broken={"2317.TW"}).generate_report()
+
+    # 2317.TW has since left the universe and 2382.TW joined it
+    after = {"Semis": before["Semis"], "EMS": {"description": "", "tickers": ["2382.TW"]}}
+    advisor = Advisor(after)
+    advisor.generate_report(resume=True)
+
+    assert advisor.scanned == ["2317.TW"]
+    assert RunJournal(journal_dir=str(tmp_path / "runs")).resume() is None
+    with open(advisor.report_path) as f:
+        report = f.read()
+    assert "**2317.TW** | HOLD" in report and "2382.TW" not in report
+
+    # Journals from before the header carried the universe: current layout, removed tickers kept
+    assert ChiefAdvisor.journaled_universe(after, ["2330.TW", "2317.TW"]) == {
+        "Semis": {"description": "", "tickers": ["2330.TW"]},
+        "Removed from universe": {"description": "No longer in config/universe.json", "tickers": ["2317.TW"]}}
@@ -0,0 +1,49 @@
+"""
+ChiefAdvisor.scan_universe tests: tickers run on a bounded pool and give the
+same rows as a serial scan, failures included.
+"""
+
+import threading
+import time
+
+from run_advisory import ChiefAdvisor
+
+
+UNIVERSE = {"Semis": {"description": "", "tickers": ["2330.TW", "2303.TW", "2454.TW"]},
+            "EMS": {"description": "", "tickers": ["2317.TW", "2382.TW", "BAD.TW"]}}
+
+
+class FakeAdvisor(ChiefAdvisor):
+    """analyze_ticker without analysts or network; tracks how many run at once."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.active = self.peak = 0
+
+    def analyze_ticker(self, ticker):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            time.sleep(0.05)
+            if ticker == "BAD.TW":
+                raise RuntimeError("no data")
+            return {"ticker": ticker, "rating": "HOLD", "score": 0.1, "close": 100.0,
+                    "target": 110.0, "stop_loss": 95.0, "rationale": ticker}
+        finally:
+            with self.lock:
+                self.active -= 1
+
+
+def test_pooled_scan_matches_serial_scan():
+    serial = FakeAdvisor().scan_universe(UNIVERSE, skip={"2382.TW"})
+
+    advisor, seen = FakeAdvisor(), []
+    pooled = advisor.scan_universe(UNIVERSE, workers=2, skip={"2382.TW"},
+                                   on_result=lambda row, status: seen.append((row["ticker"], status)))
+
+    assert pooled == serial and "2382.TW" not in pooled
+    assert pooled["BAD.TW"]["rating"] == "N/A" and "no data" in pooled["BAD.TW"]["rationale"]
+    assert sorted(seen) == sorted((t, "failed" if t == "BAD.TW" else "ok") for t in pooled)
+    # Concurrent, but never more tickers in flight than workers
+    assert advisor.peak == 2
@@ -0,0 +1,56 @@
+"""
+Serializer tests: every cache format round-trips, NumPy arrays survive
+msgpack natively, and atomic writes never leave a torn or temp file behind.
+"""
+
+import os
+
+import numpy as np
+import pytest
+
+from utils.serializers import atomic_write, dump_file, get_serializer, load_file
+
+
+STATE = {"2330.TW": {"signal": "BUY", "confidence": 0.8, "tags": ["rsi", "macd"]},
+         "run": {"n": np.int64(3), "score": np.float64(1.5), "seen": {"b", "a"}}}
+BUILTIN = {"2330.TW": STATE["2330.TW"], "run": {"n": 3, "score": 1.5, "seen": ["a", "b"]}}
+
+
+@pytest.mark.parametrize("fmt", ["json", "json+zlib", "json-debug", "msgpack", "msgpack+zlib"])
+def test_formats_round_trip(tmp_path, fmt):
+    if fmt.startswith("msgpack"):
+        pytest.importorskip("msgpack")
+    serializer = get_serializer(fmt)
+    path = dump_file(STATE, str(tmp_path / "cache.json"), serializer)
+    assert path.endswith(serializer.extension)
+    assert load_file(str(tmp_path / "cache.json"), serializer) == BUILTIN
+
+
+def test_msgpack_keeps_numpy_arrays():
+    pytest.importorskip("msgpack")
+    serializer = get_serializer("msgpack")
+    arrays = {"close": np.linspace(100, 110, 7), "grid": np.arange(12, dtype=np.int32).reshape(3, 4)}
+    loaded = serializer.loads(serializer.dumps(arrays))
+    for name, arr in arrays.items():
+        assert loaded[name].dtype == arr.dtype and loaded[name].shape == arr.shape
+        np.testing.assert_array_equal(loaded[name], arr)
+
+
+def test_load_falls_back_to_legacy_json(tmp_path):
+    pytest.importorskip("msgpack")
+    legacy = str(tmp_path / "cache.json")
+    dump_file(BUILTIN, legacy, get_serializer("json-debug"))
+    assert load_file(legacy, get_serializer("msgpack")) == BUILTIN
+    assert load_file(str(tmp_path / "missing.json"), default={}) == {}
+
+
+def test_atomic_write_keeps_old_file_on_failure(tmp_path):
+    path = str(tmp_path / "state.json")
+    atomic_write(path, b'{"v": 1}')
+    with pytest.raises(TypeError):
+        atomic_write(path, "not bytes")
+    with open(path, 'rb') as f:
+        assert f.read() == b'{"v": 1}'
+    # No temp files left next to it, after either a failed or a good write
+    atomic_write(path, b'{"v": 2}')
+    assert os.listdir(tmp_path) == ["state.json"]
@@ -0,0 +1,63 @@
+"""
+ShareholdingStore tests: TDCC CSV parsing (stocks and ETFs, no warrants)
+and appending weeks without duplicates under concurrent updates.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from utils.shareholding_store import ShareholdingStore
+
+HEADER = "資料日期,證券代號,持股分級,人數,股數,占集保庫存數比例%"
+
+
+def tdcc_csv(week, whale_pct):
+    rows = [HEADER]
+    for sid in ("2330", "00878", "006208", "00631L", "030001"):
+        for level in range(1, 18):
+            pct = whale_pct if level == 15 else (100 - whale_pct) / 14 if level < 15 else 100
+            rows.append(f"{week},{sid},{level},\"1,000\",1000,{pct:.2f}")
+    return "﻿" + "\n".join(rows)
+
+
+class FakeTDCC:
+    def __init__(self, csv_text):
+        self.csv_text = csv_text
+        self.requests = 0
+        self.lock = threading.Lock()
+
+    def get(self, url, params):
+        with self.lock:
+            self.requests += 1
+        time.sleep(0.01)
+        return type("Response", (), {"text": self.csv_text})()
+
+
+def test_parse_keeps_stocks_and_etfs(tmp_path):
+    store = ShareholdingStore(store_dir=str(tmp_path), http=FakeTDCC(""))
+    week, stock_ids, pct, holders = store.parse_tdcc(tdcc_csv("20261016", 80.0).lstrip("﻿"))
+
+    assert week == np.datetime64("2026-10-16")
+    # 5/6-digit ETF codes are kept, the warrant is not
+    assert stock_ids.tolist() == ["006208", "00631L", "00878", "2330"]
+    assert pct.shape == (4, 15) and pct[0, 14] == 80.0
+    assert holders[0, 0] == 1000
+
+
+def test_weeks_append_once_under_concurrent_updates(tmp_path):
+    http = FakeTDCC(tdcc_csv("20261009", 80.0))
+    store = ShareholdingStore(store_dir=str(tmp_path), http=http)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        added = list(pool.map(lambda _: store.update(), range(8)))
+    assert added.count(True) == 1 and http.requests == 1
+
+    http.csv_text = tdcc_csv("20261016", 81.5)
+    assert store.update(force=True) and not store.update(force=True)  # same week again is not appended
+
+    reopened = ShareholdingStore(store_dir=str(tmp_path), http=http)
+    assert [str(w) for w in reopened.weeks] == ["2026-10-09", "2026-10-16"]
+    dist = reopened.get_distribution("00878")
+    assert dist["whale_pct"] == 81.5 and dist["whale_change"] == 1.5 and dist["week"] == "2026-10-16"
@@ -0,0 +1,93 @@
+"""
+StreamingIndicators tests: parity with a batch computation, intraday ticks
+and resuming from persisted state.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.streaming_indicators import StreamingIndicators
+
+COLUMNS = ["MACD_12_26_9", "MACDs_12_26_9", "MACDh_12_26_9", "RSI_14", "BBL_20_2.0", "BBM_20_2.0", "BBU_20_2.0"]
+
+
+def make_prices(n=300, seed=7):
+    rng = np.random.default_rng(seed)
+    close = 500 * np.exp(np.cumsum(rng.normal(0, 0.015, n)))
+    index = pd.date_range("2025-01-01", periods=n, freq="B")
+    return pd.DataFrame({"Close": close}, index=index)
+
+
+def _ema(series, length):
+    # pandas_ta: SMA seed over the first `length` values, then a recursive EMA
+    values = series.copy()
+    values.iloc[:length - 1] = np.nan
+    values.iloc[length - 1] = series.iloc[:length].mean()
+    return values.ewm(span=length, adjust=False).mean()
+
+
+def reference(close):
+    """Batch MACD / RSI / BBands with pandas_ta's default formulas."""
+    macd = _ema(close, 12) - _ema(close, 26)
+    signal = _ema(macd.dropna(), 9).reindex(close.index)
+    change = close.diff()
+    gain = change.clip(lower=0).ewm(alpha=1 / 14, min_periods=14).mean()
+    loss = change.clip(upper=0).ewm(alpha=1 / 14, min_periods=14).mean().abs()
+    mid = close.rolling(20).mean()
+    std = close.rolling(20).std(ddof=0)
+    return pd.DataFrame({
+        "MACD_12_26_9": macd, "MACDs_12_26_9": signal, "MACDh_12_26_9": macd - signal,
+        "RSI_14": 100 * gain / (gain + loss),
+        "BBL_20_2.0": mid - 2 * std, "BBM_20_2.0": mid, "BBU_20_2.0": mid + 2 * std,
+    })
+
+
+def stream_all(engine, ticker, df):
+    rows = [engine.update(ticker, ts.isoformat(), close) for ts, close in zip(df.index, df["Close"])]
+    return pd.DataFrame(rows, index=df.index, dtype=float)
+
+
+def test_matches_batch_reference(tmp_path):
+    df = make_prices()
+    streamed = stream_all(StreamingIndicators(state_dir=str(tmp_path)), "2330.TW", df)
+    expected = reference(df["Close"])
+    for col in COLUMNS:
+        assert streamed[col].isna().equals(expected[col].isna()), col
+        np.testing.assert_allclose(streamed[col].dropna(), expected[col].dropna(), rtol=1e-9, atol=1e-9)
+
+
+def test_matches_pandas_ta(tmp_path):
+    pytest.importorskip("pandas_ta")
+    df = make_prices()
+    streamed = stream_all(StreamingIndicators(state_dir=str(tmp_path)), "2330.TW", df)
+    batch = df.copy()
+    batch.ta.macd(append=True)
+    batch.ta.rsi(append=True)
+    batch.ta.bbands(append=True)
+    # Past the warm-up every value should agree
+    for col in COLUMNS:
+        np.testing.assert_allclose(streamed[col].iloc[60:], batch[col].iloc[60:], rtol=1e-6)
+
+
+def test_ticks_revise_forming_bar_and_state_survives_restart(tmp_path):
+    df = make_prices(120)
+    engine = StreamingIndicators(state_dir=str(tmp_path))
+    engine.catch_up("2330.TW", df.iloc[:-1])
+    # Intraday ticks of the last bar, then its final close
+    last = df.index[-1].isoformat()
+    for tick in (490.0, 510.0):
+        engine.update("2330.TW", last, tick)
+    engine.update("2330.TW", last, df["Close"].iloc[-1])
+    engine.save()
+
+    expected = reference(df["Close"])
+    np.testing.assert_allclose(pd.Series(engine.latest("2330.TW"))[COLUMNS], expected[COLUMNS].iloc[-1], rtol=1e-9)
+    np.testing.assert_allclose(pd.Series(engine.previous("2330.TW"))[COLUMNS], expected[COLUMNS].iloc[-2], rtol=1e-9)
+
+    # A new process only applies the bars it has not seen
+    more = make_prices(125)  # same seed: the first 120 bars are identical
+    restarted = StreamingIndicators(state_dir=str(tmp_path))
+    assert restarted.catch_up("2330.TW", more) == 6  # the last known bar again + 5 new ones
+    np.testing.assert_allclose(pd.Series(restarted.latest("2330.TW"))[COLUMNS],
+                               reference(more["Close"])[COLUMNS].iloc[-1], rtol=1e-9)
@@ -0,0 +1,69 @@
+"""
+MultiTimeframeBars tests: resampled views, memoization and incremental
+invalidation when new 5m base bars are stored.
+"""
+
+import numpy as np
+import pandas as pd
+
+from utils.price_store import PriceStore
+from utils.timeframes import MultiTimeframeBars, resample
+
+
+def five_minute_bars(days, seed=5):
+    # TWSE session 09:00-13:30 local = 01:00-05:30 UTC, 54 bars a day
+    rng = np.random.default_rng(seed)
+    index = pd.DatetimeIndex([ts for day in pd.bdate_range("2026-09-01", periods=days)
+                              for ts in pd.date_range(day + pd.Timedelta(hours=1), periods=54, freq="5min")])
+    close = 900 + np.cumsum(rng.normal(0, 1, len(index)))
+    return pd.DataFrame({"Open": close - 0.5, "High": close + 1, "Low": close - 1,
+                         "Close": close, "Volume": rng.integers(1, 100, len(index)).astype(float)}, index=index)
+
+
+def store_bars(store, ticker, df):
+    store._merge(ticker, df.index.as_unit("ns").asi8, df.to_numpy(dtype=float))
+
+
+def test_views_are_memoized_and_updated_incrementally(tmp_path):
+    store = PriceStore(store_dir=str(tmp_path), interval="5m")
+    bars = MultiTimeframeBars(store)
+    full = five_minute_bars(12)
+    store_bars(store, "2330.TW", full.iloc[:300])
+
+    daily = bars.bars("2330.TW", "1d")
+    assert bars.bars("2330.TW", "1d") is daily  # served from the memo
+    first_day = full.loc["2026-09-01"]
+    assert daily["Open"].iloc[0] == first_day["Open"].iloc[0]
+    assert daily["High"].iloc[0] == first_day["High"].max()
+    assert daily["Close"].iloc[0] == first_day["Close"].iloc[-1]
+    assert daily["Volume"].iloc[0] == first_day["Volume"].sum()
+    hourly, weekly = bars.bars("2330.TW", "60m"), bars.bars("2330.TW", "1wk")
+
+    # More bars (finishing a half-built day and hour) plus a revised forming bar
+    store_bars(store, "2330.TW", full.iloc[300:])
+    revised = full.iloc[-1:].copy()
+    revised["Close"] += 5
+    store_bars(store, "2330.TW", revised)
+    expected_base = pd.concat([full.iloc[:-1], revised])
+    expected_base.index = expected_base.index.as_unit("ns")
+    for timeframe in ("60m", "1d", "1wk"):
+        got = bars.bars("2330.TW", timeframe)
+        pd.testing.assert_frame_equal(got, resample(expected_base, timeframe), check_freq=False, check_names=False)
+    assert len(bars.bars("2330.TW", "1wk")) == 3 and len(weekly) == 2
+
+
+def test_chartist_source_version_follows_intraday_bars(tmp_path):
+    from modules.chartist import Chartist
+
+    store = PriceStore(store_dir=str(tmp_path), interval="5m")
+    chartist = Chartist.__new__(Chartist)
+    chartist.market_data = {"2330.TW": resample(five_minute_bars(3), "1d")}
+    chartist.intraday_bars = MultiTimeframeBars(store)
+    daily_only = chartist.get_source_version("2330.TW")
+
+    full = five_minute_bars(3)
+    store_bars(store, "2330.TW", full.iloc[:100])
+    first = chartist.get_source_version("2330.TW")
+    store_bars(store, "2330.TW", full.iloc[100:])
+    # Same daily bars, but new 5m bars: Chartist must not be skipped
+    assert len({daily_only, first, chartist.get_source_version("2330.TW")}) == 3
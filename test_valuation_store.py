@@ -0,0 +1,88 @@
+"""
+ValuationStore tests: BWIBBU parsing and concurrent incremental updates.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from utils.valuation_store import ValuationStore
+
+BWIBBU_FIELDS = ["證券代號", "證券名稱", "殖利率(%)", "股利年度", "本益比", "股價淨值比", "財報年/季"]
+
+
+class FakeTWSE:
+    """Serves one BWIBBU payload per weekday; PE rises by one each day."""
+    def __init__(self):
+        self.requests = []
+        self.lock = threading.Lock()
+
+    def get_json(self, url, params):
+        with self.lock:
+            self.requests.append(params["date"])
+        time.sleep(0.01)
+        pe = str(10 + len(self.requests))
+        return {"stat": "OK", "fields": BWIBBU_FIELDS, "data": [
+            ["2330", "台積電", "1.50", "114", pe, "5.10", "114/2"],
+            ["2603", "長榮", "8.20", "114", "-", "1.20", "114/2"],
+        ]}
+
+
+def test_parse_bwibbu():
+    stock_ids, metrics = ValuationStore.parse_bwibbu(FakeTWSE().get_json("", {"date": "20261016"}))
+    assert stock_ids == ["2330", "2603"]
+    assert metrics["pe"][0] == 11.0 and np.isnan(metrics["pe"][1])  # "-" = loss-making, no PE
+    assert metrics["dy"].tolist() == [1.5, np.float32(8.2)]
+
+
+def test_concurrent_updates_fetch_each_day_once(tmp_path):
+    http = FakeTWSE()
+    store = ValuationStore(store_dir=str(tmp_path), universe_path=str(tmp_path / "none.json"),
+                           history_days=10, min_request_interval=0, http=http)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        added = list(pool.map(lambda _: store.update("2026-10-16"), range(8)))
+
+    # Each weekday downloaded once and stored once (the window keeps the last 10)
+    assert sum(added) == len(http.requests) == len(set(http.requests))
+    assert len(store.dates) == len(set(store.dates.tolist())) == 10
+    assert store.get_valuation("2330")["date"] == "2026-10-16"
+
+    # A new process continues from the stored history
+    reopened = ValuationStore(store_dir=str(tmp_path), universe_path=str(tmp_path / "none.json"),
+                              history_days=10, min_request_interval=0, http=http)
+    assert reopened.update("2026-10-19") == 1 and str(reopened.dates[-1]) == "2026-10-19"
+
+
+def test_unpublished_end_date_is_synced_once_published(tmp_path):
+    from modules.valuator import Valuator
+
+    class LateTWSE(FakeTWSE):
+        """The end date's report is not out until `published` is set."""
+        published = False
+
+        def get_json(self, url, params):
+            if params["date"] == "20261016" and not self.published:
+                self.requests.append(params["date"])
+                return {"stat": "很抱歉，沒有符合條件的資料!"}
+            return super().get_json(url, params)
+
+    http = LateTWSE()
+    store = ValuationStore(store_dir=str(tmp_path), universe_path=str(tmp_path / "none.json"),
+                           history_days=10, min_request_interval=0, http=http)
+    store.update("2026-10-16")
+    assert str(store.dates[-1]) == "2026-10-15"
+    # Not re-requested on every call, and not marked synced either
+    requests = len(http.requests)
+    assert store.update("2026-10-16") == 0 and len(http.requests) == requests
+
+    http.published = True
+    valuator = Valuator.__new__(Valuator)
+    valuator.valuations = store
+    valuator.refresh_sources()
+    assert str(store.dates[-1]) == "2026-10-16"
+    requests = len(http.requests)
+    store.update("2026-10-16")
+    assert len(http.requests) == requests
@@ -0,0 +1,274 @@
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+from utils.indicator_kernel import price_matrices
+
+# Walk-forward backtest over (tickers x dates) matrices.
+#
+# Every rule is a vectorized function of feature matrices whose column t only
+# depends on bars up to t (the feature store's filters run forward in time),
+# so a signal at t never sees later prices. A signal is acted on at the close
+# of its own date and earns the return from t to t+1 onward; forward returns
+# are reported at T+1/5/20 for every signal.
+
+HORIZONS = (1, 5, 20)
+TRADING_DAYS = 252
+
+# Feature store columns a backtest reads: (feature, column)
+FEATURE_COLUMNS = (
+    ("rsi_14", "RSI_14"),
+    ("macd_12_26_9", "MACD_12_26_9"),
+    ("macd_12_26_9", "MACDs_12_26_9"),
+    ("bbands_20_2", "BBL_20_2.0"),
+    ("bbands_20_2", "BBU_20_2.0"),
+)
+
+
+def _lag(x):
+    """Value of the previous date in each row (NaN on the first)."""
+    out = np.full(x.shape, np.nan)
+    out[:, 1:] = x[:, :-1]
+    return out
+
+
+def _signal(buy, sell):
+    return np.where(buy & ~sell, 1, np.where(sell & ~buy, -1, 0)).astype(np.int8)
+
+
+# ----------------------------------------------------------------------
+# Rules: {column: tickers x dates} -> int8 matrix of +1 BUY / -1 SELL / 0
+# ----------------------------------------------------------------------
+def rsi_rule(data, oversold=30, overbought=70):
+    """RSI < 30 oversold (BUY), > 70 overbought (SELL)."""
+    rsi = data["RSI_14"]
+    return _signal(rsi < oversold, rsi > overbought)
+
+
+def chartist_rule(data):
+    """
+    Chartist's indicators as a mechanical rule: a MACD cross confirmed by
+    RSI, or a close outside the Bollinger Bands (mean reversion).
+    """
+    macd, signal = data["MACD_12_26_9"], data["MACDs_12_26_9"]
+    prev_macd, prev_signal = _lag(macd), _lag(signal)
+    cross_up = (prev_macd <= prev_signal) & (macd > signal)
+    cross_down = (prev_macd >= prev_signal) & (macd < signal)
+    close, rsi = data["Close"], data["RSI_14"]
+    buy = (cross_up & (rsi < 70)) | (close < data["BBL_20_2.0"])
+    sell = (cross_down & (rsi > 30)) | (close > data["BBU_20_2.0"])
+    return _signal(buy, sell)
+
+
+def strategist_score(data):
+    """
+    Strategist's VIX rule as signal x confidence: VIX > 30 SELL (1.0),
+    VIX < 15 BUY (0.5), otherwise NEUTRAL. Market-wide, so every ticker
+    of a date gets the same score.
+    """
+    vix = data["VIX"]
+    return np.where(vix > 30, -1.0, np.where(vix < 15, 0.5, 0.0))
+
+
+def strategist_rule(data):
+    score = strategist_score(data)
+    return _signal(score > 0, score < 0)
+
+
+def committee_rule(members: dict, weights: dict, threshold=0.15):
+    """
+    Weighted committee vote over members {analyst name: rule or score},
+    scored like ChiefAdvisor.rate (BUY above +threshold, SELL below
+    -threshold). Weights are renormalized over the members given, since
+    only analysts with a price-derived history can be replayed.
+    """
+    def rule(data):
+        total = sum(weights.get(name, 0.0) for name in members) or 1.0
+        score = sum(weights.get(name, 0.0) * member(data).astype(float) for name, member in members.items())
+        score = score / total
+        return _signal(score > threshold, score < -threshold)
+    return rule
+
+
+RULES = {"rsi": rsi_rule, "chartist": chartist_rule, "strategist": strategist_rule}
+
+# Analysts (by AlphaCore weight key) whose verdicts can be replayed from stored prices
+COMMITTEE_MEMBERS = {
+    "The Chartist (Technical)": chartist_rule,
+    "The Strategist (Macro)": strategist_score,
+}
+
+
+# ----------------------------------------------------------------------
+# Data
+# ----------------------------------------------------------------------
+def _previous_session(series, dates):
+    """
+    Value of `series` on its last date strictly before each of `dates`.
+    A US close (e.g. ^VIX) of date d is only known after the Taiwan close
+    of d, so using it from d on would look ahead.
+    """
+    if series is None or series.empty:
+        return np.full(len(dates), np.nan)
+    index = series.index.normalize()
+    position = index.searchsorted(dates.normalize(), side="left") - 1
+    values = series.to_numpy(dtype=float)
+    return np.where(position >= 0, values[np.maximum(position, 0)], np.nan)
+
+
+def load_matrices(tickers, start=None, end=None, prices=None, features=None, refresh=False, warmup_days=200):
+    """
+    Aligned inputs for `tickers`: Close plus the FEATURE_COLUMNS matrices,
+    read from the feature store after bringing it up to date, and the
+    previous session's VIX. History from `warmup_days` before `start` is
+    loaded so indicators are settled by then.
+    Returns (tickers, dates, {column: tickers x dates}) restricted to [start, end].
+    """
+    if prices is None:
+        from utils.price_store import PriceStore
+        prices = PriceStore()
+    if features is None:
+        from utils.feature_store import FeatureStore
+        features = FeatureStore()
+
+    start = pd.Timestamp(start) if start else pd.Timestamp.now().normalize() - timedelta(days=365)
+    history_start = start - timedelta(days=warmup_days)
+    if refresh:
+        prices.update_many(list(tickers) + ["^VIX"], start=history_start)
+    # Load up to the latest bar (not just `end`) so the feature store only ever appends
+    frames = {t: prices.get_history(t, start=history_start, refresh=False) for t in tickers}
+    features.update_prices(frames, tickers)
+
+    names, dates, matrices = price_matrices(frames, ("Close",), tickers)
+    data = {"Close": matrices["Close"]}
+    for feature, column in FEATURE_COLUMNS:
+        _, stored_dates, values = features.matrix(feature, column, names)
+        columns = stored_dates.get_indexer(dates.normalize())
+        aligned = np.full((len(names), len(dates)), np.nan)
+        found = columns >= 0
+        aligned[:, found] = values[:, columns[found]]
+        data[column] = aligned
+    vix = prices.get_history("^VIX", start=history_start, refresh=False)
+    data["VIX"] = np.broadcast_to(_previous_session(vix["Close"] if not vix.empty else None, dates),
+                                  (len(names), len(dates)))
+
+    keep = (dates >= start) & (dates <= (pd.Timestamp(end) if end else dates.max()))
+    return names, dates[keep], {k: v[:, keep] for k, v in data.items()}
+
+
+# ----------------------------------------------------------------------
+# Evaluation
+# ----------------------------------------------------------------------
+def forward_returns(close, horizon):
+    """close[t + horizon] / close[t] - 1 (NaN where t + horizon is past the data)."""
+    out = np.full(close.shape, np.nan)
+    if horizon < close.shape[1]:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            out[:, :-horizon] = close[:, horizon:] / close[:, :-horizon] - 1
+    return out
+
+
+def positions(signals, hold="until_exit", long_only=True):
+    """
+    Position per ticker and date. "until_exit" keeps the last BUY/SELL
+    until the opposite signal; "signal" only holds on signal days.
+    """
+    pos = signals.astype(float)
+    if hold == "until_exit":
+        pos[pos == 0] = np.nan
+        valid = ~np.isnan(pos)
+        last = np.maximum.accumulate(np.where(valid, np.arange(pos.shape[1]), -1), axis=1)
+        pos = np.where(last >= 0, np.take_along_axis(pos, np.maximum(last, 0), axis=1), 0.0)
+    if long_only:
+        pos = np.maximum(pos, 0.0)
+    return pos
+
+
+def portfolio_returns(pos, next_return):
+    """
+    Equal-weight daily return of the open positions: the position held at
+    the close of t earns next_return[:, t] (t -> t+1).
+    """
+    active = (pos != 0) & ~np.isnan(next_return)
+    pnl = np.where(active, pos * np.nan_to_num(next_return), 0.0)
+    counts = active.sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(counts > 0, pnl.sum(axis=0) / np.maximum(counts, 1), 0.0)
+
+
+def performance(daily) -> dict:
+    daily = np.asarray(daily, dtype=float)
+    if not len(daily):
+        return {"total_return": 0.0, "cagr": 0.0, "volatility": 0.0, "sharpe": 0.0, "max_drawdown": 0.0}
+    equity = np.cumprod(1 + daily)
+    years = max(len(daily) / TRADING_DAYS, 1e-9)
+    vol = daily.std() * np.sqrt(TRADING_DAYS)
+    drawdown = equity / np.maximum.accumulate(equity) - 1
+    return {
+        "total_return": float(equity[-1] - 1),
+        "cagr": float(equity[-1] ** (1 / years) - 1),
+        "volatility": float(vol),
+        "sharpe": float(daily.mean() * TRADING_DAYS / vol) if vol > 0 else 0.0,
+        "max_drawdown": float(drawdown.min()),
+    }
+
+
+def run_backtest(tickers, dates, data, rules=None, horizons=HORIZONS, hold="until_exit", long_only=True) -> dict:
+    """
+    Evaluates every rule at every date for every ticker in one pass.
+    Returns {
+        "signals":     one row per (date, ticker, rule) BUY/SELL with T+h forward returns,
+        "signal_stats": per rule and side: count, mean forward return and hit rate per horizon,
+        "equity":      dates x (rule strategies + equal-weight benchmark) equity curves,
+        "performance": {strategy: total return, CAGR, volatility, Sharpe, max drawdown},
+    }
+    """
+    rules = rules or RULES
+    close = data["Close"]
+    fwd = {h: forward_returns(close, h) for h in horizons}
+    next_return = fwd.get(1, forward_returns(close, 1))
+    index = pd.DatetimeIndex(dates)
+
+    signal_frames, stats, equity, perf = [], [], {}, {}
+    for name, rule in rules.items():
+        signals = rule(data)
+        rows, cols = np.nonzero(signals)
+        frame = pd.DataFrame({
+            "date": index[cols],
+            "ticker": np.asarray(tickers, dtype=object)[rows],
+            "rule": name,
+            "signal": np.where(signals[rows, cols] > 0, "BUY", "SELL"),
+            "close": close[rows, cols],
+            **{f"fwd_{h}d": fwd[h][rows, cols] for h in horizons},
+        })
+        signal_frames.append(frame)
+
+        for side, sign in (("BUY", 1), ("SELL", -1)):
+            picked = frame[frame["signal"] == side]
+            row = {"rule": name, "signal": side, "count": len(picked)}
+            for h in horizons:
+                returns = picked[f"fwd_{h}d"].dropna()
+                row[f"mean_fwd_{h}d"] = float(returns.mean()) if len(returns) else np.nan
+                row[f"hit_rate_{h}d"] = float((np.sign(returns) == sign).mean()) if len(returns) else np.nan
+            stats.append(row)
+
+        # Returns are credited to the date they are realized (t+1)
+        daily = portfolio_returns(positions(signals, hold, long_only), next_return)
+        realized = np.concatenate([[0.0], daily[:-1]]) if len(daily) else daily
+        equity[name] = np.cumprod(1 + realized)
+        perf[name] = performance(realized[1:])
+
+    # Equal-weight buy & hold of every ticker with a price on both days
+    benchmark = portfolio_returns(np.ones(close.shape), next_return)
+    benchmark = np.concatenate([[0.0], benchmark[:-1]]) if len(benchmark) else benchmark
+    equity["buy_and_hold"] = np.cumprod(1 + benchmark)
+    perf["buy_and_hold"] = performance(benchmark[1:])
+
+    signals = pd.concat(signal_frames, ignore_index=True) if signal_frames else pd.DataFrame()
+    return {
+        "signals": signals.sort_values(["date", "ticker", "rule"], ignore_index=True) if len(signals) else signals,
+        "signal_stats": pd.DataFrame(stats),
+        "equity": pd.DataFrame(equity, index=index),
+        "performance": perf,
+    }
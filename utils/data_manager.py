@@ -1,39 +1,329 @@
 import os
-import json
+import time
+import asyncio
 import datetime
+import threading
+from collections import OrderedDict
+from utils.serializers import get_serializer, atomic_write
+from utils.prompt_budget import compact, estimate_tokens, to_text
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key: the first caller (leader)
+    runs the function, everyone arriving while it is in flight waits and
+    receives the same result (or exception).
+    Works across threads; asyncio callers use `ado`, which coalesces per
+    event loop.
+    """
+    class _Call:
+        def __init__(self):
+            self.done = threading.Event()
+            self.result = None
+            self.error = None
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._async_calls = {}  # (loop id, key) -> asyncio.Future
+
+    def do(self, key, func):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = self._Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    async def ado(self, key, coro_func):
+        loop = asyncio.get_running_loop()
+        flight_key = (id(loop), key)
+        future = self._async_calls.get(flight_key)
+        if future is not None:
+            # shield: a cancelled follower must not cancel the leader's fetch
+            return await asyncio.shield(future)
+
+        future = self._async_calls[flight_key] = loop.create_future()
+        try:
+            result = await coro_func()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark retrieved so an exception nobody else awaited is not logged
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._async_calls[flight_key]
 
 class DataManager:
     """
     Handles local data caching to prevent redundant API calls and save tokens/resources.
     Implementation of the 'MCP-lite' concept for data management.
+
+    Two tiers:
+    - Memory: a bounded in-process LRU for repeated lookups within one run.
+    - Disk: one file per (category, identifier), capped in total bytes and
+      evicted least-recently-used first, so lookups also survive across runs.
+    Entries expire after a per-category TTL.
     """
-    def __init__(self, cache_dir="/workspaces/moltbot-test/data/cache"):
+    # Seconds an entry stays fresh, by category (None = never expires)
+    DEFAULT_TTLS = {
+        "institutional": 24 * 3600,   # T86 is published once per trading day
+        "valuation": 24 * 3600,       # BWIBBU is published once per trading day
+        "shareholding": 7 * 24 * 3600,  # TDCC distribution is weekly
+        "news": 3600,
+        "http": 7 * 24 * 3600,        # conditional-GET validators + body
+    }
+
+    # Shared by every instance so separate analysts/auditors coalesce too
+    _flights = SingleFlight()
+
+    def __init__(self, cache_dir="/workspaces/moltbot-test/data/cache",
+                 memory_capacity=256, max_disk_bytes=200 * 1024 * 1024,
+                 ttls=None, default_ttl=24 * 3600, serializer=None, prompt_token_budget=250):
         self.cache_dir = cache_dir
+        # Compact binary by default; get_serializer("json-debug") for readable files
+        self.serializer = serializer or get_serializer()
+        self.memory_capacity = memory_capacity
+        self.max_disk_bytes = max_disk_bytes
+        self.ttls = dict(self.DEFAULT_TTLS, **(ttls or {}))
+        self.default_ttl = default_ttl
+        self.prompt_token_budget = prompt_token_budget
         os.makedirs(self.cache_dir, exist_ok=True)
 
+        self._lock = threading.RLock()
+        self._memory = OrderedDict()   # (category, identifier) -> cache entry
+        self._disk_index = self._scan_disk()  # path -> [size, last_access]
+        self.stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "expired": 0,
+            "memory_evictions": 0,
+            "disk_evictions": 0,
+        }
+
     def get_cache_path(self, category, identifier):
-        return os.path.join(self.cache_dir, f"{category}_{identifier}.json")
+        return os.path.join(self.cache_dir, f"{category}_{identifier}{self.serializer.extension}")
 
+    def get_ttl(self, category):
+        return self.ttls.get(category, self.default_ttl)
+
+    # ------------------------------------------------------------------
+    # Read / write
+    # ------------------------------------------------------------------
     def save_data(self, category, identifier, data):
         path = self.get_cache_path(category, identifier)
         cache_entry = {
             "timestamp": datetime.datetime.now().isoformat(),
             "data": data
         }
-        with open(path, 'w') as f:
-            json.dump(cache_entry, f, ensure_ascii=False, indent=4)
+        with self._lock:
+            atomic_write(path, self.serializer.dumps(cache_entry))
+            self._disk_index[path] = [os.path.getsize(path), time.time()]
+            self._remember(category, identifier, cache_entry)
+            self._evict_disk()
 
-    def get_summarized_prompt_data(self, category, identifier, filter_func=None):
+    def load_data(self, category, identifier, max_age=None):
+        """
+        Returns the cached payload, or None on a miss or an expired entry.
+        `max_age` (seconds) overrides the category TTL for this lookup.
         """
-        Retrieves data and applies a filtering/summarization function 
+        key = (category, identifier)
+        ttl = max_age if max_age is not None else self.get_ttl(category)
+
+        with self._lock:
+            cache_entry = self._memory.get(key)
+            if cache_entry is not None:
+                if self._is_expired(cache_entry, ttl):
+                    self.invalidate(category, identifier)
+                    self.stats["expired"] += 1
+                    self.stats["misses"] += 1
+                    return None
+                self._memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return cache_entry["data"]
+
+            path = self.get_cache_path(category, identifier)
+            if not os.path.exists(path):
+                self.stats["misses"] += 1
+                return None
+
+            try:
+                with open(path, 'rb') as f:
+                    cache_entry = self.serializer.loads(f.read())
+            except Exception:
+                self.invalidate(category, identifier)
+                self.stats["misses"] += 1
+                return None
+
+            if self._is_expired(cache_entry, ttl):
+                self.invalidate(category, identifier)
+                self.stats["expired"] += 1
+                self.stats["misses"] += 1
+                return None
+
+            # Touch the file so LRU order also survives across runs
+            now = time.time()
+            os.utime(path, (now, now))
+            if path in self._disk_index:
+                self._disk_index[path][1] = now
+            self._remember(category, identifier, cache_entry)
+            self.stats["disk_hits"] += 1
+            return cache_entry["data"]
+
+    def get_or_fetch(self, category, identifier, fetch_func, max_age=None):
+        """
+        Cache-aside lookup with single-flight: on a miss, concurrent callers
+        for the same (category, identifier) share one `fetch_func()` call.
+        A None result is returned but not cached.
+        """
+        data = self.load_data(category, identifier, max_age=max_age)
+        if data is not None:
+            return data
+
+        def fetch():
+            # A leader that finished just before us may already have filled the cache
+            cached = self.load_data(category, identifier, max_age=max_age)
+            if cached is not None:
+                return cached
+            fresh = fetch_func()
+            if fresh is not None:
+                self.save_data(category, identifier, fresh)
+            return fresh
+
+        return self._flights.do((self.cache_dir, category, identifier), fetch)
+
+    async def aget_or_fetch(self, category, identifier, fetch_func, max_age=None):
+        """
+        asyncio flavour of get_or_fetch. `fetch_func` may be a coroutine
+        function (coalesced per event loop) or a plain blocking callable
+        (run in a worker thread and coalesced with threaded callers too).
+        """
+        if not asyncio.iscoroutinefunction(fetch_func):
+            return await asyncio.to_thread(self.get_or_fetch, category, identifier, fetch_func, max_age)
+
+        data = self.load_data(category, identifier, max_age=max_age)
+        if data is not None:
+            return data
+
+        async def fetch():
+            cached = self.load_data(category, identifier, max_age=max_age)
+            if cached is not None:
+                return cached
+            fresh = await fetch_func()
+            if fresh is not None:
+                self.save_data(category, identifier, fresh)
+            return fresh
+
+        return await self._flights.ado((self.cache_dir, category, identifier), fetch)
+
+    def invalidate(self, category, identifier):
+        """Drops an entry from both tiers."""
+        path = self.get_cache_path(category, identifier)
+        with self._lock:
+            self._memory.pop((category, identifier), None)
+            self._disk_index.pop(path, None)
+            if os.path.exists(path):
+                os.remove(path)
+
+    def get_stats(self):
+        with self._lock:
+            lookups = self.stats["memory_hits"] + self.stats["disk_hits"] + self.stats["misses"]
+            hits = self.stats["memory_hits"] + self.stats["disk_hits"]
+            return dict(self.stats,
+                        hit_rate=round(hits / lookups, 3) if lookups else 0.0,
+                        memory_entries=len(self._memory),
+                        disk_entries=len(self._disk_index),
+                        disk_bytes=sum(size for size, _ in self._disk_index.values()))
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _is_expired(cache_entry, ttl):
+        if ttl is None:
+            return False
+        saved_at = datetime.datetime.fromisoformat(cache_entry["timestamp"])
+        return (datetime.datetime.now() - saved_at).total_seconds() > ttl
+
+    def _remember(self, category, identifier, cache_entry):
+        key = (category, identifier)
+        self._memory[key] = cache_entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_capacity:
+            self._memory.popitem(last=False)
+            self.stats["memory_evictions"] += 1
+
+    def _scan_disk(self):
+        index = {}
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if os.path.isfile(path):
+                st = os.stat(path)
+                index[path] = [st.st_size, st.st_mtime]
+        return index
+
+    def _evict_disk(self):
+        total = sum(size for size, _ in self._disk_index.values())
+        if total <= self.max_disk_bytes:
+            return
+        # Least recently used first
+        for path, (size, _) in sorted(self._disk_index.items(), key=lambda kv: kv[1][1]):
+            if total <= self.max_disk_bytes:
+                break
+            if os.path.exists(path):
+                os.remove(path)
+            del self._disk_index[path]
+            total -= size
+            self.stats["disk_evictions"] += 1
+
+    def get_summarized_prompt_data(self, category, identifier, filter_func=None, max_tokens=None, priority=()):
+        """
+        Retrieves data and applies a filtering/summarization function
         to reduce token count before passing to the LLM.
+
+        Without a filter, the payload is compacted to `max_tokens`
+        (default: prompt_token_budget): the `priority` fields (e.g. an
+        analyst's PROMPT_FIELDS) are kept first, numeric series become summary statistics and long text
+        or lists are trimmed, so the result is always valid JSON.
         """
         data = self.load_data(category, identifier)
         if not data:
             return "No recent data available."
-        
+
         if filter_func:
             return filter_func(data)
-        
-        # Default: Return a truncated JSON to save tokens
-        return json.dumps(data)[:1000] + "... (truncated)"
+
+        budget = max_tokens or self.prompt_token_budget
+        if not isinstance(data, dict):
+            data = {"data": data}
+        summary = compact(data, priority=priority, max_tokens=budget)
+        text = to_text(summary)
+        if len(summary) < len(data):
+            dropped = len(data) - len(summary)
+            note = f" (+{dropped} lower-priority fields omitted)"
+            if estimate_tokens(text + note) <= budget:
+                text += note
+        return text
@@ -0,0 +1,107 @@
+import json
+import datetime
+
+from utils.data_manager import DataManager
+from utils.llm_gateway import REPORT_FORMAT
+from utils.prompt_budget import estimate_tokens, summarize_value, to_text
+
+
+def flatten(data, prefix="") -> dict:
+    """{"macd": {"current": 1}} -> {"macd.current": 1}; lists stay as values."""
+    flat = {}
+    for key, value in (data or {}).items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, prefix=f"{path}."))
+        else:
+            flat[path] = value
+    return flat
+
+
+def diff_inputs(old: dict, new: dict) -> dict:
+    """
+    Compact field-level diff between two gather_data payloads:
+    {"changed": {field: [old, new]}, "added": {field: new}, "removed": [field]}.
+    Lists report only the items that appeared / disappeared.
+    """
+    old_flat, new_flat = flatten(old), flatten(new)
+    changed, added = {}, {}
+    for key, value in new_flat.items():
+        if key not in old_flat:
+            added[key] = value
+        elif old_flat[key] != value:
+            before = old_flat[key]
+            if isinstance(before, list) and isinstance(value, list):
+                appeared = [v for v in value if v not in before]
+                gone = [v for v in before if v not in value]
+                changed[key] = {"new_items": appeared, "dropped_items": len(gone)}
+            else:
+                changed[key] = [before, value]
+    removed = [key for key in old_flat if key not in new_flat]
+    return {k: v for k, v in (("changed", changed), ("added", added), ("removed", removed)) if v}
+
+
+class DeltaPromptStore:
+    """
+    Remembers, per (ticker, analyst), the inputs and verdict of the last
+    real LLM judgment so the next prompt can carry only the prior verdict
+    plus what changed. A full prompt is still sent when there is no usable
+    baseline: first run, a new PROMPT_VERSION, a stale baseline, every
+    `full_refresh_every`-th run (to stop drift), or when the delta would
+    not be smaller than the full prompt.
+    """
+    OUTPUT_FORMAT = "Your output must be a structured report in the following format:\n" + REPORT_FORMAT
+
+    def __init__(self, dm=None, max_baseline_age=7 * 24 * 3600, full_refresh_every=5):
+        self.dm = dm or DataManager()
+        self.max_baseline_age = max_baseline_age
+        self.full_refresh_every = full_refresh_every
+        self.stats = {"delta_prompts": 0, "full_prompts": 0, "tokens_saved": 0}
+
+    @staticmethod
+    def _key(ticker, analyst):
+        return f"{ticker}_{analyst.name.replace(' ', '_')}"
+
+    def load_baseline(self, ticker, analyst):
+        state = self.dm.load_data("delta_state", self._key(ticker, analyst), max_age=self.max_baseline_age)
+        if not state or state.get("prompt_version") != getattr(analyst, "PROMPT_VERSION", "1"):
+            return None
+        return state
+
+    def build_prompt(self, ticker, analyst, raw_data, full_context) -> str:
+        """Returns the delta prompt when it is worthwhile, otherwise `full_context`."""
+        baseline = self.load_baseline(ticker, analyst)
+        if baseline is None or baseline.get("deltas_since_full", 0) + 1 >= self.full_refresh_every:
+            self.stats["full_prompts"] += 1
+            return full_context
+
+        prior = baseline["judgment"]
+        changes = diff_inputs(baseline["inputs"], json.loads(to_text(summarize_value(raw_data))))
+        change_text = to_text(changes) if changes else "No input changed."
+        delta_context = (
+            f"{analyst.get_identity_context()}\n\nTask:\n"
+            f"You judged {ticker} on {baseline['judged_at'][:10]}: "
+            f"SIGNAL {prior.get('signal')}, CONFIDENCE {prior.get('confidence')} - {prior.get('reason')}\n"
+            f"Input changes since then (field: [old, new]): {change_text}\n\n"
+            f"Update your judgment in light of these changes only; keep it if they are immaterial.\n"
+            f"{self.OUTPUT_FORMAT}"
+        )
+
+        saved = estimate_tokens(full_context) - estimate_tokens(delta_context)
+        if saved <= 0:
+            self.stats["full_prompts"] += 1
+            return full_context
+        self.stats["delta_prompts"] += 1
+        self.stats["tokens_saved"] += saved
+        return delta_context
+
+    def record(self, ticker, analyst, raw_data, judgment, was_delta):
+        """Stores the new baseline after a real LLM verdict."""
+        previous = self.load_baseline(ticker, analyst) or {}
+        self.dm.save_data("delta_state", self._key(ticker, analyst), {
+            "prompt_version": getattr(analyst, "PROMPT_VERSION", "1"),
+            "inputs": json.loads(to_text(summarize_value(raw_data))),
+            "judgment": {k: judgment.get(k) for k in ("signal", "confidence", "reason")},
+            "judged_at": datetime.datetime.now().isoformat(),
+            "deltas_since_full": previous.get("deltas_since_full", 0) + 1 if was_delta else 0,
+        })
@@ -0,0 +1,345 @@
+import io
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from utils import indicator_kernel as kernel
+from utils.serializers import atomic_write
+
+
+class Feature:
+    """
+    One derived feature, defined once for every consumer.
+
+    `compute(inputs, state, first)` receives {input name: (tickers x days)
+    matrix} and returns {column: (tickers x days-first) matrix} for the days
+    from index `first` on. Stateful features (recursive filters) carry
+    `state` between calls and only ever see new days; windowed features
+    instead declare `lookback` days of context (None = all history).
+    Bump `version` whenever the definition changes: only that feature's
+    stored values are recomputed.
+    """
+    def __init__(self, name, version, source, columns, compute, lookback=0, stateful=False):
+        self.name = name
+        self.version = version
+        self.source = source
+        self.columns = tuple(columns)
+        self.compute = compute
+        self.lookback = lookback
+        self.stateful = stateful
+
+    @property
+    def key(self):
+        return f"{self.name}@v{self.version}"
+
+
+# ----------------------------------------------------------------------
+# Definitions
+# ----------------------------------------------------------------------
+def _rsi_14(inputs, state, first):
+    return {"RSI_14": kernel.rsi(inputs["Close"], 14, state=state)}
+
+
+def _macd_12_26_9(inputs, state, first):
+    return kernel.macd(inputs["Close"], 12, 26, 9, state=state)
+
+
+def _bbands_20_2(inputs, state, first):
+    return kernel.bbands(inputs["Close"], 20, 2.0, state=state)
+
+
+def _atr_14(inputs, state, first):
+    return {"ATRr_14": kernel.atr(inputs["High"], inputs["Low"], inputs["Close"], 14, state=state)}
+
+
+
+FEATURES = {f.name: f for f in (
+    Feature("rsi_14", 1, "prices", ["RSI_14"], _rsi_14, stateful=True),
+    Feature("macd_12_26_9", 1, "prices", ["MACD_12_26_9", "MACDh_12_26_9", "MACDs_12_26_9"],
+            _macd_12_26_9, stateful=True),
+    Feature("bbands_20_2", 1, "prices", ["BBL_20_2.0", "BBM_20_2.0", "BBU_20_2.0"], _bbands_20_2, stateful=True),
+    Feature("atr_14", 1, "prices", ["ATRr_14"], _atr_14, stateful=True),
+)}
+
+
+# ----------------------------------------------------------------------
+# Source adapter: (ids, dates as datetime64[D], {input: ids x days matrix})
+# ----------------------------------------------------------------------
+def price_inputs(frames: dict, tickers=None):
+    tickers, dates, matrices = kernel.price_matrices(frames, ("High", "Low", "Close"), tickers)
+    return tickers, np.asarray(dates.normalize(), dtype="datetime64[D]"), matrices
+
+
+def _flatten(state, prefix="state"):
+    flat = {}
+    for key, value in state.items():
+        path = f"{prefix}__{key}"
+        if isinstance(value, dict):
+            flat.update(_flatten(value, path))
+        else:
+            flat[path] = np.asarray(value)
+    return flat
+
+
+def _unflatten(arrays):
+    state = {}
+    for path, value in arrays.items():
+        node = state
+        keys = path.split("__")[1:]
+        for key in keys[:-1]:
+            node = node.setdefault(key, {})
+        node[keys[-1]] = value
+    return state
+
+
+def _take(state, rows):
+    """Copy of `state` restricted to `rows` along the ticker axis."""
+    return {k: _take(v, rows) if isinstance(v, dict) else np.array(v)[rows] for k, v in state.items()}
+
+
+def _put(state, rows, update):
+    """Writes `update` (a state of len(rows) tickers) into `state` in place."""
+    for k, v in update.items():
+        if isinstance(v, dict):
+            _put(state[k], rows, v)
+        else:
+            state[k][rows] = v
+
+
+def _append(state, extra):
+    """State of the tickers of `state` followed by those of `extra`."""
+    if not state:
+        return extra
+    return {k: _append(v, extra[k]) if isinstance(v, dict) else np.concatenate([v, extra[k]]) for k, v in state.items()}
+
+
+class FeatureStore:
+    """
+    Versioned, incrementally computed feature values shared by analysts,
+    backtests and audits.
+
+    Each (feature, version) is one columnar partition,
+    {store_dir}/{feature}/v{version}.npz, holding the date axis, the ticker
+    axis, one (tickers x dates) float64 matrix per column and - for stateful
+    features - the filter state as of the day before the last stored date.
+    An update recomputes that last date (it may have been a forming bar)
+    and appends the new ones; tickers seen for the first time, or left out
+    of an earlier update (their state stopped short of the last date), are
+    computed from the start of their input history. So are all the tickers
+    of an update whose inputs reach further back than the stored dates, or
+    skip the last of them - the other stored tickers are left as they
+    are. A definition change
+    (new version) writes a new partition and leaves every other feature as is.
+    """
+    def __init__(self, store_dir="/workspaces/moltbot-test/data/features", features=None):
+        self.store_dir = store_dir
+        self.features = dict(features or FEATURES)
+        # feature key -> (file mtime, partition); reloaded when another instance rewrites it
+        self._parts = {}
+        self._lock = threading.RLock()
+        os.makedirs(self.store_dir, exist_ok=True)
+
+    # ------------------------------------------------------------------
+    # Columnar persistence
+    # ------------------------------------------------------------------
+    def _path(self, feature):
+        return os.path.join(self.store_dir, feature.name, f"v{feature.version}.npz")
+
+    def _empty(self, feature):
+        return {"dates": np.array([], dtype="datetime64[D]"), "tickers": [], "synced": np.array([], dtype="datetime64[D]"),
+                "columns": {c: np.zeros((0, 0)) for c in feature.columns}, "state": {}}
+
+    @staticmethod
+    def _mtime(path):
+        return os.stat(path).st_mtime_ns if os.path.exists(path) else None
+
+    def _load(self, feature):
+        path = self._path(feature)
+        mtime = self._mtime(path)
+        cached = self._parts.get(feature.key)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        part = self._empty(feature)
+        if mtime is not None:
+            with np.load(path) as npz:
+                part = {
+                    "dates": npz["dates"],
+                    "tickers": npz["tickers"].tolist(),
+                    # Last date each ticker's values and state were computed through
+                    "synced": npz["synced"] if "synced" in npz.files else
+                              np.full(len(npz["tickers"]), npz["dates"][-1] if len(npz["dates"]) else None,
+                                      dtype="datetime64[D]"),
+                    "columns": {c: npz[f"col__{c}"] for c in feature.columns},
+                    "state": _unflatten({k: npz[k] for k in npz.files if k.startswith("state__")}),
+                }
+        self._parts[feature.key] = (mtime, part)
+        return part
+
+    def _save(self, feature, part):
+        buf = io.BytesIO()
+        # dtype=str sizes the ticker axis to the longest id
+        np.savez_compressed(buf, dates=part["dates"], tickers=np.array(part["tickers"], dtype=str),
+                            synced=part["synced"],
+                            **{f"col__{c}": v for c, v in part["columns"].items()}, **_flatten(part["state"]))
+        path = self._path(feature)
+        atomic_write(path, buf.getvalue())
+        self._parts[feature.key] = (self._mtime(path), part)
+        # Older versions of this feature are stale now
+        folder = os.path.dirname(path)
+        for name in os.listdir(folder):
+            if name.endswith(".npz") and name != os.path.basename(path):
+                os.remove(os.path.join(folder, name))
+
+    # ------------------------------------------------------------------
+    # Incremental computation
+    # ------------------------------------------------------------------
+    def _run(self, feature, inputs, rows, begin, state):
+        """
+        Values for input `rows` over input days [begin:], plus the state
+        after all but the last of those days.
+        """
+        sub = {k: v[rows] for k, v in inputs.items()}
+        if not feature.stateful:
+            context = 0 if feature.lookback is None else max(0, begin - feature.lookback)
+            return feature.compute({k: v[:, context:] for k, v in sub.items()}, None, begin - context), {}
+
+        head = feature.compute({k: v[:, begin:-1] for k, v in sub.items()}, state, 0)
+        committed = _take(state, slice(None))
+        tail = feature.compute({k: v[:, -1:] for k, v in sub.items()}, state, 0)
+        return {c: np.concatenate([head[c], tail[c]], axis=1) for c in feature.columns}, committed
+
+    def update(self, name, ids, dates, inputs) -> int:
+        """
+        Brings feature `name` up to date from source matrices
+        (ids x dates, see price_inputs).
+        Returns the number of new dates stored.
+        """
+        feature = self.features[name]
+        dates = np.asarray(dates, dtype="datetime64[D]")
+        if not len(ids) or not len(dates):
+            return 0
+
+        with self._lock:
+            part = self._load(feature)
+            restart = False
+            if len(part["dates"]) and dates[-1] >= part["dates"][-1]:
+                if part["dates"][-1] not in dates:
+                    # The inputs skip our last date, so the carried state cannot continue
+                    print(f"[FeatureStore] {feature.key}: inputs do not cover {part['dates'][-1]}, "
+                          f"recomputing {len(ids)} tickers")
+                    restart = True
+                elif dates[0] < part["dates"][0]:
+                    # Longer history than stored (e.g. a backtest warm-up): recompute these tickers from it
+                    restart = True
+
+            position = {t: i for i, t in enumerate(part["tickers"])}
+            last = part["dates"][-1] if len(part["dates"]) else None
+            # Tickers missing from an update carry state from before it: recompute them.
+            # Tickers not passed at all keep their rows, state and sync date untouched.
+            synced = {t: part["synced"][position[t]] for t in ids if t in position}
+            current = [i for i, t in enumerate(ids) if t in synced and synced[t] == last and not restart]
+            behind = [i for i, t in enumerate(ids) if t in synced and (synced[t] != last or restart)]
+            fresh = [i for i, t in enumerate(ids) if t not in position]
+
+            groups = []
+            if current:
+                begin = int(np.searchsorted(dates, last))
+                if begin < len(dates):
+                    rows = [position[ids[i]] for i in current]
+                    state = _take(part["state"], rows) if part["state"] else {}
+                    groups.append((current, begin, state, rows))
+            if behind:
+                groups.append((behind, 0, {}, [position[ids[i]] for i in behind]))
+            if fresh:
+                groups.append((fresh, 0, {}, None))
+            if not groups:
+                return 0
+
+            computed = [(idx, begin, *self._run(feature, inputs, idx, begin, state), rows)
+                        for idx, begin, state, rows in groups]
+            new_part = self._assemble(feature, part, ids, dates, computed)
+            added = len(np.setdiff1d(new_part["dates"], part["dates"]))
+            self._save(feature, new_part)
+            return added
+
+    def _assemble(self, feature, part, ids, dates, computed):
+        all_dates = np.union1d(part["dates"], dates)
+        tickers = part["tickers"] + [ids[i] for idx, begin, _, _, rows in computed if rows is None for i in idx]
+        old_cols = np.searchsorted(all_dates, part["dates"])
+        columns = {}
+        for c in feature.columns:
+            matrix = np.full((len(tickers), len(all_dates)), np.nan)
+            if part["tickers"]:
+                matrix[:len(part["tickers"])][:, old_cols] = part["columns"][c]
+            columns[c] = matrix
+
+        synced = np.concatenate([part["synced"], np.full(len(tickers) - len(part["tickers"]), None, "datetime64[D]")])
+        state = part["state"]
+        next_row = len(part["tickers"])
+        for idx, begin, values, group_state, rows in computed:
+            if rows is None:
+                rows = list(range(next_row, next_row + len(idx)))
+                next_row += len(idx)
+                state = _append(state, group_state) if feature.stateful else state
+            elif feature.stateful:
+                _put(state, rows, group_state)
+            synced[rows] = dates[-1]
+            if begin == 0:
+                # Recomputed from scratch: nothing stored from the first input date on is still valid
+                columns_from = np.searchsorted(all_dates, dates[0])
+                for c in feature.columns:
+                    columns[c][rows, columns_from:] = np.nan
+            cols = np.searchsorted(all_dates, dates[begin:])
+            for c in feature.columns:
+                columns[c][np.ix_(rows, cols)] = values[c]
+        return {"dates": all_dates, "tickers": tickers, "synced": synced, "columns": columns, "state": state}
+
+    def update_prices(self, frames: dict, tickers=None) -> dict:
+        """Updates every price feature from {ticker: OHLCV DataFrame} in one matrix pass."""
+        ids, dates, inputs = price_inputs(frames, tickers)
+        return {name: self.update(name, ids, dates, inputs)
+                for name, f in self.features.items() if f.source == "prices"}
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+    def frame(self, name, ticker, start=None, end=None) -> pd.DataFrame:
+        """Stored values of one ticker: dates x feature columns (empty if unknown)."""
+        feature = self.features[name]
+        with self._lock:
+            part = self._load(feature)
+            tickers = part["tickers"]
+            row = tickers.index(ticker) if ticker in tickers else None
+            index = pd.DatetimeIndex(part["dates"].astype("datetime64[ns]"), name="Date")
+            if row is None:
+                return pd.DataFrame(columns=list(feature.columns), index=index[:0], dtype=float)
+            df = pd.DataFrame({c: part["columns"][c][row] for c in feature.columns}, index=index)
+        return df.loc[pd.Timestamp(start) if start else None:pd.Timestamp(end) if end else None].dropna(how="all")
+
+    def matrix(self, name, column, tickers=None):
+        """(tickers, dates, tickers x dates values) of one column - the vectorized read path."""
+        feature = self.features[name]
+        with self._lock:
+            part = self._load(feature)
+            index = pd.DatetimeIndex(part["dates"].astype("datetime64[ns]"), name="Date")
+            values = part["columns"][column]
+            if tickers is None:
+                return list(part["tickers"]), index, values.copy()
+            position = {t: i for i, t in enumerate(part["tickers"])}
+            out = np.full((len(tickers), len(index)), np.nan)
+            for i, ticker in enumerate(tickers):
+                row = position.get(ticker)
+                if row is not None:
+                    out[i] = values[row]
+            return list(tickers), index, out
+
+    def latest(self, name, ticker) -> dict:
+        """Most recent stored row of one ticker, with its date."""
+        df = self.frame(name, ticker)
+        if df.empty:
+            return {}
+        row = df.iloc[-1]
+        return {"date": df.index[-1].strftime("%Y-%m-%d"),
+                **{c: None if np.isnan(v) else float(v) for c, v in row.items()}}
@@ -0,0 +1,137 @@
+import json
+import hashlib
+import threading
+from urllib.parse import urlsplit, urlencode
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from utils.data_manager import DataManager
+
+
+class CachedResponse:
+    """
+    Minimal response object returned by HttpClient.get - the same shape
+    whether the body came off the wire (200) or from the cache (304).
+    """
+    def __init__(self, url, status_code, text, headers, from_cache):
+        self.url = url
+        self.status_code = status_code
+        self.text = text
+        self.headers = headers
+        self.from_cache = from_cache
+
+    @property
+    def ok(self):
+        return 200 <= self.status_code < 400
+
+    def json(self):
+        return json.loads(self.text)
+
+
+class HttpClient:
+    """
+    Shared HTTP layer for the TWSE / FinMind / news scrapers.
+
+    - Keep-alive connection pooling through one requests.Session
+    - Per-host concurrency limit so a parallel run does not hammer TWSE
+    - gzip/deflate transfer encoding
+    - ETag / Last-Modified conditional GETs backed by DataManager: an
+      unchanged page costs a 304, not a full download
+    """
+    USER_AGENT = "Mozilla/5.0 (compatible; MoltBot/1.0)"
+
+    def __init__(self, pool_connections=10, pool_maxsize=20, per_host_limit=4,
+                 timeout=15, retries=2, cache=None):
+        self.timeout = timeout
+        self.per_host_limit = per_host_limit
+        self.cache = cache or DataManager()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            max_retries=Retry(total=retries, backoff_factor=0.5,
+                              status_forcelist=(429, 500, 502, 503, 504),
+                              allowed_methods=("GET",)),
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({
+            "User-Agent": self.USER_AGENT,
+            "Accept-Encoding": "gzip, deflate",
+        })
+
+        self._host_limits = {}
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "not_modified": 0, "bytes_downloaded": 0}
+
+    def _host_semaphore(self, url):
+        host = urlsplit(url).netloc
+        with self._lock:
+            if host not in self._host_limits:
+                self._host_limits[host] = threading.BoundedSemaphore(self.per_host_limit)
+            return self._host_limits[host]
+
+    @staticmethod
+    def _cache_key(url, params):
+        full_url = f"{url}?{urlencode(sorted((params or {}).items()))}"
+        return hashlib.sha1(full_url.encode("utf-8")).hexdigest()
+
+    def get(self, url, params=None, headers=None, conditional=True) -> CachedResponse:
+        """
+        GET with connection reuse. When `conditional` is set, the stored
+        validators are sent and a 304 is answered from the cache.
+        """
+        key = self._cache_key(url, params)
+        cached = self.cache.load_data("http", key) if conditional else None
+
+        request_headers = dict(headers or {})
+        if cached:
+            if cached.get("etag"):
+                request_headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                request_headers["If-Modified-Since"] = cached["last_modified"]
+
+        with self._host_semaphore(url):
+            resp = self.session.get(url, params=params, headers=request_headers, timeout=self.timeout)
+
+        with self._lock:
+            self.stats["requests"] += 1
+            self.stats["bytes_downloaded"] += len(resp.content)
+
+        if resp.status_code == 304 and cached:
+            with self._lock:
+                self.stats["not_modified"] += 1
+            return CachedResponse(resp.url, 200, cached["text"], cached["headers"], from_cache=True)
+
+        resp.raise_for_status()
+        response_headers = dict(resp.headers)
+        if conditional and (resp.headers.get("ETag") or resp.headers.get("Last-Modified")):
+            self.cache.save_data("http", key, {
+                "etag": resp.headers.get("ETag"),
+                "last_modified": resp.headers.get("Last-Modified"),
+                "headers": response_headers,
+                "text": resp.text,
+            })
+        return CachedResponse(resp.url, resp.status_code, resp.text, response_headers, from_cache=False)
+
+    def get_json(self, url, params=None, headers=None, conditional=True):
+        return self.get(url, params=params, headers=headers, conditional=conditional).json()
+
+    def close(self):
+        self.session.close()
+
+
+_shared_client = None
+_shared_lock = threading.Lock()
+
+
+def get_http_client() -> HttpClient:
+    """Process-wide client, so every analyst shares one connection pool."""
+    global _shared_client
+    with _shared_lock:
+        if _shared_client is None:
+            _shared_client = HttpClient()
+        return _shared_client
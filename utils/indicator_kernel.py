@@ -0,0 +1,277 @@
+import os
+
+import numpy as np
+
+# Vectorized indicators over a (tickers x days) matrix: one row per ticker,
+# one column per date of the union calendar, NaN wherever a ticker has no bar
+# (before its listing, suspensions). Every kernel skips those cells, so row i
+# of every result matches df.ta.<indicator>() run on ticker i alone (pandas_ta's
+# default formulas, same as utils/streaming_indicators.py), and is NaN on the
+# dates ticker i did not trade.
+#
+# Recursive filters (EMA, Wilder's RMA) loop over days with whole-column
+# NumPy operations, i.e. O(days) Python steps regardless of universe size.
+# Set MOLTBOT_JIT=1 with numba installed to run them as compiled loops.
+
+_JIT = None
+_JIT_LOADED = False
+
+
+def _get_jit():
+    """numba-compiled filters, or None. numba is slow to import, so it is opt-in."""
+    global _JIT, _JIT_LOADED
+    if not _JIT_LOADED:
+        _JIT = None
+        if os.environ.get("MOLTBOT_JIT") == "1":
+            try:
+                import numba
+                _JIT = {"ema": numba.njit(cache=True)(_ema_loop), "rma": numba.njit(cache=True)(_rma_loop)}
+            except ImportError:
+                print("[indicator_kernel] numba not installed, using NumPy")
+        _JIT_LOADED = True
+    return _JIT
+
+
+def price_matrices(frames: dict, fields=("Close",), tickers=None):
+    """
+    Aligns per-ticker OHLCV frames on the union of their dates.
+    Returns (tickers, dates, {field: (len(tickers), len(dates)) array}) with
+    NaN on every date a ticker has no bar. Gaps are not filled: a suspended
+    ticker has no price (and no forward return) until it trades again.
+    """
+    import pandas as pd
+    tickers = [t for t in (tickers or frames) if t in frames and not frames[t].empty]
+    if not tickers:
+        return [], pd.DatetimeIndex([]), {field: np.empty((0, 0)) for field in fields}
+
+    stamps = [frames[t].index.as_unit("ns").asi8 for t in tickers]
+    dates = np.unique(np.concatenate(stamps))
+    stacked = np.full((len(fields), len(tickers), len(dates)), np.nan)
+    for row, (ticker, stamp) in enumerate(zip(tickers, stamps)):
+        columns = np.searchsorted(dates, stamp)
+        for i, field in enumerate(fields):
+            stacked[i, row, columns] = frames[ticker][field].to_numpy(dtype=float)
+    return tickers, pd.DatetimeIndex(dates), dict(zip(fields, stacked))
+
+
+def price_matrix(frames: dict, field="Close", tickers=None):
+    """Single-field shortcut for price_matrices: (tickers, dates, values)."""
+    tickers, dates, matrices = price_matrices(frames, (field,), tickers)
+    return tickers, dates, matrices[field]
+
+
+# ----------------------------------------------------------------------
+# Recursive filters
+# ----------------------------------------------------------------------
+def _ema_loop(x, length, out):
+    # Plain loops: the numba path. SMA seed over the first `length` valid values.
+    alpha = 2.0 / (length + 1)
+    for i in range(x.shape[0]):
+        count = 0
+        total = 0.0
+        value = np.nan
+        for t in range(x.shape[1]):
+            v = x[i, t]
+            if v != v:
+                out[i, t] = np.nan
+                continue
+            count += 1
+            if count < length:
+                total += v
+            elif count == length:
+                value = (total + v) / length
+            else:
+                value = alpha * v + (1 - alpha) * value
+            out[i, t] = value if count >= length else np.nan
+    return out
+
+
+def _rma_loop(x, length, out):
+    # ewm(alpha=1/length, adjust=True, min_periods=length)
+    decay = 1.0 - 1.0 / length
+    for i in range(x.shape[0]):
+        count = 0
+        num = 0.0
+        den = 0.0
+        for t in range(x.shape[1]):
+            v = x[i, t]
+            if v == v:
+                count += 1
+                num = v + decay * num
+                den = 1.0 + decay * den
+                out[i, t] = num / den if count >= length else np.nan
+            else:
+                out[i, t] = np.nan
+    return out
+
+
+def _carry(state, key, n, fill, dtype=float):
+    """Per-row filter state from a previous call (copied), or a fresh array."""
+    if state is not None and key in state:
+        return np.array(state[key], dtype=dtype)
+    return np.full(n, fill, dtype=dtype)
+
+
+def ema(x, length, state=None):
+    """
+    pandas_ta EMA per row: SMA seed over the first `length` values, then adjust=False.
+    NaN cells are skipped (and stay NaN). `state` (a dict, updated in place)
+    carries the filter between calls, so a later call only needs the new columns.
+    """
+    x = np.asarray(x, dtype=float)
+    out = np.full(x.shape, np.nan)
+    jit = _get_jit()
+    if jit is not None and state is None:
+        return jit["ema"](x, length, out)
+
+    alpha = 2.0 / (length + 1)
+    count = _carry(state, "count", x.shape[0], 0, np.int64)
+    total = _carry(state, "total", x.shape[0], 0.0)
+    value = _carry(state, "value", x.shape[0], np.nan)
+    for t in range(x.shape[1]):
+        col = x[:, t]
+        valid = ~np.isnan(col)
+        count += valid
+        seeding = valid & (count <= length)
+        total[seeding] += col[seeding]
+        seeded = valid & (count == length)
+        value[seeded] = total[seeded] / length
+        running = valid & (count > length)
+        value[running] = alpha * col[running] + (1 - alpha) * value[running]
+        out[:, t] = np.where(valid & (count >= length), value, np.nan)
+    if state is not None:
+        state.update(count=count, total=total, value=value)
+    return out
+
+
+def rma(x, length, state=None):
+    """Wilder's smoothing as pandas_ta computes it: ewm(alpha=1/length, min_periods=length)."""
+    x = np.asarray(x, dtype=float)
+    out = np.full(x.shape, np.nan)
+    jit = _get_jit()
+    if jit is not None and state is None:
+        return jit["rma"](x, length, out)
+
+    decay = 1.0 - 1.0 / length
+    count = _carry(state, "count", x.shape[0], 0, np.int64)
+    num = _carry(state, "num", x.shape[0], 0.0)
+    den = _carry(state, "den", x.shape[0], 0.0)
+    for t in range(x.shape[1]):
+        col = x[:, t]
+        valid = ~np.isnan(col)
+        count += valid
+        num = np.where(valid, np.nan_to_num(col) + decay * num, num)
+        den = np.where(valid, 1.0 + decay * den, den)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            out[:, t] = np.where(valid & (count >= length), num / den, np.nan)
+    if state is not None:
+        state.update(count=count, num=num, den=den)
+    return out
+
+
+def _previous(x, state, key="prev_close"):
+    """
+    Each row's last valid value strictly before each column (across gaps);
+    column 0 continues from the previous call.
+    """
+    prev = _carry(state, key, x.shape[0], np.nan)
+    full = np.concatenate([prev[:, None], x], axis=1)
+    last_valid = np.maximum.accumulate(np.where(~np.isnan(full), np.arange(full.shape[1]), 0), axis=1)
+    filled = full[np.arange(full.shape[0])[:, None], last_valid]
+    if state is not None:
+        state[key] = filled[:, -1]
+    return filled[:, :-1]
+
+
+def _sub(state, key):
+    return None if state is None else state.setdefault(key, {})
+
+
+# ----------------------------------------------------------------------
+# Indicators (all accept an optional `state` dict to continue a series)
+# ----------------------------------------------------------------------
+def macd(close, fast=12, slow=26, signal=9, state=None) -> dict:
+    line = ema(close, fast, _sub(state, "fast")) - ema(close, slow, _sub(state, "slow"))
+    # The signal EMA starts at each row's first valid MACD value
+    signal_line = ema(line, signal, _sub(state, "signal"))
+    return {
+        f"MACD_{fast}_{slow}_{signal}": line,
+        f"MACDh_{fast}_{slow}_{signal}": line - signal_line,
+        f"MACDs_{fast}_{slow}_{signal}": signal_line,
+    }
+
+
+def rsi(close, length=14, state=None):
+    close = np.asarray(close, dtype=float)
+    change = close - _previous(close, state)
+    gain = rma(np.where(np.isnan(change), np.nan, np.maximum(change, 0.0)), length, _sub(state, "gain"))
+    loss = np.abs(rma(np.where(np.isnan(change), np.nan, np.minimum(change, 0.0)), length, _sub(state, "loss")))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return 100.0 * gain / (gain + loss)
+
+
+def bbands(close, length=20, std=2.0, state=None) -> dict:
+    close = np.asarray(close, dtype=float)
+    # Prepend the last valid values of the previous call so windows span the boundary
+    if state is not None and "window" in state:
+        history = np.asarray(state["window"], dtype=float)
+    else:
+        history = np.full((close.shape[0], length - 1), np.nan)
+    full = np.concatenate([history, close], axis=1)
+    # Windows run over each row's own bars: pack the valid values to the left
+    valid = ~np.isnan(full)
+    order = np.argsort(~valid, axis=1, kind="stable")
+    packed = np.take_along_axis(full, order, axis=1)
+    packed_mid = np.full(full.shape, np.nan)
+    packed_dev = np.full(full.shape, np.nan)
+    if full.shape[1] >= length:
+        windows = np.lib.stride_tricks.sliding_window_view(packed, length, axis=1)
+        packed_mid[:, length - 1:] = windows.mean(axis=2)
+        packed_dev[:, length - 1:] = windows.std(axis=2)  # ddof=0, as pandas_ta
+    full_mid = np.full(full.shape, np.nan)
+    full_dev = np.full(full.shape, np.nan)
+    np.put_along_axis(full_mid, order, packed_mid, axis=1)
+    np.put_along_axis(full_dev, order, packed_dev, axis=1)
+    full_mid[~valid] = np.nan
+    mid = full_mid[:, history.shape[1]:]
+    dev = full_dev[:, history.shape[1]:]
+    if state is not None:
+        n_valid = valid.sum(axis=1)
+        tail = n_valid[:, None] - (length - 1) + np.arange(length - 1)
+        state["window"] = np.where(tail >= 0, np.take_along_axis(packed, np.maximum(tail, 0), axis=1), np.nan)
+    suffix = f"{length}_{float(std)}"
+    return {f"BBL_{suffix}": mid - std * dev, f"BBM_{suffix}": mid, f"BBU_{suffix}": mid + std * dev}
+
+
+def atr(high, low, close, length=14, state=None):
+    """Average True Range (pandas_ta ATRr: Wilder-smoothed true range)."""
+    high, low, close = (np.asarray(a, dtype=float) for a in (high, low, close))
+    prev_close = _previous(close, state)
+    true_range = np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+    true_range[np.isnan(prev_close)] = np.nan  # each ticker's first bar has no true range
+    return rma(true_range, length, _sub(state, "rma"))
+
+
+def compute_all(frames: dict, tickers=None) -> dict:
+    """
+    MACD, RSI, Bollinger Bands and ATR for every ticker in `frames` in one pass.
+    Returns {"tickers", "dates", <pandas_ta column name>: (tickers x days) array}.
+    """
+    tickers, dates, prices = price_matrices(frames, ("High", "Low", "Close"), tickers)
+    result = {"tickers": tickers, "dates": dates}
+    if not tickers:
+        return result
+    high, low, close = prices["High"], prices["Low"], prices["Close"]
+    result.update(macd(close))
+    result["RSI_14"] = rsi(close)
+    result.update(bbands(close))
+    result["ATRr_14"] = atr(high, low, close)
+    return result
+
+
+def latest(values):
+    """Last non-NaN value of each row (NaN if a row has none)."""
+    values = np.asarray(values, dtype=float)
+    valid = ~np.isnan(values)
+    last = values.shape[1] - 1 - np.argmax(valid[:, ::-1], axis=1)
+    return np.where(valid.any(axis=1), values[np.arange(values.shape[0]), last], np.nan)
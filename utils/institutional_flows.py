@@ -0,0 +1,179 @@
+import datetime
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+from utils.data_manager import DataManager
+from utils.http_client import get_http_client
+
+
+class InstitutionalFlows:
+    """
+    Market-wide TWSE T86 (三大法人買賣超日報) store.
+
+    One request per trading day covers every listed stock. Each day is
+    parsed once into a numeric snapshot (stock ids + an int64 matrix of
+    net shares for foreign / trust / dealer) and cached by DataManager.
+    The rolling history is assembled into a (days x stocks x 3) cube so
+    N-day cumulative flows for any stock - or all of them - are a slice
+    and a sum.
+    """
+    T86_URL = "https://www.twse.com.tw/rwd/zh/fund/T86"
+    COLUMNS = ("foreign", "trust", "dealer")
+    # stat of a "no report for this date" reply (holidays, not published yet)
+    NO_DATA_STAT = "沒有符合條件的資料"
+
+    def __init__(self, history_days=20, dm=None, http=None):
+        self.history_days = history_days
+        self.dm = dm or DataManager()
+        self.http = http or get_http_client()
+        self._dates = []
+        self._stock_index = {}
+        self._cube = np.zeros((0, 0, len(self.COLUMNS)), dtype=np.int64)
+
+    # ------------------------------------------------------------------
+    # Ingest
+    # ------------------------------------------------------------------
+    @classmethod
+    def parse_t86(cls, payload: dict):
+        """
+        Turns a T86 JSON payload into (stock_ids, net) where `net` is an
+        int64 matrix of net shares, one column per COLUMNS entry.
+        A "no data for this date" reply parses as an empty day; any other
+        non-OK stat (throttling, server errors) raises, so it is retried
+        instead of being cached as a day without flows.
+        """
+        stat = payload.get("stat")
+        if stat != "OK" and cls.NO_DATA_STAT not in str(stat):
+            raise ValueError(f"T86 request rejected: {stat}")
+        if not payload.get("data"):
+            return [], np.zeros((0, len(cls.COLUMNS)), dtype=np.int64)
+
+        fields = payload["fields"]
+        # Foreign = 外陸資 (excl. foreign dealers) + 外資自營商
+        foreign_cols = [i for i, f in enumerate(fields) if "外" in f and "買賣超" in f]
+        trust_cols = [i for i, f in enumerate(fields) if f.startswith("投信買賣超")]
+        # Dealer total 自營商買賣超股數 already includes the 自行買賣 / 避險 sub-columns;
+        # only older layouts without the total need the sub-columns summed
+        dealer_cols = [i for i, f in enumerate(fields) if f == "自營商買賣超股數"] or \
+                      [i for i, f in enumerate(fields) if f.startswith("自營商買賣超股數(")]
+        if not (foreign_cols and trust_cols and dealer_cols):
+            raise ValueError(f"Unexpected T86 layout: {fields}")
+
+        rows = payload["data"]
+        stock_ids = [row[0].strip() for row in rows]
+        raw = np.array([[row[i] for i in range(len(fields))] for row in rows], dtype=object)
+
+        def to_int(col_idx):
+            cols = raw[:, col_idx].astype(str)
+            cleaned = np.char.replace(np.char.strip(cols), ",", "")
+            cleaned[cleaned == ""] = "0"
+            return cleaned.astype(np.int64).sum(axis=1)
+
+        net = np.column_stack([to_int(foreign_cols), to_int(trust_cols), to_int(dealer_cols)])
+        return stock_ids, net
+
+    def fetch_day(self, date):
+        """
+        Returns the parsed snapshot for one date (cached). Non-trading days
+        yield an empty snapshot. Past days never change, so they are kept
+        indefinitely; today's report is only cached once it is published.
+        """
+        date = pd.Timestamp(date).normalize()
+        day_key = date.strftime("%Y%m%d")
+        is_past = date < pd.Timestamp(datetime.date.today())
+
+        def download():
+            payload = self.http.get_json(self.T86_URL, params={
+                "date": day_key, "selectType": "ALLBUT0999", "response": "json"})
+            stock_ids, net = self.parse_t86(payload)
+            if not stock_ids and not is_past:
+                return None  # not published yet - do not cache
+            return {"date": date.strftime("%Y-%m-%d"), "stock_ids": stock_ids, "net": net}
+
+        snapshot = self.dm.get_or_fetch("institutional", day_key, download,
+                                        max_age=float("inf") if is_past else None)
+        if snapshot is None:
+            return {"date": date.strftime("%Y-%m-%d"), "stock_ids": [], "net": np.zeros((0, 3), dtype=np.int64)}
+        snapshot["net"] = np.asarray(snapshot["net"], dtype=np.int64).reshape(-1, len(self.COLUMNS))
+        return snapshot
+
+    def load_history(self, end_date=None):
+        """
+        Builds the rolling cube of the last `history_days` trading days up to
+        `end_date`, walking back over weekends and holidays.
+        """
+        end = pd.Timestamp(end_date or datetime.date.today()).normalize()
+        snapshots = []
+        day = end
+        # Calendar-day guard: enough for long holiday breaks (e.g. Lunar New Year)
+        for _ in range(self.history_days * 2 + 15):
+            if len(snapshots) >= self.history_days:
+                break
+            if day.weekday() < 5:
+                try:
+                    snap = self.fetch_day(day)
+                except Exception as e:
+                    print(f"[InstitutionalFlows] T86 fetch failed for {day.date()}: {e}")
+                    snap = None
+                if snap and snap["stock_ids"]:
+                    snapshots.append(snap)
+            day -= timedelta(days=1)
+        snapshots.reverse()
+
+        all_ids = sorted({sid for snap in snapshots for sid in snap["stock_ids"]})
+        stock_index = {sid: i for i, sid in enumerate(all_ids)}
+        cube = np.zeros((len(snapshots), len(all_ids), len(self.COLUMNS)), dtype=np.int64)
+        for d, snap in enumerate(snapshots):
+            idx = np.fromiter((stock_index[sid] for sid in snap["stock_ids"]), dtype=np.int64)
+            cube[d, idx, :] = snap["net"]
+        # Built aside first: a long-lived process may reload while lookups run
+        self._cube, self._stock_index = cube, stock_index
+        self._dates = [snap["date"] for snap in snapshots]
+        return self._dates
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+    def _ensure_loaded(self):
+        if not self._dates:
+            self.load_history()
+
+    def latest_date(self):
+        """Most recent trading day in the loaded history, or None."""
+        self._ensure_loaded()
+        return self._dates[-1] if self._dates else None
+
+    def cumulative_all(self, days=5) -> pd.DataFrame:
+        """N-day cumulative net flow (in sheets = 1000 shares) for every stock."""
+        self._ensure_loaded()
+        window = self._cube[-days:].sum(axis=0) / 1000.0
+        return pd.DataFrame(window, index=list(self._stock_index), columns=list(self.COLUMNS))
+
+    def get_flows(self, stock_id, windows=(1, 5, 20)) -> dict:
+        """
+        Latest-day and N-day cumulative flows for one stock, in sheets.
+        Returns {} when the stock is not in the history.
+        """
+        self._ensure_loaded()
+        idx = self._stock_index.get(stock_id)
+        if idx is None:
+            return {}
+
+        series = self._cube[:, idx, :]  # days x 3
+        result = {"date": self._dates[-1]}
+        for n in windows:
+            if n > len(self._dates):
+                continue
+            sums = series[-n:].sum(axis=0) / 1000.0
+            for col, value in zip(self.COLUMNS, sums):
+                result[f"{col}_{n}d"] = round(float(value), 1)
+        # Consecutive days of foreign net buying (+) or selling (-)
+        signs = np.sign(series[:, 0])[::-1]
+        streak = 0
+        if len(signs) and signs[0] != 0:
+            streak = int(np.argmax(signs != signs[0])) if (signs != signs[0]).any() else len(signs)
+            streak *= int(signs[0])
+        result["foreign_streak"] = streak
+        return result
@@ -0,0 +1,75 @@
+import json
+import hashlib
+import threading
+
+from utils.data_manager import DataManager
+from utils.serializers import _to_builtin
+
+
+class JudgmentCache:
+    """
+    Content-addressed store of LLM judgments.
+
+    The key is a hash of the analyst identity, its PROMPT_VERSION and the
+    canonicalized gather_data output, so an analyst whose inputs have not
+    changed gets its previous verdict back without an LLM round trip.
+    Entries live in their own DataManager (memory LRU + size-capped disk
+    tier) with a TTL per analyst matching how often its source updates.
+    """
+    # Seconds a judgment is reused, by analyst name (fallback: default_ttl)
+    DEFAULT_TTLS = {
+        "The Valuator": 24 * 3600,          # BWIBBU is daily
+        "The Chip Watcher": 24 * 3600,      # T86 is daily
+        "The Whale Hunter": 7 * 24 * 3600,  # TDCC is weekly
+        "The Strategist": 6 * 3600,
+        "The Chartist": 6 * 3600,
+        "The Sentiment Scout": 3600,
+    }
+
+    def __init__(self, cache_dir="/workspaces/moltbot-test/data/judgments",
+                 max_disk_bytes=20 * 1024 * 1024, memory_capacity=512,
+                 ttls=None, default_ttl=24 * 3600):
+        self.ttls = dict(self.DEFAULT_TTLS, **(ttls or {}))
+        self.default_ttl = default_ttl
+        self.store = DataManager(cache_dir=cache_dir, memory_capacity=memory_capacity,
+                                 max_disk_bytes=max_disk_bytes, default_ttl=default_ttl)
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "stores": 0, "prompt_chars_saved": 0}
+
+    @staticmethod
+    def canonicalize(raw_data) -> str:
+        """Stable text form of gather_data output: sorted keys, NumPy values as builtins."""
+        return json.dumps(raw_data, sort_keys=True, ensure_ascii=False,
+                          separators=(",", ":"), default=_to_builtin)
+
+    def make_key(self, analyst, raw_data) -> str:
+        version = getattr(analyst, "PROMPT_VERSION", "1")
+        material = "\x1f".join([analyst.get_identity_context(), str(version), self.canonicalize(raw_data)])
+        return hashlib.blake2b(material.encode("utf-8"), digest_size=16).hexdigest()
+
+    def get(self, analyst, raw_data, prompt_chars=0):
+        """Returns the cached judgment dict, or None."""
+        key = self.make_key(analyst, raw_data)
+        entry = self.store.load_data("judgment", key, max_age=self.ttls.get(analyst.name, self.default_ttl))
+        with self._lock:
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            self.stats["hits"] += 1
+            self.stats["prompt_chars_saved"] += prompt_chars
+        return dict(entry, cached=True)
+
+    def put(self, analyst, raw_data, judgment: dict):
+        key = self.make_key(analyst, raw_data)
+        self.store.save_data("judgment", key, {k: v for k, v in judgment.items() if k != "cached"})
+        with self._lock:
+            self.stats["stores"] += 1
+
+    def get_stats(self):
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["misses"]
+            stats = dict(self.stats, hit_rate=round(self.stats["hits"] / lookups, 3) if lookups else 0.0)
+        store = self.store.get_stats()
+        stats.update(entries=store["disk_entries"], disk_bytes=store["disk_bytes"],
+                     evictions=store["disk_evictions"])
+        return stats
@@ -0,0 +1,250 @@
+import os
+import re
+import time
+import queue
+import threading
+from concurrent.futures import Future, InvalidStateError, ThreadPoolExecutor
+
+
+_SIGNAL_RE = re.compile(r"SIGNAL\W*\s*\(?\s*(BUY|SELL|NEUTRAL)", re.IGNORECASE)
+_CONFIDENCE_RE = re.compile(r"CONFIDENCE\W*\s*\(?\s*([0-9]*\.?[0-9]+)\s*(%)?", re.IGNORECASE)
+_SUMMARY_RE = re.compile(r"SUMMARY\W*\s*(.+)", re.IGNORECASE)
+_REASONING_RE = re.compile(r"DETAILED_REASONING\W*\s*(.+)", re.IGNORECASE | re.DOTALL)
+_ANSWER_RE = re.compile(r"^=== ANSWER (\d+) ===\s*$", re.MULTILINE)
+
+# The report parse_judgment reads. The single copy: the gateway's system
+# prompt, delta prompts and analyst tasks all state this constant
+REPORT_FORMAT = (
+    "1. SIGNAL: (BUY, SELL, or NEUTRAL)\n"
+    "2. CONFIDENCE: (0.0 to 1.0)\n"
+    "3. SUMMARY: (A one-sentence summary of your judgment)\n"
+    "4. DETAILED_REASONING: (A brief paragraph on why you reached this decision)"
+)
+
+
+def parse_judgment(text: str) -> dict:
+    """
+    Parses the structured report the analyst prompts ask for
+    (1. SIGNAL / 2. CONFIDENCE / 3. SUMMARY / 4. DETAILED_REASONING)
+    into a typed report. Anything unparsable degrades to NEUTRAL 0.0 and
+    is flagged `degraded` so callers do not cache it.
+    """
+    text = text or ""
+    signal_match = _SIGNAL_RE.search(text)
+    confidence_match = _CONFIDENCE_RE.search(text)
+    summary_match = _SUMMARY_RE.search(text)
+    reasoning_match = _REASONING_RE.search(text)
+
+    signal = signal_match.group(1).upper() if signal_match else "NEUTRAL"
+    confidence = 0.0
+    if confidence_match:
+        confidence = float(confidence_match.group(1))
+        if confidence_match.group(2) or confidence > 1.0:
+            confidence /= 100.0
+        confidence = min(max(confidence, 0.0), 1.0)
+    if not signal_match:
+        confidence = 0.0
+
+    summary = summary_match.group(1).strip() if summary_match else ""
+    reasoning = reasoning_match.group(1).strip() if reasoning_match else ""
+    report = {
+        "signal": signal,
+        "confidence": round(confidence, 2),
+        "reason": summary or reasoning[:200] or "Unparsable LLM response",
+        "reasoning": reasoning,
+    }
+    if not signal_match:
+        report["degraded"] = True
+    return report
+
+
+class LLMGateway:
+    """
+    Shared gateway between AlphaCore and an OpenAI-compatible
+    /chat/completions endpoint.
+
+    Prompts are submitted from any thread or event loop and queued. A
+    dispatcher thread packs up to `batch_size` of them (waiting at most
+    `batch_window` seconds for more) into a single request, numbering
+    each task so the answers can be split apart again. Batches go out on
+    a pooled keep-alive session with at most `max_concurrency` requests in
+    flight and at most `max_requests_per_minute` request starts.
+    """
+    SYSTEM_PROMPT = (
+        "You are the judgment engine of an investment committee. "
+        "You will receive one or more independent tasks, each starting with a line "
+        "'=== TASK <n> ==='. Answer every task separately, starting each answer with "
+        "the line '=== ANSWER <n> ===' followed by a structured report in exactly this "
+        "format, whatever wording the task itself uses:\n" + REPORT_FORMAT
+    )
+
+    def __init__(self, base_url, model="gpt-4o-mini", api_key=None, batch_size=8,
+                 batch_window=0.05, max_concurrency=4, max_requests_per_minute=60,
+                 timeout=120, max_tokens_per_task=300, temperature=0.0):
+        self.url = base_url.rstrip("/") + "/chat/completions"
+        self.model = model
+        self.batch_size = max(1, batch_size)
+        self.batch_window = batch_window
+        self.max_concurrency = max_concurrency
+        self.min_interval = 60.0 / max_requests_per_minute if max_requests_per_minute else 0.0
+        self.timeout = timeout
+        self.max_tokens_per_task = max_tokens_per_task
+        self.temperature = temperature
+
+        # Imported here: the offline/CLI paths never need an HTTP stack
+        import requests
+        from requests.adapters import HTTPAdapter
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_concurrency)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        if api_key:
+            self.session.headers["Authorization"] = f"Bearer {api_key}"
+
+        self._queue = queue.Queue()
+        self._senders = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="llm")
+        self._rate_lock = threading.Lock()
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+        self._closed = False
+        self.stats = {"prompts": 0, "requests": 0, "failed_requests": 0, "missing_answers": 0}
+
+        self._dispatcher = threading.Thread(target=self._dispatch_loop, name="llm-dispatch", daemon=True)
+        self._dispatcher.start()
+
+    @classmethod
+    def from_env(cls, **kwargs):
+        """
+        Builds a gateway from MOLTBOT_LLM_URL / MOLTBOT_LLM_MODEL /
+        MOLTBOT_LLM_API_KEY, or returns None when no endpoint is configured.
+        """
+        base_url = os.environ.get("MOLTBOT_LLM_URL")
+        if not base_url:
+            return None
+        if os.environ.get("MOLTBOT_LLM_MODEL"):
+            kwargs.setdefault("model", os.environ["MOLTBOT_LLM_MODEL"])
+        return cls(base_url, api_key=os.environ.get("MOLTBOT_LLM_API_KEY"), **kwargs)
+
+    # ------------------------------------------------------------------
+    # Submission
+    # ------------------------------------------------------------------
+    def submit(self, prompt: str) -> Future:
+        """Queues one prompt; the future resolves to a parsed report dict."""
+        if self._closed:
+            raise RuntimeError("LLMGateway is closed")
+        future = Future()
+        with self._lock:
+            self.stats["prompts"] += 1
+        self._queue.put((prompt, future))
+        return future
+
+    def judge(self, prompt: str) -> dict:
+        return self.submit(prompt).result()
+
+    def judge_many(self, prompts: list) -> list:
+        """Submits all prompts at once so they share batches; results keep input order."""
+        futures = [self.submit(p) for p in prompts]
+        return [f.result() for f in futures]
+
+    # ------------------------------------------------------------------
+    # Dispatch
+    # ------------------------------------------------------------------
+    def _dispatch_loop(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            deadline = time.monotonic() + self.batch_window
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._queue.put(None)  # let the outer loop exit after this batch
+                    break
+                batch.append(item)
+            self._senders.submit(self._send_batch, batch)
+
+    def _wait_for_rate_slot(self):
+        with self._rate_lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.min_interval
+        if slot > now:
+            time.sleep(slot - now)
+
+    @staticmethod
+    def build_batch_prompt(prompts: list) -> str:
+        return "\n\n".join(f"=== TASK {i} ===\n{p.strip()}" for i, p in enumerate(prompts, 1))
+
+    @staticmethod
+    def split_answers(text: str) -> dict:
+        """{task number: answer text} from a batched completion."""
+        markers = list(_ANSWER_RE.finditer(text or ""))
+        answers = {}
+        for m, nxt in zip(markers, markers[1:] + [None]):
+            answers[int(m.group(1))] = text[m.end():nxt.start() if nxt else len(text)].strip()
+        return answers
+
+    def _complete(self, content: str, n_tasks: int) -> str:
+        self._wait_for_rate_slot()
+        resp = self.session.post(self.url, timeout=self.timeout, json={
+            "model": self.model,
+            "temperature": self.temperature,
+            "max_tokens": self.max_tokens_per_task * n_tasks,
+            "messages": [
+                {"role": "system", "content": self.SYSTEM_PROMPT},
+                {"role": "user", "content": content},
+            ],
+        })
+        with self._lock:
+            self.stats["requests"] += 1
+        resp.raise_for_status()
+        return resp.json()["choices"][0]["message"]["content"]
+
+    def _send_batch(self, batch):
+        prompts = [p for p, _ in batch]
+        try:
+            text = self._complete(self.build_batch_prompt(prompts), len(prompts))
+        except Exception as e:
+            with self._lock:
+                self.stats["failed_requests"] += 1
+            for _, future in batch:
+                self._resolve(future, error=e)
+            return
+
+        answers = self.split_answers(text)
+        if len(batch) == 1 and not answers:
+            answers = {1: text}  # a single task answered without the marker
+        for i, (_, future) in enumerate(batch, 1):
+            if i in answers:
+                self._resolve(future, parse_judgment(answers[i]))
+            else:
+                with self._lock:
+                    self.stats["missing_answers"] += 1
+                self._resolve(future, {"signal": "NEUTRAL", "confidence": 0.0,
+                                       "reason": "No answer in batched LLM response", "reasoning": "",
+                                       "degraded": True})
+
+    @staticmethod
+    def _resolve(future, result=None, error=None):
+        """Sets a batch member's outcome unless its caller already cancelled it."""
+        try:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+        except InvalidStateError:
+            pass  # cancelled (caller timed out) - possibly after a done() check
+
+    def close(self):
+        self._closed = True
+        self._queue.put(None)
+        self._dispatcher.join(timeout=5)
+        self._senders.shutdown(wait=True)
+        self.session.close()
@@ -0,0 +1,143 @@
+import copy
+import hashlib
+import datetime
+import threading
+import xml.etree.ElementTree as ET
+from email.utils import parsedate_to_datetime
+
+from utils.data_manager import DataManager
+from utils.http_client import get_http_client
+
+
+class NewsCrawler:
+    """
+    Incremental headline crawler for SentimentScout.
+
+    Per ticker it persists (via DataManager) the content hashes of headlines
+    already seen, the publish time of the newest one, and a short rolling
+    digest of older headlines. Each crawl skips items published at or
+    before the newest one already reported, drops anything whose normalized
+    title hash was seen before (the same story syndicated by several
+    portals), and returns only the new items plus the compact digest.
+
+    The updated state is only saved by commit(), once the headlines have
+    actually been judged, so a failed judgment sees them again next time.
+    """
+    # Yahoo Finance Taiwan per-symbol RSS; more portals can be appended
+    SOURCES = [
+        "https://tw.stock.yahoo.com/rss?s={ticker}",
+    ]
+
+    def __init__(self, dm=None, http=None, max_seen=2000, digest_size=5):
+        self.dm = dm or DataManager()
+        self.http = http or get_http_client()
+        # Bounded so the per-ticker state stays small
+        self.max_seen = max_seen
+        self.digest_size = digest_size
+        # ticker -> crawl state waiting for commit()
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def headline_hash(title: str) -> str:
+        """Content hash of a headline, insensitive to whitespace and punctuation noise."""
+        normalized = "".join(ch for ch in title.lower() if ch.isalnum())
+        return hashlib.blake2b(normalized.encode("utf-8"), digest_size=8).hexdigest()
+
+    @staticmethod
+    def published_at(value):
+        """ISO timestamp -> timezone-aware datetime (naive = UTC), or None."""
+        if not value:
+            return None
+        try:
+            when = datetime.datetime.fromisoformat(value)
+        except (TypeError, ValueError):
+            return None
+        return when if when.tzinfo else when.replace(tzinfo=datetime.timezone.utc)
+
+    def _load_state(self, ticker):
+        # The crawl state must outlive the short "news" TTL. A copy: the memory
+        # tier hands out its cached dict, and crawl() must not touch it before commit()
+        state = self.dm.load_data("news_state", ticker, max_age=float("inf"))
+        return copy.deepcopy(state) if state else {"seen": [], "last_published": None, "digest": []}
+
+    @staticmethod
+    def parse_rss(xml_text: str):
+        """Returns [{"title", "link", "published"}] newest first."""
+        items = []
+        root = ET.fromstring(xml_text)
+        for item in root.iter("item"):
+            title = (item.findtext("title") or "").strip()
+            if not title:
+                continue
+            published = item.findtext("pubDate")
+            try:
+                published = parsedate_to_datetime(published).isoformat() if published else None
+            except (TypeError, ValueError):
+                published = None
+            items.append({"title": title, "link": item.findtext("link"), "published": published})
+        # Portals use different UTC offsets, so order by instant rather than by string
+        oldest = datetime.datetime.min.replace(tzinfo=datetime.timezone.utc)
+        items.sort(key=lambda i: NewsCrawler.published_at(i["published"]) or oldest, reverse=True)
+        return items
+
+    def _fetch_items(self, ticker):
+        items = []
+        for source in self.SOURCES:
+            try:
+                resp = self.http.get(source.format(ticker=ticker))
+                items.extend(self.parse_rss(resp.text))
+            except Exception as e:
+                print(f"[NewsCrawler] {source.format(ticker=ticker)} failed: {e}")
+        return items
+
+    def crawl(self, ticker: str) -> dict:
+        """
+        Returns {"new_headlines": [...], "digest": [...], "seen_count": int}.
+        `digest` holds the most recent previously reported headlines so the
+        LLM keeps some context without re-reading everything. The headlines
+        count as seen only after commit(ticker).
+        """
+        state = self._load_state(ticker)
+        seen = set(state["seen"])
+        last_published = state["last_published"]
+        last_when = self.published_at(last_published)
+
+        new_items = []
+        for item in self._fetch_items(ticker):
+            # Anything published at or before the newest reported headline is old
+            when = self.published_at(item["published"])
+            if last_when and when and when <= last_when:
+                continue
+            h = self.headline_hash(item["title"])
+            if h in seen:
+                continue
+            seen.add(h)
+            new_items.append(item)
+            state["seen"].append(h)
+
+        digest = state["digest"]
+        if new_items:
+            dated = [i["published"] for i in new_items if self.published_at(i["published"])]
+            if dated:
+                newest = max(dated, key=self.published_at)
+                if not last_when or self.published_at(newest) > last_when:
+                    state["last_published"] = newest
+            state["digest"] = ([i["title"] for i in new_items] + digest)[:self.digest_size]
+        state["seen"] = state["seen"][-self.max_seen:]
+        state["last_crawl"] = datetime.datetime.now().isoformat()
+        with self._lock:
+            self._pending[ticker] = state
+
+        return {
+            "new_headlines": [i["title"] for i in new_items],
+            "digest": digest,
+            "seen_count": len(state["seen"]),
+        }
+
+    def commit(self, ticker: str):
+        """Persists the state of the last crawl of `ticker`: its headlines are now seen."""
+        with self._lock:
+            state = self._pending.pop(ticker, None)
+        if state is not None:
+            self.dm.save_data("news_state", ticker, state)
@@ -1,41 +1,36 @@
-import json
 import os
 from datetime import datetime
+from utils.serializers import get_serializer, dump_file, load_file
 
 class PaperTrader:
     """
     Virtual Portfolio Manager. 
     Tracks simulated buys, positions, and calculates realized/unrealized PnL.
     """
-    def __init__(self, data_dir="/workspaces/moltbot-test/data/portfolio"):
+    def __init__(self, data_dir="/workspaces/moltbot-test/data/portfolio", serializer=None):
         self.data_dir = data_dir
+        self.serializer = serializer or get_serializer()
         self.portfolio_path = os.path.join(self.data_dir, "portfolio.json")
         self.history_path = os.path.join(self.data_dir, "trade_history.json")
         os.makedirs(self.data_dir, exist_ok=True)
         self._load_state()
 
     def _load_state(self):
-        if os.path.exists(self.portfolio_path):
-            with open(self.portfolio_path, 'r') as f:
-                self.state = json.load(f)
-        else:
+        # Legacy JSON files are picked up automatically by load_file
+        self.state = load_file(self.portfolio_path, self.serializer)
+        if self.state is None:
             self.state = {
                 "cash": 10000000.0, # Start with 10M TWD
                 "positions": {},    # {ticker: {avg_price, quantity, date}}
                 "total_equity": 10000000.0
             }
         
-        if not os.path.exists(self.history_path):
-            self.history = []
-        else:
-            with open(self.history_path, 'r') as f:
-                self.history = json.load(f)
+        self.history = load_file(self.history_path, self.serializer, default=[])
 
     def _save_state(self):
-        with open(self.portfolio_path, 'w') as f:
-            json.dump(self.state, f, indent=4)
-        with open(self.history_path, 'w') as f:
-            json.dump(self.history, f, indent=4)
+        # Atomic (temp file + rename): a crash mid-write keeps the previous state
+        dump_file(self.state, self.portfolio_path, self.serializer)
+        dump_file(self.history, self.history_path, self.serializer)
 
     def execute_signal(self, ticker, signal, current_price, reason=""):
         """
@@ -1,8 +1,8 @@
 import json
 import os
 from datetime import datetime, timedelta
-import yfinance as yf
 import pandas as pd
+from utils.price_store import PriceStore
 
 class PerformanceAuditor:
     """
@@ -12,6 +12,7 @@ class PerformanceAuditor:
     def __init__(self, log_dir="/workspaces/moltbot-test/logs", portfolio_dir="/workspaces/moltbot-test/data/portfolio"):
         self.log_dir = log_dir
         self.portfolio_dir = portfolio_dir
+        self.prices = PriceStore()
 
     def run_audit(self, audit_period_days=30):
         """
@@ -67,10 +68,9 @@ class PerformanceAuditor:
     def _fetch_market_data(self, tickers):
         if not tickers:
             return {}
-        df = yf.download(tickers, period="5d", progress=False)
-        # Get the latest close price for each ticker
-        latest_prices = df['Close'].iloc[-1].to_dict()
-        return latest_prices
+        # One batched sync for every audited ticker, then read the closes from disk
+        self.prices.update_many(tickers)
+        return self.prices.get_latest_closes(tickers, refresh=False)
 
     def _generate_report(self, decisions, market_data):
         report_lines = ["\\n## Performance Audit Report\\n"]
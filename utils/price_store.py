@@ -0,0 +1,306 @@
+import os
+import json
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+
+FIELDS = ["Open", "High", "Low", "Close", "Volume"]
+
+# Macro series prefetched alongside the stock universe (fear index, US 10Y yield, TAIEX)
+MACRO_TICKERS = ["^VIX", "^TNX", "^TWII"]
+
+
+class PriceStore:
+    """
+    Local columnar OHLCV store - the single price-access API for analysts,
+    auditors and backtests.
+
+    Each (interval, ticker) partition is two NumPy arrays on disk:
+        index.npy  int64 bar timestamps (ns since epoch, UTC-naive)
+        ohlcv.npy  float64 matrix, one column per field in FIELDS
+    Partitions are opened memory-mapped, and only the missing tail since the
+    last stored bar is downloaded from Yahoo Finance.
+    """
+    def __init__(self, store_dir="/workspaces/moltbot-test/data/prices",
+                 interval="1d", default_lookback_days=400, min_refresh_seconds=900):
+        self.store_dir = store_dir
+        self.interval = interval
+        self.default_lookback_days = default_lookback_days
+        # A ticker synced less than this many seconds ago is served from disk only
+        self.min_refresh_seconds = min_refresh_seconds
+        self._frames = {}
+        os.makedirs(self._interval_dir(), exist_ok=True)
+
+    # ------------------------------------------------------------------
+    # Partition I/O
+    # ------------------------------------------------------------------
+    def _interval_dir(self):
+        return os.path.join(self.store_dir, self.interval)
+
+    def _partition_dir(self, ticker):
+        return os.path.join(self._interval_dir(), ticker.replace("/", "_"))
+
+    def _read_partition(self, ticker):
+        part = self._partition_dir(ticker)
+        index_path = os.path.join(part, "index.npy")
+        values_path = os.path.join(part, "ohlcv.npy")
+        if not (os.path.exists(index_path) and os.path.exists(values_path)):
+            return np.empty(0, dtype=np.int64), np.empty((0, len(FIELDS)))
+
+        index = np.load(index_path, mmap_mode='r')
+        values = np.load(values_path, mmap_mode='r')
+        # A crash between the two renames can leave one array a write ahead
+        n = min(len(index), len(values))
+        return index[:n], values[:n]
+
+    def _read_meta(self, ticker):
+        """
+        Partition bookkeeping:
+            covered_from  earliest start date already requested from upstream
+            synced_at     epoch seconds of the last successful upstream sync
+        """
+        meta_path = os.path.join(self._partition_dir(ticker), "meta.json")
+        if not os.path.exists(meta_path):
+            return {}
+        with open(meta_path, 'r') as f:
+            return json.load(f)
+
+    def _update_meta(self, ticker, **fields):
+        part = self._partition_dir(ticker)
+        os.makedirs(part, exist_ok=True)
+        meta = dict(self._read_meta(ticker), **fields)
+        meta_path = os.path.join(part, "meta.json")
+        with open(meta_path + ".tmp", 'w') as f:
+            json.dump(meta, f)
+        os.replace(meta_path + ".tmp", meta_path)
+
+    def _recently_synced(self, ticker):
+        # Persisted, so every PriceStore instance (and process) honours a recent sync
+        return time.time() - self._read_meta(ticker).get("synced_at", 0) < self.min_refresh_seconds
+
+    def _write_partition(self, ticker, index, values):
+        part = self._partition_dir(ticker)
+        os.makedirs(part, exist_ok=True)
+        for name, arr in (("ohlcv.npy", values), ("index.npy", index)):
+            path = os.path.join(part, name)
+            tmp_path = path + ".tmp"
+            with open(tmp_path, 'wb') as f:
+                np.save(f, np.ascontiguousarray(arr))
+            os.replace(tmp_path, path)
+        self._frames.pop(ticker, None)
+
+    # ------------------------------------------------------------------
+    # Download helpers
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _to_arrays(df):
+        """Normalizes a single-ticker yfinance frame into (index, values) arrays."""
+        if df is None or df.empty:
+            return np.empty(0, dtype=np.int64), np.empty((0, len(FIELDS)))
+
+        if isinstance(df.columns, pd.MultiIndex):
+            df = df.copy()
+            df.columns = df.columns.get_level_values(0)
+
+        df = df.reindex(columns=FIELDS).dropna(subset=["Close"])
+        idx = pd.DatetimeIndex(df.index)
+        if idx.tz is not None:
+            idx = idx.tz_convert("UTC").tz_localize(None)
+        return idx.as_unit("ns").asi8.astype(np.int64), df.to_numpy(dtype=np.float64)
+
+    def _download(self, ticker, start, end=None):
+        import yfinance as yf
+        return yf.download(ticker, start=start, end=end, interval=self.interval,
+                           progress=False)
+
+    def _download_many(self, tickers, start):
+        """One multi-ticker request; returns {ticker: single-ticker frame}."""
+        import yfinance as yf
+        df = yf.download(tickers, start=start, interval=self.interval,
+                         group_by="ticker", progress=False)
+        if df is None or df.empty:
+            return {}
+        if not isinstance(df.columns, pd.MultiIndex):
+            return {tickers[0]: df}
+        top_level = set(df.columns.get_level_values(0))
+        return {t: df[t] for t in tickers if t in top_level}
+
+    def _merge(self, ticker, new_index, new_values):
+        """Upserts downloaded bars into the partition; returns bars added."""
+        if len(new_index) == 0:
+            return 0
+
+        index, values = self._read_partition(ticker)
+        # Downloaded bars replace stored ones with the same timestamp
+        # (e.g. a partial bar stored while the session was still open)
+        keep = ~np.isin(index, new_index)
+        merged_index = np.concatenate([np.asarray(index)[keep], new_index])
+        merged_values = np.concatenate([np.asarray(values)[keep], new_values])
+        order = np.argsort(merged_index, kind="stable")
+
+        self._write_partition(ticker, merged_index[order], merged_values[order])
+        return len(merged_index) - len(index)
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def partition_version(self, ticker):
+        """
+        (bars, first, last, last close) of the stored partition - changes
+        whenever bars are added, backfilled or a partial bar is revised.
+        Cheap: reads the memory-mapped arrays, not the frame cache.
+        """
+        index, values = self._read_partition(ticker)
+        if len(index) == 0:
+            return (0, None, None, None)
+        return (len(index), int(index[0]), int(index[-1]), float(values[-1][FIELDS.index("Close")]))
+
+    def invalidate(self, ticker):
+        """Drops the cached frame, e.g. after another process wrote the partition."""
+        self._frames.pop(ticker, None)
+
+    def last_timestamp(self, ticker):
+        index, _ = self._read_partition(ticker)
+        if len(index) == 0:
+            return None
+        return pd.Timestamp(int(index[-1]))
+
+    def update(self, ticker, start=None, force=False):
+        """
+        Brings the partition up to date.
+        Fetches only the tail since the last stored bar, plus the head if
+        `start` is earlier than anything requested for this ticker before.
+        Returns the number of bars added.
+        """
+        if not force and self._recently_synced(ticker):
+            return 0
+
+        start = self._resolve_start(start)
+        index, _ = self._read_partition(ticker)
+        covered_from = self._read_meta(ticker).get("covered_from")
+        covered_from = pd.Timestamp(covered_from) if covered_from else None
+        added = 0
+        try:
+            if len(index) == 0:
+                added += self._merge(ticker, *self._to_arrays(self._download(ticker, start)))
+                self._update_meta(ticker, covered_from=start.isoformat())
+            else:
+                first, last = pd.Timestamp(int(index[0])), pd.Timestamp(int(index[-1]))
+                if covered_from is None or start < covered_from:
+                    if start < first:
+                        head = self._download(ticker, start, end=first.strftime('%Y-%m-%d'))
+                        added += self._merge(ticker, *self._to_arrays(head))
+                    self._update_meta(ticker, covered_from=min(start, covered_from or start).isoformat())
+                # Re-fetch from the last stored bar so a partial bar gets finalized
+                tail = self._download(ticker, last.strftime('%Y-%m-%d'))
+                added += self._merge(ticker, *self._to_arrays(tail))
+            self._update_meta(ticker, synced_at=time.time())
+        except Exception as e:
+            print(f"[PriceStore] Failed to update {ticker}: {e}")
+        return added
+
+    def update_many(self, tickers, start=None, force=False):
+        """
+        Batched update: partitions due a refresh are synced with at most two
+        multi-ticker requests (new tickers from `start`, known tickers from
+        the oldest last-stored bar among them) instead of one per ticker.
+        Tickers whose stored head is later than `start` fall back to update().
+        Returns {ticker: bars added}.
+        """
+        start = self._resolve_start(start)
+        due = [t for t in dict.fromkeys(tickers) if force or not self._recently_synced(t)]
+
+        new, tail, tail_from = [], [], None
+        for ticker in due:
+            index, _ = self._read_partition(ticker)
+            covered_from = self._read_meta(ticker).get("covered_from")
+            if len(index) == 0:
+                new.append(ticker)
+            elif covered_from is not None and start >= pd.Timestamp(covered_from):
+                tail.append(ticker)
+                last = pd.Timestamp(int(index[-1]))
+                tail_from = last if tail_from is None else min(tail_from, last)
+
+        added = {}
+        for group, group_start in ((new, start), (tail, tail_from)):
+            if not group:
+                continue
+            try:
+                frames = self._download_many(group, group_start.strftime('%Y-%m-%d'))
+            except Exception as e:
+                print(f"[PriceStore] Batch download failed ({len(group)} tickers): {e}")
+                continue
+            for ticker in group:
+                added[ticker] = self._merge(ticker, *self._to_arrays(frames.get(ticker)))
+                fields = {"synced_at": time.time()}
+                if group is new:
+                    fields["covered_from"] = start.isoformat()
+                self._update_meta(ticker, **fields)
+
+        # Anything needing a head backfill takes the per-ticker path
+        for ticker in due:
+            if ticker not in added:
+                added[ticker] = self.update(ticker, start=start, force=True)
+        return added
+
+    def prefetch(self, tickers, start=None):
+        """
+        Syncs the whole list in one batch and returns ready in-memory slices
+        {ticker: DataFrame} to hand to the analysts.
+        """
+        self.update_many(tickers, start=start)
+        return {ticker: self.get_history(ticker, start=start, refresh=False) for ticker in tickers}
+
+    def _resolve_start(self, start):
+        if start is not None:
+            return pd.Timestamp(start).normalize()
+        return pd.Timestamp(datetime.now() - timedelta(days=self.default_lookback_days)).normalize()
+
+    def get_history(self, ticker, start=None, end=None, refresh=True):
+        """
+        Returns OHLCV bars for `ticker` in [start, end] as a DataFrame
+        indexed by timestamp, with the same columns yfinance returns.
+        """
+        if refresh:
+            self.update(ticker, start=start)
+
+        frame = self._frames.get(ticker)
+        if frame is None:
+            index, values = self._read_partition(ticker)
+            frame = pd.DataFrame(np.asarray(values), columns=FIELDS,
+                                 index=pd.DatetimeIndex(np.asarray(index).astype("datetime64[ns]"), name="Date"))
+            self._frames[ticker] = frame
+
+        if start is not None or end is not None:
+            frame = frame.loc[pd.Timestamp(start) if start is not None else None:
+                              pd.Timestamp(end) if end is not None else None]
+        return frame
+
+    def get_close_on(self, ticker, date, refresh=True):
+        """
+        Returns the close as of `date` (last bar on or before it), or None.
+        None also when the stored history stops before `date`: until a bar
+        on or after it exists, the previous close may just be stale.
+        """
+        day = pd.Timestamp(date).normalize()
+        # Look back far enough to step over weekends and long holidays
+        df = self.get_history(ticker, start=day - pd.Timedelta(days=14),
+                              end=day + pd.Timedelta(days=1) - pd.Timedelta(1, "ns"), refresh=refresh)
+        if df.empty:
+            return None
+        last = self.last_timestamp(ticker)
+        if last is None or last.normalize() < day:
+            return None
+        return float(df["Close"].iloc[-1])
+
+    def get_latest_closes(self, tickers, refresh=True):
+        """Returns {ticker: latest close} for every ticker with stored bars."""
+        closes = {}
+        for ticker in tickers:
+            df = self.get_history(ticker, refresh=refresh)
+            if not df.empty:
+                closes[ticker] = float(df["Close"].iloc[-1])
+        return closes
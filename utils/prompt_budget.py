@@ -0,0 +1,171 @@
+import re
+import json
+import math
+
+from utils.serializers import _loaded_numpy
+
+_ENCODING = None
+_ENCODING_LOADED = False
+
+_CJK_RE = re.compile(r"[　-鿿가-힯＀-￯]")
+
+# Numeric sequences longer than this are replaced by summary statistics
+SERIES_MAX_POINTS = 8
+
+
+def _get_encoding():
+    """tiktoken's encoder, loaded on first use (it is slow to import)."""
+    global _ENCODING, _ENCODING_LOADED
+    if not _ENCODING_LOADED:
+        try:
+            import tiktoken
+            _ENCODING = tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            # Not installed (or no cached vocabulary): fall back to the estimate
+            _ENCODING = None
+        _ENCODING_LOADED = True
+    return _ENCODING
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Token count of `text`. Uses tiktoken when available; otherwise counts
+    each CJK character as one token and ~4 characters per token for the rest,
+    which errs slightly high for both English and Chinese news text.
+    """
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    cjk = len(_CJK_RE.findall(text))
+    return cjk + math.ceil((len(text) - cjk) / 4)
+
+
+def to_text(data) -> str:
+    """Compact JSON as it would appear in a prompt."""
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+def _round(value):
+    return round(float(value), 4 if abs(value) < 1 else 2)
+
+
+def summarize_series(values, index=None) -> dict:
+    """Reduces a numeric series to the statistics an analyst actually reads."""
+    arr = [float(v) for v in values if v is not None and not (isinstance(v, float) and math.isnan(v))]
+    if not arr:
+        return {"n": 0}
+    first, last = arr[0], arr[-1]
+    summary = {
+        "n": len(arr),
+        "last": _round(last),
+        "min": _round(min(arr)),
+        "max": _round(max(arr)),
+        "mean": _round(sum(arr) / len(arr)),
+    }
+    if first:
+        summary["change_pct"] = _round((last - first) / abs(first) * 100)
+    if index is not None and len(index):
+        summary["from"] = str(index[0])[:10]
+        summary["to"] = str(index[-1])[:10]
+    return summary
+
+
+def _is_numeric_sequence(value):
+    np = _loaded_numpy()
+    if np is not None and isinstance(value, np.ndarray):
+        return value.ndim == 1 and value.dtype.kind in "iuf"
+    if isinstance(value, (list, tuple)) and value:
+        return all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in value)
+    return False
+
+
+def summarize_value(value):
+    """
+    Recursively shrinks a payload without losing meaning: long numeric
+    series become summary statistics, NumPy/pandas objects become builtins.
+    """
+    if hasattr(value, "to_dict") and hasattr(value, "index") and hasattr(value, "dtype"):  # pandas Series
+        if value.dtype.kind in "iuf" and len(value) > SERIES_MAX_POINTS:
+            return summarize_series(value.tolist(), index=list(value.index))
+        return summarize_value(value.tolist())
+    if hasattr(value, "to_dict") and hasattr(value, "columns"):  # pandas DataFrame
+        return {str(col): summarize_value(value[col]) for col in value.columns}
+    if _is_numeric_sequence(value):
+        if len(value) > SERIES_MAX_POINTS:
+            return summarize_series(list(value))
+        return [_round(v) if isinstance(v, float) else v for v in list(value)]
+    np = _loaded_numpy()
+    if np is not None and isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, dict):
+        return {k: summarize_value(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [summarize_value(v) for v in value]
+    return value
+
+
+def trim_text(text: str, max_tokens: int) -> str:
+    """Cuts `text` to about `max_tokens`, preferring a sentence/word boundary."""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    if max_tokens <= 0:
+        return ""
+    # Shrink proportionally, then back off to a boundary
+    cut = max(1, int(len(text) * max_tokens / estimate_tokens(text)) - 1)
+    while cut > 1 and estimate_tokens(text[:cut] + "…") > max_tokens:
+        cut = int(cut * 0.9)
+    head = text[:cut]
+    boundary = max(head.rfind(s) for s in ("。", ". ", "\n", "；", " "))
+    if boundary > cut * 0.6:
+        head = head[:boundary + 1]
+    return head.rstrip() + "…"
+
+
+def _fit(value, max_tokens):
+    """Largest form of one field that fits in `max_tokens`, or None."""
+    if estimate_tokens(to_text(value)) <= max_tokens:
+        return value
+    if isinstance(value, str):
+        trimmed = trim_text(value, max_tokens - 2)  # JSON quotes
+        return trimmed or None
+    if isinstance(value, list):
+        kept = []
+        for item in value:
+            if estimate_tokens(to_text(kept + [item])) > max_tokens:
+                break
+            kept.append(item)
+        if kept and len(kept) < len(value):
+            kept_note = kept + [f"(+{len(value) - len(kept)} more)"]
+            if estimate_tokens(to_text(kept_note)) <= max_tokens:
+                return kept_note
+        return kept or None
+    if isinstance(value, dict):
+        return compact(value, max_tokens=max_tokens) or None
+    return None
+
+
+def compact(data: dict, priority=(), max_tokens=300) -> dict:
+    """
+    Returns a copy of `data` whose compact JSON fits in `max_tokens`.
+    Fields named in `priority` are kept first (in that order), then the
+    rest in their original order; a field that does not fit whole is
+    trimmed (text, lists) or dropped.
+    """
+    data = summarize_value(data)
+    if not isinstance(data, dict):
+        return _fit(data, max_tokens)
+
+    ordered = [k for k in priority if k in data] + [k for k in data if k not in priority]
+    result = {}
+    for key in ordered:
+        used = estimate_tokens(to_text(result))
+        key_cost = estimate_tokens(to_text({key: None})) - 1
+        room = max_tokens - used - key_cost
+        if room <= 0:
+            break
+        fitted = _fit(data[key], room)
+        if fitted is not None:
+            result[key] = fitted
+    return result
@@ -0,0 +1,101 @@
+import json
+import hashlib
+import datetime
+import threading
+
+from utils.serializers import _to_builtin, dump_file, load_file
+
+
+def fingerprint(*parts) -> str:
+    """Stable content hash of JSON-able parts (sorted keys, NumPy as builtins)."""
+    material = json.dumps(parts, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=_to_builtin)
+    return hashlib.blake2b(material.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class RunFingerprints:
+    """
+    Per-(ticker, analyst) record of the inputs behind the last successful
+    report, used to make reruns incremental.
+
+    Two levels of skipping:
+    - source version: an analyst that can cheaply tell how fresh its source
+      is (latest trading day, TDCC week, last price bar) and reports the
+      same version as last time is not even asked to gather data;
+    - input fingerprint: otherwise the gathered raw data is hashed and an
+      unchanged hash reuses the stored report without a new judgment.
+    A ticker's rating is recomputed only when one of its analyst
+    fingerprints or the committee weights changed (and at least once a day,
+    so every trading day still gets its decision log entry).
+
+    With reuse=False nothing is skipped but fresh fingerprints are still
+    recorded (a forced full run).
+    """
+    def __init__(self, path="/workspaces/moltbot-test/data/run_state/fingerprints", reuse=True):
+        self.path = path
+        self.reuse = reuse
+        self._lock = threading.Lock()
+        self._state = load_file(path, default=None) or {"analysts": {}, "tickers": {}}
+        self.stats = {"source_skips": 0, "input_skips": 0, "rating_skips": 0, "recomputed": 0}
+
+    @staticmethod
+    def _key(ticker, analyst_name):
+        return f"{ticker}|{analyst_name}"
+
+    def _count(self, stat):
+        with self._lock:
+            self.stats[stat] += 1
+
+    # ------------------------------------------------------------------
+    # Analyst level
+    # ------------------------------------------------------------------
+    def reuse_by_source(self, ticker, analyst_name, source_version):
+        """Stored report when the analyst's source has not moved, else None."""
+        if source_version is None or not self.reuse:
+            return None
+        with self._lock:
+            entry = self._state["analysts"].get(self._key(ticker, analyst_name))
+        if entry and entry.get("source_version") == source_version:
+            self._count("source_skips")
+            return dict(entry["report"], reused=True)
+        return None
+
+    def reuse_by_inputs(self, ticker, analyst_name, input_fingerprint):
+        """Stored report when the gathered data hashes the same, else None."""
+        with self._lock:
+            entry = self._state["analysts"].get(self._key(ticker, analyst_name))
+        if self.reuse and entry and entry.get("fingerprint") == input_fingerprint:
+            self._count("input_skips")
+            return dict(entry["report"], reused=True)
+        self._count("recomputed")
+        return None
+
+    def record(self, ticker, analyst_name, input_fingerprint, source_version, report):
+        entry = {
+            "fingerprint": input_fingerprint,
+            "source_version": source_version,
+            "report": {k: v for k, v in report.items() if k != "reused"},
+            "recorded_at": datetime.datetime.now().isoformat(),
+        }
+        with self._lock:
+            self._state["analysts"][self._key(ticker, analyst_name)] = entry
+
+    # ------------------------------------------------------------------
+    # Ticker level
+    # ------------------------------------------------------------------
+    def reuse_row(self, ticker, rating_key):
+        with self._lock:
+            entry = self._state["tickers"].get(ticker)
+        if (self.reuse and entry and entry.get("rating_key") == rating_key
+                and entry.get("date") == datetime.date.today().isoformat()):
+            self._count("rating_skips")
+            return dict(entry["row"])
+        return None
+
+    def record_row(self, ticker, rating_key, row):
+        with self._lock:
+            self._state["tickers"][ticker] = {"rating_key": rating_key, "row": dict(row),
+                                              "date": datetime.date.today().isoformat()}
+
+    def save(self):
+        with self._lock:
+            dump_file(self._state, self.path)
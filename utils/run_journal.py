@@ -0,0 +1,132 @@
+import os
+import json
+import glob
+import datetime
+import threading
+
+
+class RunJournal:
+    """
+    Append-only checkpoint log for one advisory run.
+
+    The first line is a header (run id, report date, tickers); every
+    finished ticker appends one result line, flushed and fsynced before
+    the next ticker is reported, and a "complete" line marks the end of
+    each attempt. An interrupted run (or one with failed tickers) can be
+    resumed: tickers already journaled as "ok" are skipped, the rest are
+    retried, and the report is always rendered from the journal rather
+    than from memory.
+    """
+    def __init__(self, journal_dir="/workspaces/moltbot-test/logs/runs"):
+        self.journal_dir = journal_dir
+        os.makedirs(self.journal_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self.path = None
+        self.header = None
+        self.rows = {}
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+    @staticmethod
+    def read(path):
+        """Returns (header, {ticker: row}, complete). A torn last line is ignored."""
+        header, rows, complete = None, {}, False
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # crash mid-write
+                kind = entry.get("type")
+                if kind == "header":
+                    header = entry
+                elif kind == "result":
+                    # A retried ticker's later line wins
+                    rows[entry["row"]["ticker"]] = entry
+                elif kind == "complete":
+                    complete = True
+        return header, rows, complete
+
+    def find_resumable(self):
+        """
+        The newest journal if it still has tickers without an "ok" result
+        (interrupted, or finished with failures), else None.
+        """
+        paths = sorted(glob.glob(os.path.join(self.journal_dir, "run_*.jsonl")))
+        if not paths:
+            return None
+        header, rows, _ = self.read(paths[-1])
+        if header is None:
+            return None
+        ok = {t for t, entry in rows.items() if entry["status"] == "ok"}
+        return paths[-1] if set(header["tickers"]) - ok else None
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+    def _append(self, entry):
+        line = json.dumps(entry, ensure_ascii=False, default=str) + "\n"
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def start(self, tickers, report_date, universe=None):
+        """
+        Opens a new journal for `tickers`. The sector layout they came from
+        (`universe`) is journaled too, so a resumed run scans and renders
+        the same tickers even if config/universe.json changed meanwhile.
+        """
+        run_id = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.path = os.path.join(self.journal_dir, f"run_{run_id}.jsonl")
+        self.header = {"type": "header", "run_id": run_id, "report_date": report_date,
+                       "tickers": list(tickers), "started_at": datetime.datetime.now().isoformat()}
+        if universe is not None:
+            self.header["universe"] = universe
+        self.rows = {}
+        self._append(self.header)
+        return self.path
+
+    def resume(self, path=None):
+        """
+        Reopens an unfinished journal (the newest one by default).
+        Returns the set of tickers that already finished successfully,
+        or None when there is nothing to resume.
+        """
+        path = path or self.find_resumable()
+        if path is None:
+            return None
+        self.path = path
+        self.header, self.rows, _ = self.read(path)
+        # Terminate a torn last line so the next entry starts cleanly
+        with open(path, 'rb+') as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell():
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    f.write(b"\n")
+        self._append({"type": "resumed", "at": datetime.datetime.now().isoformat()})
+        return {t for t, entry in self.rows.items() if entry["status"] == "ok"}
+
+    def record(self, row, status="ok"):
+        """Checkpoints one ticker's result (thread-safe)."""
+        entry = {"type": "result", "status": status, "row": row,
+                 "at": datetime.datetime.now().isoformat()}
+        self._append(entry)
+        with self._lock:
+            self.rows[row["ticker"]] = entry
+
+    def results(self):
+        """{ticker: row} as journaled."""
+        with self._lock:
+            return {t: entry["row"] for t, entry in self.rows.items()}
+
+    def failed_tickers(self):
+        with self._lock:
+            return [t for t, entry in self.rows.items() if entry["status"] != "ok"]
+
+    def finish(self):
+        self._append({"type": "complete", "at": datetime.datetime.now().isoformat(),
+                      "failed": self.failed_tickers()})
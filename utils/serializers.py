@@ -0,0 +1,198 @@
+import os
+import sys
+import json
+import zlib
+import tempfile
+
+try:
+    import msgpack
+except ImportError:  # optional dependency, JSON is used instead
+    msgpack = None
+
+
+def _loaded_numpy():
+    """
+    NumPy if something already imported it, else None. Objects can only be
+    NumPy values once NumPy is loaded, so this avoids importing it (~60 ms)
+    just to rule them out.
+    """
+    return sys.modules.get("numpy")
+
+
+class JsonSerializer:
+    """
+    JSON encoding. Compact by default; pass `indent` for the human-readable
+    debug format.
+    """
+    name = "json"
+    extension = ".json"
+
+    def __init__(self, indent=None):
+        self.indent = indent
+
+    def dumps(self, obj) -> bytes:
+        separators = None if self.indent else (",", ":")
+        return json.dumps(obj, ensure_ascii=False, indent=self.indent,
+                          separators=separators, default=_to_builtin).encode("utf-8")
+
+    def loads(self, data: bytes):
+        return json.loads(data.decode("utf-8"))
+
+
+class MsgpackSerializer:
+    """
+    Compact binary encoding. NumPy arrays are stored natively (dtype, shape
+    and raw buffer) instead of being expanded into lists of numbers.
+    """
+    name = "msgpack"
+    extension = ".msgpack"
+    _NDARRAY_EXT = 1
+
+    def __init__(self):
+        if msgpack is None:
+            raise ImportError("msgpack is not installed (pip install msgpack)")
+
+    def dumps(self, obj) -> bytes:
+        return msgpack.packb(obj, default=self._encode, use_bin_type=True)
+
+    def loads(self, data: bytes):
+        return msgpack.unpackb(data, ext_hook=self._decode, raw=False, strict_map_key=False)
+
+    def _encode(self, obj):
+        np = _loaded_numpy()
+        if np is not None and isinstance(obj, np.ndarray):
+            header = json.dumps([obj.dtype.str, obj.shape]).encode("utf-8")
+            payload = len(header).to_bytes(4, "little") + header + np.ascontiguousarray(obj).tobytes()
+            return msgpack.ExtType(self._NDARRAY_EXT, payload)
+        return _to_builtin(obj)
+
+    def _decode(self, code, payload):
+        if code == self._NDARRAY_EXT:
+            import numpy as np
+            header_len = int.from_bytes(payload[:4], "little")
+            dtype, shape = json.loads(payload[4:4 + header_len])
+            return np.frombuffer(payload[4 + header_len:], dtype=dtype).reshape(shape)
+        return msgpack.ExtType(code, payload)
+
+
+class CompressedSerializer:
+    """Wraps another serializer with zlib compression."""
+    def __init__(self, inner, level=6):
+        self.inner = inner
+        self.level = level
+        self.name = f"{inner.name}+zlib"
+        self.extension = f"{inner.extension}.z"
+
+    def dumps(self, obj) -> bytes:
+        return zlib.compress(self.inner.dumps(obj), self.level)
+
+    def loads(self, data: bytes):
+        return self.inner.loads(zlib.decompress(data))
+
+
+def _to_builtin(obj):
+    """Fallback for NumPy scalars/arrays and sets, which the encoders reject."""
+    np = _loaded_numpy()
+    if np is not None:
+        if isinstance(obj, np.generic):
+            return obj.item()
+        if isinstance(obj, np.ndarray):
+            return obj.tolist()
+    if isinstance(obj, (set, frozenset)):
+        return sorted(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not serializable")
+
+
+def get_serializer(fmt=None):
+    """
+    Returns a serializer by name:
+        "msgpack"       compact binary (default when msgpack is installed)
+        "msgpack+zlib"  compact binary, compressed
+        "json"          compact JSON
+        "json+zlib"     compact JSON, compressed
+        "json-debug"    indented, human-readable JSON
+    The default can be overridden with the MOLTBOT_CACHE_FORMAT env var.
+    """
+    fmt = fmt or os.environ.get("MOLTBOT_CACHE_FORMAT") or ("msgpack" if msgpack is not None else "json")
+    if fmt == "json-debug":
+        return JsonSerializer(indent=2)
+
+    base, _, compression = fmt.partition("+")
+    if base == "msgpack" and msgpack is None:
+        print("[serializers] msgpack not installed, falling back to JSON")
+        base = "json"
+    serializer = MsgpackSerializer() if base == "msgpack" else JsonSerializer()
+    if compression == "zlib":
+        serializer = CompressedSerializer(serializer)
+    return serializer
+
+
+def _serializer_for_path(path):
+    if path.endswith(".msgpack.z"):
+        return CompressedSerializer(MsgpackSerializer())
+    if path.endswith(".json.z"):
+        return CompressedSerializer(JsonSerializer())
+    if path.endswith(".msgpack"):
+        return MsgpackSerializer()
+    return JsonSerializer()
+
+
+_KNOWN_EXTENSIONS = (".msgpack.z", ".json.z", ".msgpack", ".json")
+
+
+def _strip_extension(path):
+    for ext in _KNOWN_EXTENSIONS:
+        if path.endswith(ext):
+            return path[:-len(ext)]
+    return path
+
+
+def resolve_path(base_path, serializer):
+    """Swaps the extension of `base_path` for the serializer's own."""
+    return _strip_extension(base_path) + serializer.extension
+
+
+def atomic_write(path, data: bytes):
+    """
+    Writes to a temp file in the same directory, fsyncs, then renames over
+    `path`, so a crash mid-write never leaves a truncated file behind.
+    """
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=os.path.basename(path))
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def dump_file(obj, base_path, serializer=None):
+    """Atomically writes `obj` next to `base_path` in the serializer's format; returns the path."""
+    serializer = serializer or get_serializer()
+    path = resolve_path(base_path, serializer)
+    atomic_write(path, serializer.dumps(obj))
+    return path
+
+
+def load_file(base_path, serializer=None, default=None):
+    """
+    Reads the object saved by dump_file. Falls back to any other known
+    format of the same file (e.g. legacy pretty-printed JSON) so switching
+    formats never loses existing state.
+    """
+    serializer = serializer or get_serializer()
+    root = _strip_extension(base_path)
+    candidates = [resolve_path(base_path, serializer), base_path] + [root + ext for ext in _KNOWN_EXTENSIONS]
+    existing = [path for path in dict.fromkeys(candidates) if os.path.exists(path)]
+    if not existing:
+        return default
+    # Several formats on disk (e.g. after switching back and forth): newest wins
+    path = max(existing, key=os.path.getmtime)
+    with open(path, 'rb') as f:
+        return _serializer_for_path(path).loads(f.read())
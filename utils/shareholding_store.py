@@ -0,0 +1,184 @@
+import io
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from utils.http_client import get_http_client
+from utils.serializers import atomic_write
+
+
+class ShareholdingStore:
+    """
+    Weekly TDCC shareholding distribution (集保戶股權分散表) for every stock.
+
+    The weekly open-data file lists 15 holding brackets per security. It is
+    parsed once into numeric arrays of shape (stocks x brackets x weeks)
+    and kept as a rolling history in a compressed .npz. Whale / retail
+    percentages and their week-over-week changes are then computed for all
+    stocks in one vectorized pass and served by lookup.
+
+    Brackets (shares): 1 = 1-999, 2 = 1,000-5,000, 3 = 5,001-10,000, ...,
+    15 = over 1,000,000. Level 16 (adjustment) and 17 (total) are dropped.
+    """
+    TDCC_URL = "https://opendata.tdcc.com.tw/getOD.ashx"
+    N_BRACKETS = 15
+    WHALE_BRACKETS = slice(14, 15)   # > 1,000 sheets
+    RETAIL_BRACKETS = slice(0, 3)    # < 10 sheets
+
+    def __init__(self, store_dir="/workspaces/moltbot-test/data/shareholding",
+                 history_weeks=52, stock_pattern=r"^(\d{4}|00\d{2,4}[A-Z]?)$", http=None):
+        self.store_dir = store_dir
+        self.history_path = os.path.join(store_dir, "tdcc_history.npz")
+        self.history_weeks = history_weeks
+        # Common stocks (4 digits) and ETFs (00xx-00xxxx, e.g. 00878, 006208, 00631L) only;
+        # warrants and other securities bloat the file
+        self.stock_pattern = stock_pattern
+        self.http = http or get_http_client()
+        os.makedirs(self.store_dir, exist_ok=True)
+
+        self.weeks = np.array([], dtype="datetime64[D]")
+        self.stock_ids = np.array([], dtype="U8")
+        self.pct = np.zeros((0, self.N_BRACKETS, 0), dtype=np.float32)
+        self.holders = np.zeros((0, self.N_BRACKETS, 0), dtype=np.int64)
+        self._table = {}
+        self._synced = False
+        # Analyst threads of a parallel scan update concurrently
+        self._lock = threading.Lock()
+        self._load()
+
+    # ------------------------------------------------------------------
+    # Columnar persistence
+    # ------------------------------------------------------------------
+    def _load(self):
+        if not os.path.exists(self.history_path):
+            return
+        with np.load(self.history_path) as npz:
+            self.weeks = npz["weeks"]
+            self.stock_ids = npz["stock_ids"]
+            self.pct = npz["pct"]
+            self.holders = npz["holders"]
+
+    def _save(self):
+        buf = io.BytesIO()
+        np.savez_compressed(buf, weeks=self.weeks, stock_ids=self.stock_ids,
+                            pct=self.pct, holders=self.holders)
+        atomic_write(self.history_path, buf.getvalue())
+
+    # ------------------------------------------------------------------
+    # Ingest
+    # ------------------------------------------------------------------
+    def parse_tdcc(self, csv_text: str):
+        """
+        Parses the raw CSV into (week, stock_ids, pct, holders) where pct and
+        holders have shape (stocks x brackets).
+        """
+        df = pd.read_csv(io.StringIO(csv_text), dtype=str)
+        df.columns = ["date", "stock_id", "level", "holders", "shares", "pct"]
+        df["stock_id"] = df["stock_id"].str.strip()
+        df["level"] = pd.to_numeric(df["level"], errors="coerce")
+        df = df[df["level"].between(1, self.N_BRACKETS)]
+        if self.stock_pattern:
+            df = df[df["stock_id"].str.match(self.stock_pattern)]
+        if df.empty:
+            return None, np.array([], dtype="U8"), None, None
+
+        week = np.datetime64(pd.Timestamp(df["date"].iloc[0].strip()).date(), "D")
+        codes, stock_ids = pd.factorize(df["stock_id"], sort=True)
+        levels = df["level"].to_numpy(dtype=np.int64) - 1
+
+        pct = np.zeros((len(stock_ids), self.N_BRACKETS), dtype=np.float32)
+        holders = np.zeros((len(stock_ids), self.N_BRACKETS), dtype=np.int64)
+        pct[codes, levels] = pd.to_numeric(df["pct"], errors="coerce").fillna(0).to_numpy(np.float32)
+        holders[codes, levels] = pd.to_numeric(df["holders"].str.replace(",", ""), errors="coerce") \
+            .fillna(0).to_numpy(np.int64)
+        return week, np.asarray(stock_ids, dtype="U8"), pct, holders
+
+    def _append_week(self, week, stock_ids, pct, holders):
+        all_ids = np.union1d(self.stock_ids, stock_ids)
+        n_weeks = len(self.weeks) + 1
+
+        grown_pct = np.full((len(all_ids), self.N_BRACKETS, n_weeks), np.nan, dtype=np.float32)
+        grown_holders = np.zeros((len(all_ids), self.N_BRACKETS, n_weeks), dtype=np.int64)
+        if len(self.stock_ids):
+            old_idx = np.searchsorted(all_ids, self.stock_ids)
+            grown_pct[old_idx, :, :-1] = self.pct
+            grown_holders[old_idx, :, :-1] = self.holders
+        new_idx = np.searchsorted(all_ids, stock_ids)
+        grown_pct[new_idx, :, -1] = pct
+        grown_holders[new_idx, :, -1] = holders
+
+        self.stock_ids = all_ids
+        self.weeks = np.append(self.weeks, week)
+        self.pct = grown_pct[:, :, -self.history_weeks:]
+        self.holders = grown_holders[:, :, -self.history_weeks:]
+        self.weeks = self.weeks[-self.history_weeks:]
+
+    def update(self, force=False):
+        """
+        Downloads the current weekly file (a 304 when unchanged) and appends
+        it if that week is not stored yet. Runs once per process unless
+        forced. Returns True when a new week was added.
+        """
+        if self._synced and not force:
+            return False
+        with self._lock:
+            # Another thread may have synced while this one waited
+            if self._synced and not force:
+                return False
+            added = False
+            try:
+                csv_text = self.http.get(self.TDCC_URL, params={"id": "1-5"}).text
+                week, stock_ids, pct, holders = self.parse_tdcc(csv_text.lstrip("\ufeff"))
+                if week is not None and week not in self.weeks:
+                    self._append_week(week, stock_ids, pct, holders)
+                    self._save()
+                    added = True
+                self._synced = True
+            except Exception as e:
+                print(f"[ShareholdingStore] TDCC ingest failed: {e}")
+            self._build_table()
+            return added
+
+    # ------------------------------------------------------------------
+    # Vectorized metrics + lookup
+    # ------------------------------------------------------------------
+    def compute_metrics(self) -> pd.DataFrame:
+        """Whale/retail share and week-over-week changes for every stock at once."""
+        if not len(self.weeks):
+            return pd.DataFrame()
+
+        whale = self.pct[:, self.WHALE_BRACKETS, :].sum(axis=1)    # stocks x weeks
+        retail = self.pct[:, self.RETAIL_BRACKETS, :].sum(axis=1)
+        whale_holders = self.holders[:, self.WHALE_BRACKETS, :].sum(axis=1)
+        total_holders = self.holders.sum(axis=1)
+
+        def wow(series):
+            if series.shape[1] < 2:
+                return np.full(series.shape[0], np.nan)
+            return series[:, -1] - series[:, -2]
+
+        return pd.DataFrame({
+            "whale_pct": whale[:, -1],
+            "whale_change": wow(whale),
+            "retail_pct": retail[:, -1],
+            "retail_change": wow(retail),
+            "whale_holders": whale_holders[:, -1],
+            "total_holders": total_holders[:, -1],
+            "total_holders_change": wow(total_holders.astype(np.float64)),
+        }, index=self.stock_ids)
+
+    def _build_table(self):
+        metrics = self.compute_metrics()
+        week = str(self.weeks[-1]) if len(self.weeks) else None
+        self._table = {
+            sid: dict({k: (None if pd.isna(v) else round(float(v), 2)) for k, v in row.items()}, week=week)
+            for sid, row in zip(metrics.index, metrics.to_dict("records"))
+        }
+
+    def get_distribution(self, stock_id) -> dict:
+        """O(1) lookup of precomputed whale/retail metrics for one stock."""
+        if not self._table:
+            self._build_table()
+        return self._table.get(stock_id, {})
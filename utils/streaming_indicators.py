@@ -0,0 +1,233 @@
+import os
+import math
+import threading
+
+from utils.serializers import dump_file, load_file, _KNOWN_EXTENSIONS
+
+
+class StreamingIndicators:
+    """
+    Online MACD / RSI / Bollinger Bands with per-ticker state.
+
+    Every bar or intraday tick updates all indicators in O(1): two EMAs
+    (plus an EMA of their difference) for MACD, Wilder-smoothed average
+    gains/losses for RSI, and a rolling mean/variance over a fixed window
+    for the bands. Formulas follow pandas_ta's defaults so the values
+    match `df.ta.macd()`, `df.ta.rsi()` and `df.ta.bbands()`:
+
+    - EMA: seeded with the SMA of the first `length` values, then
+      ewm(span=length, adjust=False)
+    - RSI: rma = ewm(alpha=1/length, adjust=True, min_periods=length) of
+      the positive / negative close differences
+    - Bollinger: SMA(length) +/- std * population stdev (ddof=0)
+
+    Ticks for the bar that is still forming are applied on top of the last
+    committed bar without changing it; the first update with a later
+    timestamp commits the forming bar. State is persisted per ticker so a
+    restart resumes from the last bar instead of replaying history.
+    """
+    def __init__(self, state_dir="/workspaces/moltbot-test/data/indicators/stream",
+                 macd=(12, 26, 9), rsi_length=14, bb_length=20, bb_std=2.0):
+        self.state_dir = state_dir
+        self.fast, self.slow, self.signal = macd
+        self.rsi_length = rsi_length
+        self.bb_length = bb_length
+        self.bb_std = bb_std
+        os.makedirs(self.state_dir, exist_ok=True)
+
+        self.macd_col = f"MACD_{self.fast}_{self.slow}_{self.signal}"
+        self.macdh_col = f"MACDh_{self.fast}_{self.slow}_{self.signal}"
+        self.macds_col = f"MACDs_{self.fast}_{self.slow}_{self.signal}"
+        self.rsi_col = f"RSI_{rsi_length}"
+        self.bb_suffix = f"{bb_length}_{float(bb_std)}"
+
+        self._tickers = {}
+        self._lock = threading.RLock()
+
+    # ------------------------------------------------------------------
+    # Pure O(1) state transitions
+    # ------------------------------------------------------------------
+    def _initial_state(self):
+        return {
+            "ema_fast": _ema_state(), "ema_slow": _ema_state(), "ema_signal": _ema_state(),
+            "prev_close": None,
+            "gain": _rma_state(), "loss": _rma_state(),
+            "window": [], "bb_mean": 0.0, "bb_m2": 0.0,
+            "bars": 0,
+        }
+
+    def _step(self, state, close):
+        """Returns the state after one more bar closing at `close` (input is not modified)."""
+        fast = _ema_step(state["ema_fast"], close, self.fast)
+        slow = _ema_step(state["ema_slow"], close, self.slow)
+        signal = state["ema_signal"]
+        if fast["value"] is not None and slow["value"] is not None:
+            signal = _ema_step(signal, fast["value"] - slow["value"], self.signal)
+
+        gain, loss = state["gain"], state["loss"]
+        if state["prev_close"] is not None:
+            change = close - state["prev_close"]
+            alpha = 1.0 / self.rsi_length
+            gain = _rma_step(gain, max(change, 0.0), alpha)
+            loss = _rma_step(loss, min(change, 0.0), alpha)
+
+        # Rolling mean / M2 (Welford with replacement once the window is full)
+        window = state["window"] + [close]
+        mean, m2 = state["bb_mean"], state["bb_m2"]
+        if len(window) <= self.bb_length:
+            delta = close - mean
+            mean += delta / len(window)
+            m2 += delta * (close - mean)
+        else:
+            dropped = window.pop(0)
+            old_mean = mean
+            mean += (close - dropped) / self.bb_length
+            m2 += (close - dropped) * (close - mean + dropped - old_mean)
+            m2 = max(m2, 0.0)
+
+        return {
+            "ema_fast": fast, "ema_slow": slow, "ema_signal": signal,
+            "prev_close": close, "gain": gain, "loss": loss,
+            "window": window, "bb_mean": mean, "bb_m2": m2,
+            "bars": state["bars"] + 1,
+        }
+
+    def _values(self, state):
+        """Indicator values for a state, keyed like pandas_ta's columns (None = warming up)."""
+        fast, slow, signal = state["ema_fast"]["value"], state["ema_slow"]["value"], state["ema_signal"]["value"]
+        macd = fast - slow if fast is not None and slow is not None else None
+        values = {
+            self.macd_col: macd,
+            self.macds_col: signal,
+            self.macdh_col: macd - signal if macd is not None and signal is not None else None,
+            self.rsi_col: None,
+            f"BBL_{self.bb_suffix}": None, f"BBM_{self.bb_suffix}": None, f"BBU_{self.bb_suffix}": None,
+        }
+
+        gain, loss = state["gain"], state["loss"]
+        if gain["count"] >= self.rsi_length:
+            avg_gain = gain["num"] / gain["den"]
+            avg_loss = abs(loss["num"] / loss["den"])
+            if avg_gain + avg_loss > 0:
+                values[self.rsi_col] = 100.0 * avg_gain / (avg_gain + avg_loss)
+
+        if len(state["window"]) >= self.bb_length:
+            std = math.sqrt(state["bb_m2"] / self.bb_length)
+            mid = state["bb_mean"]
+            values[f"BBL_{self.bb_suffix}"] = mid - self.bb_std * std
+            values[f"BBM_{self.bb_suffix}"] = mid
+            values[f"BBU_{self.bb_suffix}"] = mid + self.bb_std * std
+        return values
+
+    # ------------------------------------------------------------------
+    # Per-ticker streams
+    # ------------------------------------------------------------------
+    def _state_path(self, ticker):
+        return os.path.join(self.state_dir, ticker.replace("/", "_"))
+
+    def _params(self):
+        return [self.fast, self.slow, self.signal, self.rsi_length, self.bb_length, float(self.bb_std)]
+
+    def _new_stream(self):
+        return {"params": self._params(), "committed": self._initial_state(),
+                "committed_time": None, "current": None, "current_time": None}
+
+    def _ticker(self, ticker):
+        with self._lock:
+            if ticker not in self._tickers:
+                stream = load_file(self._state_path(ticker), default=None)
+                # A changed indicator configuration invalidates the saved state
+                if not stream or stream.get("params") != self._params():
+                    stream = self._new_stream()
+                self._tickers[ticker] = stream
+            return self._tickers[ticker]
+
+    def update(self, ticker, timestamp, close) -> dict:
+        """
+        Applies one bar/tick. `timestamp` identifies the bar (any sortable
+        value, e.g. an ISO date); repeated timestamps revise the forming bar,
+        older ones are ignored. Returns the latest indicator values.
+        """
+        timestamp = str(timestamp)
+        close = float(close)
+        with self._lock:
+            stream = self._ticker(ticker)
+            if stream["current_time"] is not None and timestamp < stream["current_time"]:
+                return self._values(stream["current"])
+            if stream["current_time"] is not None and timestamp > stream["current_time"]:
+                # A new bar started: the previous forming bar is final
+                stream["committed"] = stream["current"]
+                stream["committed_time"] = stream["current_time"]
+            stream["current"] = self._step(stream["committed"], close)
+            stream["current_time"] = timestamp
+            return self._values(stream["current"])
+
+    def catch_up(self, ticker, df) -> int:
+        """
+        Feeds the bars of `df` (OHLCV, DatetimeIndex) not seen yet: the last
+        known bar again (its close may have moved) and everything after it.
+        Returns the number of bars applied.
+        """
+        last = self._ticker(ticker)["current_time"]
+        if last is not None and len(df):
+            import pandas as pd
+            df = df.iloc[df.index.searchsorted(pd.Timestamp(last)):]
+        applied = 0
+        for ts, close in zip(df.index, df["Close"].to_numpy()):
+            if close != close:  # NaN bar
+                continue
+            self.update(ticker, ts.isoformat(), close)
+            applied += 1
+        return applied
+
+    def latest(self, ticker) -> dict:
+        stream = self._ticker(ticker)
+        return self._values(stream["current"]) if stream["current"] else {}
+
+    def previous(self, ticker) -> dict:
+        """Values as of the last committed bar (the bar before the latest one)."""
+        stream = self._ticker(ticker)
+        return self._values(stream["committed"]) if stream["committed_time"] else {}
+
+    def last_time(self, ticker):
+        return self._ticker(ticker)["current_time"]
+
+    def save(self, ticker=None):
+        with self._lock:
+            tickers = [ticker] if ticker else list(self._tickers)
+            for t in tickers:
+                if t in self._tickers:
+                    dump_file(self._tickers[t], self._state_path(t))
+
+    def reset(self, ticker):
+        """Drops a ticker's state, e.g. after a split or a corrected history."""
+        with self._lock:
+            self._tickers.pop(ticker, None)
+            for ext in _KNOWN_EXTENSIONS:
+                path = self._state_path(ticker) + ext
+                if os.path.exists(path):
+                    os.remove(path)
+
+
+def _ema_state():
+    return {"count": 0, "seed_sum": 0.0, "value": None}
+
+
+def _ema_step(state, x, length):
+    count = state["count"] + 1
+    if count < length:
+        return {"count": count, "seed_sum": state["seed_sum"] + x, "value": None}
+    if count == length:
+        return {"count": count, "seed_sum": 0.0, "value": (state["seed_sum"] + x) / length}
+    alpha = 2.0 / (length + 1)
+    return {"count": count, "seed_sum": 0.0, "value": alpha * x + (1 - alpha) * state["value"]}
+
+
+def _rma_state():
+    # adjust=True EWM: numerator/denominator of the exponentially weighted mean
+    return {"count": 0, "num": 0.0, "den": 0.0}
+
+
+def _rma_step(state, x, alpha):
+    decay = 1.0 - alpha
+    return {"count": state["count"] + 1, "num": x + decay * state["num"], "den": 1.0 + decay * state["den"]}
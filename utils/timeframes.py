@@ -0,0 +1,108 @@
+import threading
+
+import pandas as pd
+
+from utils.price_store import PriceStore
+
+# Supported timeframes (yfinance interval names) -> pandas resample rule.
+# Every bucket is closed and labelled on the left, i.e. by its start time;
+# weeks start on Monday.
+TIMEFRAMES = {
+    "5m": "5min",
+    "60m": "60min",
+    "1d": "1D",
+    "1wk": "W-MON",
+}
+
+_MINUTES = {"5m": 5, "60m": 60, "1d": 1440, "1wk": 10080}
+
+# Yahoo Finance only serves intraday bars this far back
+_MAX_LOOKBACK_DAYS = {"5m": 59, "60m": 729}
+
+_AGGREGATION = {"Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum"}
+
+
+def resample(df, timeframe):
+    """OHLCV bars of `df` aggregated to `timeframe`; empty buckets are dropped."""
+    if timeframe not in TIMEFRAMES:
+        raise ValueError(f"Unknown timeframe: {timeframe!r} (known: {', '.join(TIMEFRAMES)})")
+    if df.empty:
+        return df
+    rule = TIMEFRAMES[timeframe]
+    out = df.resample(rule, closed="left", label="left").agg(_AGGREGATION)
+    return out.dropna(subset=["Close"])
+
+
+class MultiTimeframeBars:
+    """
+    Derives coarser bars on demand from one stored base series per ticker.
+
+    Only the base interval (e.g. 5m) is downloaded and stored, in a regular
+    PriceStore partition; 60m, daily and weekly views are resampled from it
+    and memoized per (ticker, timeframe). When new base bars arrive - or the
+    forming bar is revised - only the buckets from the last memoized one
+    onward are recomputed. A backfill of older history recomputes the view.
+    """
+    def __init__(self, store=None, base_interval="5m"):
+        self.store = store or PriceStore(interval=base_interval,
+                                         default_lookback_days=_MAX_LOOKBACK_DAYS.get(base_interval, 400))
+        self.base_interval = self.store.interval
+        if self.base_interval not in _MINUTES:
+            raise ValueError(f"Unsupported base interval: {self.base_interval!r}")
+        self._memo = {}  # (ticker, timeframe) -> (base version, frame)
+        self._lock = threading.Lock()
+
+    def timeframes(self):
+        """Timeframes derivable from the base interval, finest first."""
+        return [tf for tf in TIMEFRAMES if _MINUTES[tf] >= _MINUTES[self.base_interval]]
+
+    def sync(self, tickers):
+        """Batch-syncs the base series of `tickers` (the only network access)."""
+        return self.store.update_many(tickers)
+
+    def base(self, ticker, refresh=False):
+        """The stored base series; `refresh=True` syncs it upstream first."""
+        if refresh:
+            self.store.update(ticker)
+        return self.store.get_history(ticker, refresh=False)
+
+    def bars(self, ticker, timeframe, refresh=False, start=None):
+        """OHLCV bars of `ticker` at `timeframe`, without network access unless `refresh`."""
+        if timeframe not in self.timeframes():
+            raise ValueError(f"{timeframe!r} cannot be derived from {self.base_interval!r} bars")
+        if refresh:
+            self.store.update(ticker)
+
+        version = self.store.partition_version(ticker)
+        key = (ticker, timeframe)
+        with self._lock:
+            memo = self._memo.get(key)
+            if memo is None or memo[0] != version:
+                frame = self._rebuild(ticker, timeframe, version, memo)
+                self._memo[key] = (version, frame)
+            else:
+                frame = memo[1]
+        return frame.loc[pd.Timestamp(start):] if start is not None else frame
+
+    def _rebuild(self, ticker, timeframe, version, memo):
+        base = self.store.get_history(ticker, refresh=False)
+        if len(base) != version[0] or (len(base) and float(base['Close'].iloc[-1]) != version[3]):
+            # Written by another PriceStore instance or process since we cached it
+            self.store.invalidate(ticker)
+            base = self.store.get_history(ticker, refresh=False)
+        if timeframe == self.base_interval:
+            return base
+
+        old_version, old = memo if memo is not None else (None, None)
+        appended = (old is not None and not old.empty and old_version[1] == version[1]
+                    and version[0] >= old_version[0])
+        if not appended:
+            return resample(base, timeframe)
+        # New/revised bars can only touch the last memoized bucket and later ones
+        last_bucket = old.index[-1]
+        return pd.concat([old.iloc[:-1], resample(base.loc[last_bucket:], timeframe)])
+
+    def invalidate(self, ticker=None):
+        with self._lock:
+            for key in [k for k in self._memo if ticker is None or k[0] == ticker]:
+                del self._memo[key]
@@ -0,0 +1,251 @@
+import os
+import json
+import time
+import datetime
+import threading
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+from utils.http_client import get_http_client
+from utils.serializers import atomic_write
+
+
+class ValuationStore:
+    """
+    Whole-market daily PE / PB / dividend-yield history from TWSE BWIBBU.
+
+    One request per trading day returns every listed stock. The history is
+    kept on disk as a columnar .npz (dates x stocks float32 matrix per
+    metric) and only missing trading days are downloaded. After each update
+    the percentile ranks of every stock's latest value - against its own
+    history and against its sector in config/universe.json - are
+    precomputed, so per-ticker lookups are a dict access.
+    """
+    BWIBBU_URL = "https://www.twse.com.tw/rwd/zh/afterTrading/BWIBBU_d"
+    METRICS = ("pe", "pb", "dy")
+    _FIELD_NAMES = {"pe": "本益比", "pb": "股價淨值比", "dy": "殖利率(%)"}
+
+    def __init__(self, store_dir="/workspaces/moltbot-test/data/valuation",
+                 universe_path="/workspaces/moltbot-test/config/universe.json",
+                 history_days=250, min_request_interval=1.0, min_recheck_seconds=900, http=None):
+        self.store_dir = store_dir
+        self.history_path = os.path.join(store_dir, "bwibbu_history.npz")
+        self.universe_path = universe_path
+        self.history_days = history_days
+        # TWSE throttles aggressive clients; pace uncached backfill requests
+        self.min_request_interval = min_request_interval
+        # An end date whose report is not out yet (or a holiday) is re-checked at most this often
+        self.min_recheck_seconds = min_recheck_seconds
+        self.http = http or get_http_client()
+        os.makedirs(self.store_dir, exist_ok=True)
+
+        self.dates = np.array([], dtype="datetime64[D]")
+        self.stock_ids = np.array([], dtype="U8")
+        self.values = {m: np.zeros((0, 0), dtype=np.float32) for m in self.METRICS}
+        self._table = {}
+        self._last_request = 0.0
+        self._synced_for = None
+        self._checked = (None, 0.0)  # (end date, epoch seconds) of the last incomplete sync
+        # Parallel scans call update() from many analyst threads at once
+        self._lock = threading.Lock()
+        self._load()
+
+    # ------------------------------------------------------------------
+    # Columnar persistence
+    # ------------------------------------------------------------------
+    def _load(self):
+        if not os.path.exists(self.history_path):
+            return
+        with np.load(self.history_path) as npz:
+            self.dates = npz["dates"]
+            self.stock_ids = npz["stock_ids"]
+            self.values = {m: npz[m] for m in self.METRICS}
+
+    def _save(self):
+        import io
+        buf = io.BytesIO()
+        np.savez_compressed(buf, dates=self.dates, stock_ids=self.stock_ids, **self.values)
+        atomic_write(self.history_path, buf.getvalue())
+
+    # ------------------------------------------------------------------
+    # Ingest
+    # ------------------------------------------------------------------
+    @classmethod
+    def parse_bwibbu(cls, payload: dict):
+        """Returns (stock_ids, {metric: float32 array}) from a BWIBBU payload."""
+        if payload.get("stat") != "OK" or not payload.get("data"):
+            return [], {}
+
+        fields = payload["fields"]
+        cols = {m: fields.index(name) for m, name in cls._FIELD_NAMES.items()}
+        rows = payload["data"]
+        stock_ids = [row[0].strip() for row in rows]
+
+        parsed = {}
+        for metric, col in cols.items():
+            raw = [str(row[col]).replace(",", "").strip() for row in rows]
+            # "-" marks a loss-making company (no PE) or no dividend
+            parsed[metric] = np.array([v if v not in ("-", "") else "nan" for v in raw], dtype=np.float32)
+        return stock_ids, parsed
+
+    def _fetch_day(self, date):
+        wait = self.min_request_interval - (time.time() - self._last_request)
+        if wait > 0:
+            time.sleep(wait)
+        self._last_request = time.time()
+        payload = self.http.get_json(self.BWIBBU_URL, params={
+            "date": date.strftime("%Y%m%d"), "selectType": "ALL", "response": "json"})
+        return self.parse_bwibbu(payload)
+
+    def _append_days(self, days):
+        """Appends [(date, stock_ids, metrics)] with a single reallocation."""
+        old_ids = self.stock_ids.tolist()
+        known = set(old_ids)
+        new_ids = sorted({sid for _, ids, _ in days for sid in ids} - known)
+        all_ids = old_ids + new_ids
+        position = {sid: i for i, sid in enumerate(all_ids)}
+
+        n_old = len(self.dates)
+        for m in self.METRICS:
+            grown = np.full((n_old + len(days), len(all_ids)), np.nan, dtype=np.float32)
+            grown[:n_old, :len(old_ids)] = self.values[m].reshape(n_old, len(old_ids))
+            for d, (_, ids, metrics) in enumerate(days):
+                idx = np.fromiter((position[sid] for sid in ids), dtype=np.int64, count=len(ids))
+                grown[n_old + d, idx] = metrics[m]
+            self.values[m] = grown
+
+        self.stock_ids = np.array(all_ids, dtype="U8")
+        self.dates = np.concatenate([self.dates, np.array([d.date() for d, _, _ in days], dtype="datetime64[D]")])
+
+    def update(self, end_date=None, force=False):
+        """
+        Downloads trading days after the last stored date (or the last
+        `history_days` weekdays when empty) and refreshes the precomputed
+        percentile table. Once the end date's report is stored it runs at
+        most once per end date per process; until then (not published yet,
+        or a holiday) it re-checks every `min_recheck_seconds` unless forced.
+        Returns the number of days added.
+        """
+        end = pd.Timestamp(end_date or datetime.date.today()).normalize()
+        if not force and self._is_fresh(end):
+            return 0
+        with self._lock:
+            # Another thread may have synced while this one waited
+            if not force and self._is_fresh(end):
+                return 0
+            return self._update(end)
+
+    def _is_fresh(self, end):
+        if self._synced_for == end:
+            return True
+        checked_for, checked_at = self._checked
+        return checked_for == end and time.time() - checked_at < self.min_recheck_seconds
+
+    def _update(self, end):
+        if len(self.dates):
+            day = pd.Timestamp(self.dates[-1]) + timedelta(days=1)
+        else:
+            day = end - timedelta(days=int(self.history_days * 7 / 5))
+
+        fetched, failed = [], False
+        while day <= end:
+            if day.weekday() < 5:
+                try:
+                    stock_ids, metrics = self._fetch_day(day)
+                except Exception as e:
+                    print(f"[ValuationStore] BWIBBU fetch failed for {day.date()}: {e}")
+                    failed = True
+                    break
+                if stock_ids:
+                    fetched.append((day, stock_ids, metrics))
+            day += timedelta(days=1)
+
+        if fetched:
+            self._append_days(fetched)
+            # Keep a rolling window
+            keep = slice(-self.history_days, None)
+            self.dates = self.dates[keep]
+            self.values = {m: v[keep] for m, v in self.values.items()}
+            self._save()
+
+        # Empty weekdays are skipped, so only a stored report for the end
+        # date's weekday completes the sync (an unpublished day is re-checked)
+        last_weekday = end - timedelta(days=max(end.weekday() - 4, 0))
+        if len(self.dates) and pd.Timestamp(self.dates[-1]) >= last_weekday:
+            self._synced_for = end
+        elif not failed:
+            self._checked = (end, time.time())
+        self._build_table()
+        return len(fetched)
+
+    # ------------------------------------------------------------------
+    # Precomputed lookups
+    # ------------------------------------------------------------------
+    def _load_sectors(self):
+        if not os.path.exists(self.universe_path):
+            return {}
+        with open(self.universe_path, 'r') as f:
+            universe = json.load(f)
+        return {t.split('.')[0]: sector for sector, info in universe.items() for t in info['tickers']}
+
+    @staticmethod
+    def _percentile_of_last(history):
+        """Share of each column's non-NaN history strictly below its last value (0-100)."""
+        latest = history[-1]
+        valid = ~np.isnan(history)
+        below = (history < latest) & valid
+        counts = valid.sum(axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            pct = np.where(counts > 1, below.sum(axis=0) / (counts - 1) * 100, np.nan)
+        pct[np.isnan(latest)] = np.nan
+        return pct
+
+    def _build_table(self):
+        if not len(self.dates):
+            self._table = {}
+            return
+
+        latest = {m: self.values[m][-1] for m in self.METRICS}
+        hist_pct = {m: self._percentile_of_last(self.values[m]) for m in self.METRICS}
+
+        sectors = self._load_sectors()
+        ids = self.stock_ids.tolist()
+        sector_pct = {m: np.full(len(ids), np.nan) for m in self.METRICS}
+        members_by_sector = {}
+        for i, sid in enumerate(ids):
+            if sid in sectors:
+                members_by_sector.setdefault(sectors[sid], []).append(i)
+        for members in members_by_sector.values():
+            members = np.array(members)
+            for m in self.METRICS:
+                vals = latest[m][members]
+                valid = ~np.isnan(vals)
+                if valid.sum() < 2:
+                    continue
+                ranks = (vals[:, None] > vals[None, valid]).sum(axis=1) / (valid.sum() - 1) * 100
+                ranks[~valid] = np.nan
+                sector_pct[m][members] = ranks
+
+        as_of = str(self.dates[-1])
+        table = {}
+        for i, sid in enumerate(ids):
+            row = {"date": as_of, "sector": sectors.get(sid)}
+            for m in self.METRICS:
+                row[m] = _clean(latest[m][i])
+                row[f"{m}_hist_pct"] = _clean(hist_pct[m][i])
+                row[f"{m}_sector_pct"] = _clean(sector_pct[m][i])
+            table[sid] = row
+        # Swapped in whole so concurrent lookups never see a half-built table
+        self._table = table
+
+    def get_valuation(self, stock_id) -> dict:
+        """O(1) lookup of a stock's latest valuation and percentile ranks."""
+        if not self._table:
+            self._build_table()
+        return self._table.get(stock_id, {})
+
+
+def _clean(value):
+    return None if np.isnan(value) else round(float(value), 2)